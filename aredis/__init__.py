@@ -2,9 +2,11 @@ from aredis.client import (StrictRedis, StrictRedisCluster)
 from aredis.connection import (
     Connection,
     UnixDomainSocketConnection,
-    ClusterConnection
+    ClusterConnection,
+    ProtocolConnection
 )
-from aredis.pool import ConnectionPool, ClusterConnectionPool
+from aredis.pool import (ConnectionPool, BlockingConnectionPool,
+                         ClusterConnectionPool)
 from aredis.exceptions import (
     AuthenticationError, BusyLoadingError, ConnectionError,
     DataError, InvalidResponse, PubSubError, ReadOnlyError,
@@ -23,7 +25,8 @@ VERSION = tuple(map(int, __version__.split('.')))
 __all__ = [
     'StrictRedis', 'StrictRedisCluster',
     'Connection', 'UnixDomainSocketConnection', 'ClusterConnection',
-    'ConnectionPool', 'ClusterConnectionPool',
+    'ProtocolConnection',
+    'ConnectionPool', 'BlockingConnectionPool', 'ClusterConnectionPool',
     'AuthenticationError', 'BusyLoadingError', 'ConnectionError', 'DataError',
     'InvalidResponse', 'PubSubError', 'ReadOnlyError', 'RedisError',
     'ResponseError', 'TimeoutError', 'WatchError',
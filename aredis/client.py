@@ -22,7 +22,10 @@ from aredis.compat import CancelledError
 from aredis.connection import RedisSSLContext, UnixDomainSocketConnection
 from aredis.exceptions import (AskError, BusyLoadingError, ClusterDownError, ClusterError, ConnectionError, MovedError,
                                RedisClusterException, TimeoutError, TryAgainError)
+from aredis.hooks import Hooks
+from aredis.multiplexer import EXCLUSIVE_COMMANDS, Multiplexer
 from aredis.pool import (ClusterConnectionPool, ConnectionPool)
+from aredis.tracking import CACHEABLE_COMMANDS, ClientCache
 from aredis.utils import (NodeFlag, blocked_command, clusterdown_wrapper, dict_merge, first_key)
 
 mixins = [
@@ -88,8 +91,15 @@ class StrictRedis(*mixins):
         passed along to the ConnectionPool class's initializer. In the case
         of conflicting arguments, querystring arguments always win.
         """
+        multiplexed = kwargs.pop('multiplexed', False)
+        multiplexed_connections = kwargs.pop('multiplexed_connections', 1)
+        client_cache = kwargs.pop('client_cache', False)
+        client_cache_max_size = kwargs.pop('client_cache_max_size', 10000)
         connection_pool = ConnectionPool.from_url(url, db=db, **kwargs)
-        return cls(connection_pool=connection_pool)
+        return cls(connection_pool=connection_pool, multiplexed=multiplexed,
+                   multiplexed_connections=multiplexed_connections,
+                   client_cache=client_cache,
+                   client_cache_max_size=client_cache_max_size)
 
     def __init__(self, host='localhost', port=6379,
                  db=0, password=None, stream_timeout=None,
@@ -99,8 +109,40 @@ class StrictRedis(*mixins):
                  ssl_keyfile=None, ssl_certfile=None,
                  ssl_cert_reqs=None, ssl_ca_certs=None,
                  max_connections=None, retry_on_timeout=False,
-                 max_idle_time=0, idle_check_interval=1,
-                 loop=None, **kwargs):
+                 max_idle_time=0, idle_check_interval=1, min_connections=0,
+                 health_check_interval=0, multiplexed=False, multiplexed_connections=1,
+                 protocol_version=2, client_cache=False,
+                 client_cache_max_size=10000, loop=None, **kwargs):
+        """
+        :min_connections:
+        number of connections opened by ``connection_pool.warmup()`` before
+        the first commands, idle connections are never closed below it.
+
+        :health_check_interval:
+        connections unused for more than this number of seconds send a PING
+        along with their next command, and are connected again to send the
+        command again if they were dropped (after a NAT timeout or a failover
+        for instance).
+
+        :protocol_version:
+        set to 3 to speak RESP3 with the server (redis >= 6.0), which is
+        negotiated with HELLO when connecting. Maps, sets, doubles and
+        booleans are then returned natively by the server.
+
+        :multiplexed:
+        if set to True, commands issued concurrently share
+        ``multiplexed_connections`` connections of the pool and are written
+        back-to-back, their replies are dispatched to the callers in order.
+        Blocking and stateful commands (BLPOP, WATCH, SELECT...) still
+        borrow a dedicated connection from the pool.
+
+        :client_cache:
+        if set to True, the replies of single key read commands (GET, HGET,
+        HGETALL...) are cached in a LRU of ``client_cache_max_size`` entries,
+        which the server keeps consistent with CLIENT TRACKING invalidation
+        messages (redis >= 6.0). Cached reads do not reach the network, the
+        counters of the cache are returned by ``client_cache.stats()``.
+        """
         if not connection_pool:
             kwargs = {
                 'db': db,
@@ -113,6 +155,9 @@ class StrictRedis(*mixins):
                 'decode_responses': decode_responses,
                 'max_idle_time': max_idle_time,
                 'idle_check_interval': idle_check_interval,
+                'min_connections': min_connections,
+                'health_check_interval': health_check_interval,
+                'protocol_version': protocol_version,
                 'loop': loop
             }
             # based on input, setup appropriate connection args
@@ -138,6 +183,21 @@ class StrictRedis(*mixins):
 
         self.response_callbacks = self.__class__.RESPONSE_CALLBACKS.copy()
 
+        if multiplexed:
+            if multiplexed_connections < 1:
+                raise ValueError('"multiplexed_connections" must be a positive integer')
+            self._multiplexers = [Multiplexer(connection_pool)
+                                  for _ in range(multiplexed_connections)]
+            # bind the multiplexed path once so that the default path
+            # does not pay for an extra check on every command
+            self.execute_command = self._execute_multiplexed
+
+        self.client_cache = None
+        if client_cache:
+            self.client_cache = ClientCache(connection_pool, client_cache_max_size)
+            self._execute_uncached = self.execute_command
+            self.execute_command = self._execute_cached
+
     def __repr__(self):
         return "{}<{}>".format(type(self).__name__, repr(self.connection_pool))
 
@@ -145,12 +205,32 @@ class StrictRedis(*mixins):
         """Sets a custom Response Callback"""
         self.response_callbacks[command] = callback
 
+    def register_hook(self, event, callback):
+        """
+        Registers ``callback``, called with an aredis.hooks.CommandEvent
+        ``before_send`` a command, ``after_reply`` once its reply is read, or
+        ``on_error``. Hooks are kept by the connection pool, they see the
+        commands of all the clients sharing it.
+        """
+        pool = self.connection_pool
+        hooks = pool.hooks or Hooks()
+        hooks.register(event, callback)
+        pool.set_hooks(hooks)
+
+    def unregister_hook(self, event, callback):
+        """Removes a callback registered with `register_hook`"""
+        pool = self.connection_pool
+        hooks = pool.hooks or Hooks()
+        hooks.unregister(event, callback)
+        if not hooks:
+            pool.set_hooks(None)
+
     # COMMAND EXECUTION AND PROTOCOL PARSING
     async def execute_command(self, *args, **options):
         """Executes a command and returns a parsed response"""
         pool = self.connection_pool
         command_name = args[0]
-        connection = pool.get_connection()
+        connection = await pool.wait_for_connection()
         try:
             await connection.send_command(*args)
             return await self.parse_response(connection, command_name, **options)
@@ -167,6 +247,41 @@ class StrictRedis(*mixins):
         finally:
             pool.release(connection)
 
+    async def _execute_multiplexed(self, *args, **options):
+        """Executes a command over a connection shared with concurrent callers"""
+        command_name = args[0]
+        if command_name in EXCLUSIVE_COMMANDS:
+            return await StrictRedis.execute_command(self, *args, **options)
+        multiplexer = min(self._multiplexers, key=len)
+        try:
+            response = await multiplexer.execute(*args)
+        except (ConnectionError, TimeoutError) as e:
+            # failures to get a connection from the pool are not retried
+            connection = multiplexer.connection
+            if connection is None:
+                raise
+            if not connection.retry_on_timeout and isinstance(e, TimeoutError):
+                raise
+            response = await multiplexer.execute(*args)
+        if command_name in self.response_callbacks:
+            callback = self.response_callbacks[command_name]
+            return callback(response, **options)
+        return response
+
+    async def _execute_cached(self, *args, **options):
+        """Executes a command, serving the read commands out of the client cache"""
+        command_name = args[0]
+        if command_name not in CACHEABLE_COMMANDS:
+            try:
+                return await self._execute_uncached(*args, **options)
+            finally:
+                self.client_cache.invalidate_arguments(args[1:])
+        response = await self.client_cache.execute(*args)
+        if command_name in self.response_callbacks:
+            callback = self.response_callbacks[command_name]
+            return callback(response, **options)
+        return response
+
     async def parse_response(self, connection, command_name, **options):
         """Parses a response from the Redis server"""
         response = await connection.read_response()
@@ -391,9 +506,9 @@ class StrictRedisCluster(StrictRedis, *cluster_mixins):
 
             if asking:
                 node = self.connection_pool.nodes.nodes[redirect_addr]
-                r = self.connection_pool.get_connection_by_node(node)
+                r = await self.connection_pool.wait_for_connection_by_node(node)
             elif try_random_node:
-                r = self.connection_pool.get_random_connection()
+                r = await self.connection_pool.wait_for_random_connection()
                 try_random_node = False
             else:
                 if self.refresh_table_asap:
@@ -401,7 +516,7 @@ class StrictRedisCluster(StrictRedis, *cluster_mixins):
                     node = self.connection_pool.get_master_node_by_slot(slot)
                 else:
                     node = self.connection_pool.get_node_by_slot(slot)
-                r = self.connection_pool.get_connection_by_node(node)
+                r = await self.connection_pool.wait_for_connection_by_node(node)
 
             try:
                 if asking:
@@ -433,7 +548,7 @@ class StrictRedisCluster(StrictRedis, *cluster_mixins):
                 await self.connection_pool.nodes.increment_reinitialize_counter()
 
                 node = self.connection_pool.nodes.set_node(e.host, e.port, server_type='master')
-                self.connection_pool.nodes.slots[e.slot_id][0] = node
+                self.connection_pool.nodes.slots.set_master(e.slot_id, node)
             except TryAgainError as e:
                 if ttl < self.RedisClusterRequestTTL / 2:
                     await asyncio.sleep(0.05)
@@ -445,31 +560,82 @@ class StrictRedisCluster(StrictRedis, *cluster_mixins):
         raise ClusterError('TTL exhausted.')
 
     async def execute_command_on_nodes(self, nodes, *args, **kwargs):
+        """
+        Sends a command to all the ``nodes`` concurrently and merges their
+        replies with the result callback of the command. Errors are raised
+        once all the nodes are done, the first one in the order of the nodes.
+        """
         command = args[0]
+        nodes = list(nodes)
+        if len(nodes) == 1:
+            replies = [await self._execute_on_node(nodes[0], *args, **kwargs)]
+        else:
+            replies = await asyncio.gather(
+                *[self._execute_on_node(node, *args, **kwargs) for node in nodes],
+                return_exceptions=True
+            )
         res = {}
+        for node, reply in zip(nodes, replies):
+            if isinstance(reply, BaseException):
+                raise reply
+            res[node["name"]] = reply
+        return self._merge_result(command, res, **kwargs)
 
-        for node in nodes:
-            connection = self.connection_pool.get_connection_by_node(node)
+    async def _execute_on_node(self, node, *args, **kwargs):
+        command = args[0]
+        connection = await self.connection_pool.wait_for_connection_by_node(node)
 
-            # copy from redis-py
-            try:
-                await connection.send_command(*args)
-                res[node["name"]] = await self.parse_response(connection, command, **kwargs)
-            except CancelledError:
-                # do not retry when coroutine is cancelled
-                connection.disconnect()
+        # copy from redis-py
+        try:
+            await connection.send_command(*args)
+            return await self.parse_response(connection, command, **kwargs)
+        except CancelledError:
+            # do not retry when coroutine is cancelled
+            connection.disconnect()
+            raise
+        except (ConnectionError, TimeoutError) as e:
+            connection.disconnect()
+
+            if not connection.retry_on_timeout and isinstance(e, TimeoutError):
                 raise
-            except (ConnectionError, TimeoutError) as e:
-                connection.disconnect()
 
-                if not connection.retry_on_timeout and isinstance(e, TimeoutError):
-                    raise
+            await connection.send_command(*args)
+            return await self.parse_response(connection, command, **kwargs)
+        finally:
+            self.connection_pool.release(connection)
 
-                await connection.send_command(*args)
-                res[node["name"]] = await self.parse_response(connection, command, **kwargs)
-            finally:
-                self.connection_pool.release(connection)
-        return self._merge_result(command, res, **kwargs)
+    def _slot_groups(self, args, step=1):
+        """
+        Groups the positions of the keys of ``args``, a flat list of keys
+        each followed by ``step - 1`` values, by hash slot
+        """
+        keyslot = self.connection_pool.nodes.keyslot
+        slots = {}
+        for position in range(0, len(args), step):
+            slots.setdefault(keyslot(args[position]), []).append(position)
+        return list(slots.values())
+
+    async def _execute_by_slots(self, command, args, step=1, callback=None):
+        """
+        Sends a multi-key ``command`` once per hash slot of the keys of
+        ``args`` (see `_slot_groups`). The commands are pipelined per node,
+        so that all the nodes are queried at once, and the redirections are
+        followed by the pipeline. ``callback`` replaces the response
+        callback of the command.
+
+        Returns a list of (positions of the keys in ``args``, reply) pairs,
+        one per slot.
+        """
+        if not args:
+            return []
+        groups = self._slot_groups(args, step)
+        pipe = await self.pipeline()
+        if callback is not None:
+            pipe.set_response_callback(command, callback)
+        for positions in groups:
+            await pipe.execute_command(command, *[arg for position in positions
+                                                  for arg in args[position:position + step]])
+        return list(zip(groups, await pipe.execute()))
 
     async def pipeline(self, transaction=None, shard_hint=None, watches=None):
         """
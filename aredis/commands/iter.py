@@ -77,9 +77,47 @@ class IterCommandMixin:
             for item in data:
                 yield item
 
+    async def get_stream(self, name, chunk_size=None):
+        """
+        Iterates over the value of key ``name`` in chunks of at most
+        ``chunk_size`` bytes (``reader_read_size`` by default) as they are
+        received, so that large values can be written to a file or a
+        response without being loaded in memory at once. Nothing is yielded
+        if the key does not exist.
+
+        The value is always returned as bytes, even with ``decode_responses``
+        """
+        connection = await self._get_stream_connection(name)
+        reader = None
+        try:
+            reader = await connection.bulk_reader()
+            await connection.send_command('GET', name)
+            if chunk_size is None:
+                chunk_size = connection._parser._read_size
+            if await reader.read_length() is None:
+                return
+            while True:
+                chunk = await reader.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            if reader is not None:
+                reader.close()
+            # a connection left in the middle of the reply is discarded by
+            # the pool as it is still awaiting a response
+            self.connection_pool.release(connection)
+
+    async def _get_stream_connection(self, name):
+        return await self.connection_pool.wait_for_connection()
+
 
 class ClusterIterCommandMixin(IterCommandMixin):
 
+    async def _get_stream_connection(self, name):
+        pool = self.connection_pool
+        return await pool.wait_for_connection_by_slot(pool.nodes.keyslot(name))
+
     async def scan_iter(self, match=None, count=None):
         nodes = await self.cluster_nodes()
         for node in nodes:
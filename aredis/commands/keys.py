@@ -318,17 +318,44 @@ class ClusterKeysCommandMixin(KeysCommandMixin):
         "Delete one or more keys specified by ``names``"
 
         Cluster impl:
-            Iterate all keys and send DELETE for each key.
-            This will go a lot slower than a normal delete call in StrictRedis.
+            Keys are grouped by hash slot and a DEL is sent per slot, the
+            DELs of each node are pipelined and the nodes are queried at once.
 
             Operation is no longer atomic.
         """
-        count = 0
+        return await self._count_by_slots('DEL', names)
 
-        for arg in names:
-            count += await self.execute_command('DEL', arg)
+    async def exists(self, *names):
+        """
+        Returns the number of ``names`` that exist
+
+        Cluster impl:
+            Keys are grouped by hash slot and an EXISTS is sent per slot.
+        """
+        return await self._count_by_slots('EXISTS', names, callback=int)
+
+    async def touch(self, keys):
+        """
+        Alters the last access time of a key(s).
+        A key is ignored if it does not exist.
+
+        Cluster impl:
+            Keys are grouped by hash slot and a TOUCH is sent per slot.
+        """
+        return await self._count_by_slots('TOUCH', keys)
+
+    async def unlink(self, *keys):
+        """
+        Removes the specified keys in a different thread, not blocking
+
+        Cluster impl:
+            Keys are grouped by hash slot and an UNLINK is sent per slot.
+        """
+        return await self._count_by_slots('UNLINK', keys)
 
-        return count
+    async def _count_by_slots(self, command, keys, callback=None):
+        replies = await self._execute_by_slots(command, list(keys), callback=callback)
+        return sum(count for _, count in replies)
 
     async def renamenx(self, src, dst):
         """
@@ -32,9 +32,14 @@ SENTINEL_STATE_TYPES = {
 
 
 def pairs_to_dict_typed(response, type_info):
-    it = iter(response)
+    if isinstance(response, dict):
+        # RESP3 map reply
+        items = response.items()
+    else:
+        it = iter(response)
+        items = zip(it, it)
     result = {}
-    for key, value in zip(it, it):
+    for key, value in items:
         if key in type_info:
             try:
                 value = type_info[key](value)
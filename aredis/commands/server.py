@@ -26,6 +26,10 @@ def parse_client_list(response, **options):
 
 
 def parse_config_get(response, **options):
+    if isinstance(response, dict):
+        # RESP3 map reply
+        return {nativestr(k): nativestr(v) if v is not None else None
+                for k, v in response.items()}
     response = [nativestr(i) if i is not None else None for i in response]
     return response and pairs_to_dict(response) or {}
 
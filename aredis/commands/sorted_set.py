@@ -25,6 +25,9 @@ def zset_score_pairs(response, **options):
     if not response or not options['withscores']:
         return response
     score_cast_func = options.get('score_cast_func', float)
+    if isinstance(response[0], list):
+        # RESP3 replies are already (value, score) pairs
+        return [(value, score_cast_func(score)) for value, score in response]
     it = iter(response)
     return list(zip(it, map(score_cast_func, it)))
 
@@ -17,6 +17,9 @@ def stream_list(response):
 
 def multi_stream_list(response):
     result = dict()
+    if isinstance(response, dict):
+        # RESP3 map reply
+        response = response.items()
     if response:
         for r in response:
             result[r[0]] = stream_list(r[1])
@@ -329,14 +329,17 @@ class ClusterStringsCommandMixin(StringsCommandMixin):
         Returns a list of values ordered identically to ``keys``
 
         Cluster impl:
-            Itterate all keys and send GET for each key.
-            This will go alot slower than a normal mget call in StrictRedis.
+            Keys are grouped by hash slot and a MGET is sent per slot, the
+            MGETs of each node are pipelined and the nodes are queried at
+            once.
 
             Operation is no longer atomic.
         """
-        res = list()
-        for arg in list_or_args(keys, args):
-            res.append(await self.get(arg))
+        keys = list_or_args(keys, args)
+        res = [None] * len(keys)
+        for positions, values in await self._execute_by_slots('MGET', keys):
+            for position, value in zip(positions, values):
+                res[position] = value
         return res
 
     async def mset(self, *args, **kwargs):
@@ -345,7 +348,9 @@ class ClusterStringsCommandMixin(StringsCommandMixin):
         dictionary argument or as kwargs.
 
         Cluster impl:
-            Itterate over all items and do SET on each (k,v) pair
+            Pairs are grouped by hash slot and a MSET is sent per slot, the
+            MSETs of each node are pipelined and the nodes are queried at
+            once.
 
             Operation is no longer atomic.
         """
@@ -354,9 +359,7 @@ class ClusterStringsCommandMixin(StringsCommandMixin):
                 raise RedisError('MSET requires **kwargs or a single dict arg')
             kwargs.update(args[0])
 
-        for pair in iteritems(kwargs):
-            await self.set(pair[0], pair[1])
-
+        await self._execute_by_slots('MSET', [arg for pair in iteritems(kwargs) for arg in pair], 2)
         return True
 
     async def msetnx(self, *args, **kwargs):
@@ -366,17 +369,22 @@ class ClusterStringsCommandMixin(StringsCommandMixin):
         Returns a boolean indicating if the operation was successful.
 
         Clutser impl:
-            Itterate over all items and do GET to determine if all keys do not exists.
-            If true then call mset() on all keys.
+            If all the keys are in the same hash slot a MSETNX is sent. Otherwise
+            the keys are checked with an EXISTS per slot and the pairs are set
+            with mset() if none exists.
+
+            Operation is no longer atomic when the keys are in several slots.
         """
         if args:
             if len(args) != 1 or not isinstance(args[0], dict):
                 raise RedisError('MSETNX requires **kwargs or a single dict arg')
             kwargs.update(args[0])
 
-        # Itterate over all items and fail fast if one value is True.
-        for k, _ in kwargs.items():
-            if await self.get(k):
+        pairs = [arg for pair in iteritems(kwargs) for arg in pair]
+        if len(self._slot_groups(pairs, 2)) == 1:
+            return await self.execute_command('MSETNX', *pairs)
+        for _, count in await self._execute_by_slots('EXISTS', list(kwargs)):
+            if count:
                 return False
 
         return await self.mset(**kwargs)
@@ -6,8 +6,7 @@ import ssl
 import sys
 import time
 import warnings
-
-from io import BytesIO
+from collections import deque
 
 import aredis.compat
 from aredis.exceptions import (ConnectionError, TimeoutError,
@@ -17,6 +16,7 @@ from aredis.exceptions import (ConnectionError, TimeoutError,
                                InvalidResponse, AskError,
                                MovedError, TryAgainError,
                                ClusterDownError, ClusterCrossSlotError)
+from aredis.hooks import CommandEvent
 from aredis.utils import b, nativestr, LOOP_DEPRECATED
 
 try:
@@ -26,11 +26,71 @@ try:
 except ImportError:
     HIREDIS_AVAILABLE = False
 
+try:
+    from aredis.speedups import pack_command, pack_commands
+
+    SPEEDUPS_PACKER_AVAILABLE = True
+except ImportError:
+    SPEEDUPS_PACKER_AVAILABLE = False
+
+try:
+    from aredis.speedups import Reader as SpeedupsReader
+
+    SPEEDUPS_READER_AVAILABLE = True
+except ImportError:
+    SPEEDUPS_READER_AVAILABLE = False
+
 SYM_STAR = b('*')
 SYM_DOLLAR = b('$')
 SYM_CRLF = b('\r\n')
 SYM_LF = b('\n')
 SYM_EMPTY = b('')
+# packed PING sent along with the first command of an idle connection
+SYM_PING = b('*1\r\n$4\r\nPING\r\n')
+
+# returned by parsers when the reply is not completely received yet
+NOT_ENOUGH_DATA = object()
+# RESP3 push messages and attributes are not replies to a command
+NOT_A_REPLY = object()
+# RESP3 map: '%', set: '~', push: '>' and attribute: '|'
+RESP3_AGGREGATE_TYPES = frozenset(b'%~>|')
+# writelines of the transports of asyncio joins the pieces it is given into a
+# single bytes object before Python 3.12, large values are written apart
+WRITELINES_JOINS = sys.version_info < (3, 12)
+
+# encoded '*<argc>\r\n$<len>\r\n<name>\r\n' headers of the commands packed
+# so far, keyed by (command name, number of arguments). Command names are a
+# small set in practice, the cache simply stops growing past its max size.
+# The headers of variadic commands called with many arguments (MSET, DEL...)
+# are not cached, as in the C extension, so that they do not fill the cache.
+_COMMAND_HEADERS = {}
+COMMAND_HEADERS_MAX_SIZE = 1024
+COMMAND_HEADERS_MAX_ARGS = 64
+
+
+def pack_command_header(command, nargs):
+    """
+    Returns the encoded header of ``command`` called with ``nargs``
+    arguments, the command name included
+    """
+    key = (command, nargs)
+    header = _COMMAND_HEADERS.get(key)
+    if header is None:
+        # the client might have included 1 or more literal arguments in
+        # the command name, e.g., 'CONFIG GET'. The Redis server expects
+        # these arguments to be sent separately, so split the first argument
+        # manually.
+        if ' ' in command:
+            words = [b(s) for s in command.split()]
+        else:
+            words = [b(command)]
+        pieces = [SYM_STAR, b(str(len(words) + nargs - 1)), SYM_CRLF]
+        for word in words:
+            pieces.extend((SYM_DOLLAR, b(str(len(word))), SYM_CRLF, word, SYM_CRLF))
+        header = SYM_EMPTY.join(pieces)
+        if nargs < COMMAND_HEADERS_MAX_ARGS and len(_COMMAND_HEADERS) < COMMAND_HEADERS_MAX_SIZE:
+            _COMMAND_HEADERS[key] = header
+    return header
 
 
 async def exec_with_timeout(coroutine, timeout, *, loop=None):
@@ -43,35 +103,206 @@ async def exec_with_timeout(coroutine, timeout, *, loop=None):
         raise TimeoutError(exc)
 
 
+class RedisProtocol(asyncio.Protocol):
+    """
+    Transport protocol of ProtocolConnection.
+
+    Data received from the transport is fed straight into the parser of the
+    connection instead of being buffered by a StreamReader first, and the
+    parser waiting for more data is woken up through a future.
+    """
+
+    def __init__(self, *, loop=None):
+        self._loop = loop
+        self.transport = None
+        self._parser = None
+        # data received before a parser is attached
+        self._received = []
+        self._waiter = None
+        self._closed = False
+        self._exception = None
+        # write flow control
+        self._paused = False
+        self._drain_waiter = None
+        self._reading_paused = False
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def set_parser(self, parser):
+        """Feeds the received data into ``parser.feed`` from now on"""
+        self._parser = parser
+        received, self._received = self._received, []
+        for data in received:
+            parser.feed(data)
+
+    def data_received(self, data):
+        if self._parser is None:
+            self._received.append(data)
+        else:
+            self._parser.feed(data)
+        self._wakeup()
+
+    def eof_received(self):
+        self._closed = True
+        self._wakeup()
+        # let the transport close itself
+        return False
+
+    def connection_lost(self, exc):
+        self._closed = True
+        self._exception = exc
+        self._parser = None
+        self._wakeup()
+        self.resume_writing()
+
+    def pause_reading(self):
+        """Stops receiving data until resume_reading() is called"""
+        if not self._reading_paused and not self._closed:
+            self._reading_paused = True
+            self.transport.pause_reading()
+
+    def resume_reading(self):
+        if self._reading_paused and not self._closed:
+            self._reading_paused = False
+            self.transport.resume_reading()
+
+    def pause_writing(self):
+        self._paused = True
+
+    def resume_writing(self):
+        self._paused = False
+        waiter = self._drain_waiter
+        if waiter is not None:
+            self._drain_waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def drain(self):
+        """Waits until the write buffer of the transport is drained"""
+        if self._closed:
+            raise ConnectionError('Socket closed on remote end')
+        if not self._paused:
+            return
+        loop = self._loop or asyncio.get_event_loop()
+        self._drain_waiter = loop.create_future()
+        try:
+            await self._drain_waiter
+        finally:
+            self._drain_waiter = None
+        if self._closed:
+            raise ConnectionError('Socket closed on remote end')
+
+    def set_exception(self, exc):
+        """Wakes up the parser waiting for data with ``exc``"""
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_exception(exc)
+
+    def _wakeup(self):
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def wait_for_data(self):
+        """Waits until new data has been fed into the parser"""
+        if self._closed:
+            if self._exception is not None:
+                raise ConnectionError("Error while reading from socket: %s" %
+                                      (self._exception.args,))
+            raise ConnectionError('Socket closed on remote end')
+        if self._waiter is not None:
+            raise RuntimeError('wait_for_data() called while another '
+                               'coroutine is already waiting for data')
+        loop = self._loop or asyncio.get_event_loop()
+        self._waiter = loop.create_future()
+        try:
+            await self._waiter
+        finally:
+            self._waiter = None
+        if self._closed and self._exception is not None:
+            raise ConnectionError("Error while reading from socket: %s" %
+                                  (self._exception.args,))
+
+
 class SocketBuffer:
+    """
+    Receive buffer of the PythonParser.
+
+    Data read from the socket is appended to a growable bytearray and
+    consumed by moving an offset forward. Replies are sliced out of the
+    buffer through a memoryview so that every payload is copied exactly
+    once, and consumed bytes are dropped from the front of the buffer
+    before it grows again.
+
+    When the stream is a RedisProtocol the data is fed into the buffer by
+    the protocol as soon as it is received, and reading from the socket
+    only waits for the next chunk.
+    """
+
     def __init__(self, stream_reader, read_size):
         self._stream = stream_reader
+        self._fed = isinstance(stream_reader, RedisProtocol)
         self.read_size = read_size
-        self._buffer = BytesIO()
-        # number of bytes written to the buffer from the socket
-        self.bytes_written = 0
-        # number of bytes read from the buffer
+        self._buffer = bytearray()
+        # memoryview over the buffer, it must be released before the
+        # buffer is resized
+        self._view = None
+        # offset of the first unread byte in the buffer
+        self._offset = 0
+        # bytes received from the socket
         self.bytes_read = 0
 
     @property
     def length(self):
-        return self.bytes_written - self.bytes_read
+        return len(self._buffer) - self._offset
+
+    def _release_view(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+
+    def _slice(self, start, end):
+        view = self._view
+        if view is None:
+            view = self._view = memoryview(self._buffer)
+        return view[start:end].tobytes()
+
+    def _compact(self):
+        """Drops the consumed bytes from the front of the buffer"""
+        if self._offset:
+            self._release_view()
+            # deleting from the front of a bytearray does not move the
+            # remaining bytes, the start of the buffer is simply advanced
+            del self._buffer[:self._offset]
+            self._offset = 0
+
+    def feed(self, data):
+        """Appends data received from the socket"""
+        self._compact()
+        self._release_view()
+        self._buffer += data
+        self.bytes_read += len(data)
 
     async def _read_from_socket(self, length=None):
-        buf = self._buffer
-        buf.seek(self.bytes_written)
         marker = 0
-
         try:
             while True:
-                data = await self._stream.read(self.read_size)
-                # an empty string indicates the server shutdown the socket
-                if isinstance(data, bytes) and len(data) == 0:
-                    raise ConnectionError('Socket closed on remote end')
-                buf.write(data)
-                data_length = len(data)
-                self.bytes_written += data_length
-                marker += data_length
+                if self._fed:
+                    buffered = self.length
+                    await self._stream.wait_for_data()
+                    marker += self.length - buffered
+                else:
+                    data = await self._stream.read(self.read_size)
+                    # an empty string indicates the server shutdown the socket
+                    if isinstance(data, bytes) and len(data) == 0:
+                        raise ConnectionError('Socket closed on remote end')
+                    self.feed(data)
+                    marker += len(data)
 
                 if length is not None and length > marker:
                     continue
@@ -81,52 +312,66 @@ class SocketBuffer:
             raise ConnectionError("Error while reading from socket: %s" %
                                   (e.args,))
 
-    async def read(self, length):
-        length = length + 2  # make sure to read the \r\n terminator
-        # make sure we've read enough data from the socket
-        if length > self.length:
-            await self._read_from_socket(length - self.length)
-
-        self._buffer.seek(self.bytes_read)
-        data = self._buffer.read(length)
-        self.bytes_read += len(data)
+    async def fill(self):
+        """Reads the next chunk of data from the socket"""
+        await self._read_from_socket()
 
-        # purge the buffer when we've consumed it all so it doesn't
-        # grow forever
-        if self.bytes_read == self.bytes_written:
-            self.purge()
+    def read_nowait(self, length):
+        """
+        Returns the next ``length`` bytes or None if they are not completely
+        buffered yet
+        """
+        # the \r\n terminator has to be buffered as well
+        if length + 2 > self.length:
+            return None
+        start = self._offset
+        self._offset = start + length + 2
+        return self._slice(start, start + length)
+
+    def readline_nowait(self):
+        """
+        Returns the next line without the \r\n terminator or None if it is
+        not completely buffered yet
+        """
+        end = self._buffer.find(SYM_CRLF, self._offset)
+        if end == -1:
+            return None
+        start = self._offset
+        self._offset = end + 2
+        return self._slice(start, end)
+
+    def read_buffered(self, length=None):
+        """Returns up to ``length`` bytes of the buffered data"""
+        start = self._offset
+        end = len(self._buffer)
+        if length is not None:
+            end = min(end, start + length)
+        self._offset = end
+        return self._slice(start, end)
 
-        return data[:-2]
+    async def read(self, length):
+        # make sure we've read enough data from the socket, including
+        # the \r\n terminator
+        if length + 2 > self.length:
+            await self._read_from_socket(length + 2 - self.length)
+        return self.read_nowait(length)
 
     async def readline(self):
-        buf = self._buffer
-        buf.seek(self.bytes_read)
-        data = buf.readline()
-        while not data.endswith(SYM_CRLF):
+        data = self.readline_nowait()
+        while data is None:
             # there's more data in the socket that we need
             await self._read_from_socket()
-            buf.seek(self.bytes_read)
-            data = buf.readline()
-
-        self.bytes_read += len(data)
-
-        # purge the buffer when we've consumed it all so it doesn't
-        # grow forever
-        if self.bytes_read == self.bytes_written:
-            self.purge()
-
-        return data[:-2]
+            data = self.readline_nowait()
+        return data
 
     def purge(self):
-        self._buffer.seek(0)
-        self._buffer.truncate()
-        self.bytes_written = 0
-        self.bytes_read = 0
+        self._release_view()
+        self._buffer.clear()
+        self._offset = 0
 
     def close(self):
         try:
             self.purge()
-            self._buffer.close()
         except:
             # issue #633 suggests the purge/close somehow raised a
             # BadFileDescriptor error. Perhaps the client ran out of
@@ -135,7 +380,7 @@ class SocketBuffer:
             # removing the reference to the instance below.
             pass
         self._buffer = None
-        self._sock = None
+        self._stream = None
 
 
 class BaseParser:
@@ -156,6 +401,37 @@ class BaseParser:
         'CROSSSLOT': ClusterCrossSlotError,
     }
 
+    # called with the RESP3 push messages instead of returning them as replies
+    push_handler = None
+    # bytes received from the socket
+    bytes_read = 0
+
+    def set_push_handler(self, handler):
+        """
+        Sets the callable receiving the RESP3 push messages, which are
+        returned as replies when no handler is set
+        """
+        self.push_handler = handler
+
+    def socket_buffer(self):
+        """
+        Returns a SocketBuffer of the data received from the socket, which
+        is not fed into the parser until release_socket_buffer() is called
+        """
+        buffer = SocketBuffer(self._stream, self._read_size)
+        if isinstance(self._stream, RedisProtocol):
+            self._stream.set_parser(buffer)
+        return buffer
+
+    def release_socket_buffer(self, buffer):
+        if isinstance(self._stream, RedisProtocol):
+            self._stream.set_parser(self)
+        # the data left in the buffer is counted again when it is fed
+        self.bytes_read += buffer.bytes_read - buffer.length
+        if buffer.length:
+            self.feed(buffer.read_buffered())
+        buffer.close()
+
     def parse_error(self, response):
         """Parse an error response"""
         error_code = response.split(' ')[0]
@@ -169,11 +445,24 @@ class BaseParser:
 
 
 class PythonParser(BaseParser):
+    """
+    Plain Python parsing class
+
+    Replies are parsed from the buffered data in a single synchronous pass,
+    the parser only awaits when it needs more data from the socket. Nested
+    arrays are tracked with an explicit stack which is kept between reads,
+    so that large replies are neither parsed recursively nor reparsed
+    when they span many reads.
+    """
+
     def __init__(self, read_size):
         self._stream = None
         self._buffer = None
         self._read_size = read_size
         self.encoding = None
+        # bytes read by the buffers of the previous connections
+        self._bytes_read = 0
+        self._reset_state()
 
     def __del__(self):
         try:
@@ -181,20 +470,51 @@ class PythonParser(BaseParser):
         except Exception:
             pass
 
+    def _reset_state(self):
+        # [items, number of missing elements, type byte] of the aggregate
+        # replies being parsed
+        self._stack = []
+        # length and type byte of the bulk string whose header has already
+        # been parsed
+        self._bulk_length = None
+        self._bulk_type = None
+
     def on_connect(self, connection):
         """Called when the stream connects"""
         self._stream = connection._reader
         self._buffer = SocketBuffer(self._stream, self._read_size)
+        self._reset_state()
         if connection.decode_responses:
             self.encoding = connection.encoding
+        if isinstance(self._stream, RedisProtocol):
+            self._stream.set_parser(self)
+
+    def feed(self, data):
+        """Called by RedisProtocol with the data received from the socket"""
+        self._buffer.feed(data)
+
+    def socket_buffer(self):
+        # the parser reads from a SocketBuffer already
+        return self._buffer
+
+    def release_socket_buffer(self, buffer):
+        pass
+
+    @property
+    def bytes_read(self):
+        if self._buffer is None:
+            return self._bytes_read
+        return self._bytes_read + self._buffer.bytes_read
 
     def on_disconnect(self):
         """Called when the stream disconnects"""
         if self._stream is not None:
             self._stream = None
         if self._buffer is not None:
+            self._bytes_read += self._buffer.bytes_read
             self._buffer.close()
             self._buffer = None
+        self._reset_state()
         self.encoding = None
 
     def can_read(self):
@@ -203,53 +523,187 @@ class PythonParser(BaseParser):
     async def read_response(self):
         if not self._buffer:
             raise ConnectionError('Socket closed on remote end')
-        response = await self._buffer.readline()
-        if not response:
-            raise ConnectionError('Socket closed on remote end')
-
-        byte, response = chr(response[0]), response[1:]
-
-        if byte not in ('-', '+', ':', '$', '*'):
-            raise InvalidResponse("Protocol Error: %s, %s" %
-                                  (str(byte), str(response)))
-
-        # server returned an error
-        if byte == '-':
-            response = response.decode()
-            error = self.parse_error(response)
-            # if the error is a ConnectionError, raise immediately so the user
-            # is notified
-            if isinstance(error, ConnectionError):
-                raise error
-            # otherwise, we're dealing with a ResponseError that might belong
-            # inside a pipeline response. the connection's read_response()
-            # and/or the pipeline's execute() will raise this error if
-            # necessary, so just return the exception instance here.
-            return error
-        # single value
-        elif byte == '+':
-            pass
-        # int value
-        elif byte == ':':
-            response = int(response)
-        # bulk response
-        elif byte == '$':
-            length = int(response)
-            if length == -1:
-                return None
-            response = await self._buffer.read(length)
-        # multi-bulk response
-        elif byte == '*':
-            length = int(response)
-            if length == -1:
-                return None
-            response = []
-            for i in range(length):
-                response.append(await self.read_response())
-        if isinstance(response, bytes) and self.encoding:
-            response = response.decode(self.encoding)
+        response = self._parse_buffered()
+        while response is NOT_ENOUGH_DATA:
+            await self._buffer.fill()
+            response = self._parse_buffered()
         return response
 
+    def _parse_buffered(self):
+        """
+        Parses a reply out of the buffered data, returns NOT_ENOUGH_DATA if
+        the reply is not completely buffered yet.
+        """
+        # the buffer is scanned in place, payloads are copied out of it
+        # (or decoded from it) exactly once
+        buffer = self._buffer
+        data = buffer._buffer
+        pos = buffer._offset
+        size = len(data)
+        view = memoryview(data)
+        encoding = self.encoding
+        stack = self._stack
+        try:
+            while True:
+                length = self._bulk_length
+                if length is None:
+                    end = data.find(SYM_CRLF, pos)
+                    if end == -1:
+                        return NOT_ENOUGH_DATA
+                    if end == pos:
+                        self._reset_state()
+                        raise ConnectionError('Socket closed on remote end')
+                    byte = data[pos]
+                    start, pos = pos + 1, end + 2
+
+                    # bulk response: '$'
+                    if byte == 36:
+                        length = int(data[start:end])
+                        if length == -1:
+                            response = None
+                        elif pos + length + 2 > size:
+                            self._bulk_length = length
+                            self._bulk_type = byte
+                            return NOT_ENOUGH_DATA
+                        elif encoding:
+                            response = str(view[pos:pos + length], encoding)
+                            pos += length + 2
+                        else:
+                            response = view[pos:pos + length].tobytes()
+                            pos += length + 2
+                    # multi-bulk response: '*'
+                    elif byte == 42:
+                        length = int(data[start:end])
+                        if length == -1:
+                            response = None
+                        elif length == 0:
+                            response = []
+                        else:
+                            stack.append([[], length, byte])
+                            continue
+                    # single value: '+'
+                    elif byte == 43:
+                        if encoding:
+                            response = str(view[start:end], encoding)
+                        else:
+                            response = view[start:end].tobytes()
+                    # int value: ':'
+                    elif byte == 58:
+                        response = int(data[start:end])
+                    # server returned an error: '-'
+                    elif byte == 45:
+                        response = self.parse_error(str(view[start:end], 'utf-8'))
+                        # if the error is a ConnectionError, raise immediately
+                        # so the user is notified
+                        if isinstance(response, ConnectionError):
+                            self._reset_state()
+                            raise response
+                        # otherwise, we're dealing with a ResponseError that
+                        # might belong inside a pipeline response. the
+                        # connection's read_response() and/or the pipeline's
+                        # execute() will raise this error if necessary, so
+                        # just return the exception instance here.
+                    # RESP3 map: '%', set: '~', push: '>', attribute: '|'
+                    elif byte in RESP3_AGGREGATE_TYPES:
+                        length = int(data[start:end])
+                        if byte == 37 or byte == 124:
+                            length *= 2
+                        if length > 0:
+                            stack.append([[], length, byte])
+                            continue
+                        response = self._aggregate(byte, [])
+                        if response is NOT_A_REPLY:
+                            continue
+                    # RESP3 null: '_'
+                    elif byte == 95:
+                        response = None
+                    # RESP3 boolean: '#'
+                    elif byte == 35:
+                        response = data[start] == 116
+                    # RESP3 double: ','
+                    elif byte == 44:
+                        response = float(data[start:end])
+                    # RESP3 big number: '('
+                    elif byte == 40:
+                        response = int(data[start:end])
+                    # RESP3 verbatim string: '=', blob error: '!'
+                    elif byte == 61 or byte == 33:
+                        length = int(data[start:end])
+                        if pos + length + 2 > size:
+                            self._bulk_length = length
+                            self._bulk_type = byte
+                            return NOT_ENOUGH_DATA
+                        response = self._blob(byte, view, pos, length)
+                        pos += length + 2
+                    else:
+                        self._reset_state()
+                        raise InvalidResponse("Protocol Error: %s, %s" %
+                                              (chr(byte), str(data[start:end])))
+                # the payload of a bulk response whose header was parsed in
+                # a previous pass
+                elif pos + length + 2 > size:
+                    return NOT_ENOUGH_DATA
+                else:
+                    self._bulk_length = None
+                    if self._bulk_type != 36:
+                        response = self._blob(self._bulk_type, view, pos, length)
+                    elif encoding:
+                        response = str(view[pos:pos + length], encoding)
+                    else:
+                        response = view[pos:pos + length].tobytes()
+                    pos += length + 2
+
+                # append the value to the aggregates it completes
+                while stack:
+                    frame = stack[-1]
+                    frame[0].append(response)
+                    frame[1] -= 1
+                    if frame[1]:
+                        break
+                    stack.pop()
+                    if frame[2] == 42:
+                        response = frame[0]
+                    else:
+                        response = self._aggregate(frame[2], frame[0])
+                        if response is NOT_A_REPLY:
+                            break
+                else:
+                    return response
+        finally:
+            view.release()
+            buffer._offset = pos
+
+    def _aggregate(self, byte, items):
+        """Builds a RESP3 aggregate reply out of its elements"""
+        if byte == 37:
+            it = iter(items)
+            return dict(zip(it, it))
+        if byte == 126:
+            try:
+                return set(items)
+            except TypeError:
+                # elements which can not be hashed are kept in a list
+                return items
+        if byte == 62 and self.push_handler is None:
+            return items
+        if byte == 62:
+            self.push_handler(items)
+        # attributes are dropped, the value they annotate follows them
+        return NOT_A_REPLY
+
+    def _blob(self, byte, view, pos, length):
+        """Returns the value of a RESP3 verbatim string or blob error"""
+        if byte == 33:
+            response = self.parse_error(str(view[pos:pos + length], 'utf-8'))
+            if isinstance(response, ConnectionError):
+                self._reset_state()
+                raise response
+            return response
+        # the first 4 bytes of a verbatim string are its format, e.g. 'txt:'
+        if self.encoding:
+            return str(view[pos + 4:pos + length], self.encoding)
+        return view[pos + 4:pos + length].tobytes()
+
 
 class HiredisParser(BaseParser):
     """Parser class for connections using Hiredis"""
@@ -285,6 +739,13 @@ class HiredisParser(BaseParser):
             kwargs['encoding'] = connection.encoding
         self._reader = hiredis.Reader(**kwargs)
         self._next_response = False
+        if isinstance(self._stream, RedisProtocol):
+            self._stream.set_parser(self)
+
+    def feed(self, data):
+        """Called by RedisProtocol with the data received from the socket"""
+        self._reader.feed(data)
+        self.bytes_read += len(data)
 
     def on_disconnect(self):
         if self._stream is not None:
@@ -304,6 +765,11 @@ class HiredisParser(BaseParser):
 
         response = self._reader.gets()
         while response is False:
+            if isinstance(self._stream, RedisProtocol):
+                # the protocol feeds the reader as soon as data is received
+                await self._stream.wait_for_data()
+                response = self._reader.gets()
+                continue
             try:
                 buffer = await self._stream.read(self._read_size)
             # CancelledError will be caught by client so that command won't be retried again
@@ -316,16 +782,237 @@ class HiredisParser(BaseParser):
             if not buffer:
                 raise ConnectionError("Socket closed on remote end")
             self._reader.feed(buffer)
+            self.bytes_read += len(buffer)
             response = self._reader.gets()
         if isinstance(response, ResponseError):
             response = self.parse_error(response.args[0])
         return response
 
 
+class SpeedupsParser(BaseParser):
+    """
+    Parser class for connections using the reader of the aredis C extension
+
+    Error replies are mapped through EXCEPTION_CLASSES by the reader itself,
+    including the ones nested in arrays.
+    """
+
+    def __init__(self, read_size):
+        if not SPEEDUPS_READER_AVAILABLE:
+            raise RedisError("aredis speedups extension is not built")
+        self._stream = None
+        self._reader = None
+        self._read_size = read_size
+        self._next_response = NOT_ENOUGH_DATA
+
+    def __del__(self):
+        try:
+            self.on_disconnect()
+        except Exception:
+            pass
+
+    def can_read(self):
+        if not self._reader:
+            raise ConnectionError("Socket closed on remote end")
+
+        if self._next_response is NOT_ENOUGH_DATA:
+            self._next_response = self._reader.gets()
+        return self._next_response is not NOT_ENOUGH_DATA
+
+    def on_connect(self, connection):
+        self._stream = connection._reader
+        kwargs = {
+            'protocolError': InvalidResponse,
+            'replyError': self.parse_error,
+            # RESP3 booleans make False a valid reply
+            'notEnoughData': NOT_ENOUGH_DATA,
+        }
+        if connection.decode_responses:
+            kwargs['encoding'] = connection.encoding
+        self._reader = SpeedupsReader(**kwargs)
+        if self.push_handler is not None:
+            self._reader.set_push_handler(self.push_handler)
+        self._next_response = NOT_ENOUGH_DATA
+        if isinstance(self._stream, RedisProtocol):
+            self._stream.set_parser(self)
+
+    def feed(self, data):
+        """Called by RedisProtocol with the data received from the socket"""
+        self._reader.feed(data)
+        self.bytes_read += len(data)
+
+    def on_disconnect(self):
+        if self._stream is not None:
+            self._stream = None
+        self._reader = None
+        self._next_response = NOT_ENOUGH_DATA
+
+    def set_push_handler(self, handler):
+        self.push_handler = handler
+        if self._reader is not None:
+            self._reader.set_push_handler(handler)
+
+    async def read_response(self):
+        if not self._stream:
+            raise ConnectionError("Socket closed on remote end")
+
+        # _next_response might be cached from a can_read() call
+        if self._next_response is not NOT_ENOUGH_DATA:
+            response = self._next_response
+            self._next_response = NOT_ENOUGH_DATA
+        else:
+            response = self._reader.gets()
+        while response is NOT_ENOUGH_DATA:
+            if isinstance(self._stream, RedisProtocol):
+                # the protocol feeds the reader as soon as data is received
+                await self._stream.wait_for_data()
+                response = self._reader.gets()
+                continue
+            try:
+                buffer = await self._stream.read(self._read_size)
+            except aredis.compat.CancelledError:
+                raise
+            except Exception:
+                e = sys.exc_info()[1]
+                raise ConnectionError("Error {} while reading from stream: {}".format(type(e), e.args))
+            if not buffer:
+                raise ConnectionError("Socket closed on remote end")
+            self._reader.feed(buffer)
+            self.bytes_read += len(buffer)
+            response = self._reader.gets()
+        # if the error is a ConnectionError, raise immediately so the user
+        # is notified
+        if isinstance(response, ConnectionError):
+            raise response
+        return response
+
+
+if SPEEDUPS_READER_AVAILABLE:
+    RESP3Parser = SpeedupsParser
+else:
+    RESP3Parser = PythonParser
+
 if HIREDIS_AVAILABLE:
     DefaultParser = HiredisParser
 else:
-    DefaultParser = PythonParser
+    DefaultParser = RESP3Parser
+
+
+class BulkReader:
+    """
+    Reads the payload of the next bulk string reply of a connection in
+    chunks, as they are received from the socket, instead of parsing the
+    reply as a whole.
+
+    The reader has to be created before the command is sent, the replies of
+    the connection are fed into the parser again once it is closed.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self._parser = connection._parser
+        self._buffer = self._parser.socket_buffer()
+        self._protocol = connection._reader
+        if not isinstance(self._protocol, RedisProtocol):
+            self._protocol = None
+        # bytes of the payload which are not read yet
+        self._remaining = None
+
+    async def _fill(self):
+        protocol = self._protocol
+        if protocol is not None:
+            protocol.resume_reading()
+        connection = self.connection
+        try:
+            if connection._stream_timeout is None:
+                await self._buffer.fill()
+            else:
+                await connection._read_before_deadline(self._buffer.fill())
+        except Exception as exc:
+            self._finish_event(exc)
+            raise
+        if protocol is not None:
+            # the payload is not received faster than it is consumed
+            protocol.pause_reading()
+
+    async def read_length(self):
+        """
+        Reads the header of the reply, returns the length of the payload or
+        None if the reply is nil
+        """
+        buffer = self._buffer
+        line = buffer.readline_nowait()
+        while line is None:
+            await self._fill()
+            line = buffer.readline_nowait()
+        byte, response = line[:1], line[1:]
+        if byte == b'-' or byte == b'!':
+            if byte == b'!':
+                # RESP3 blob error
+                response = await self._read_payload(int(response))
+            error = self._parser.parse_error(nativestr(response))
+            self._done(error)
+            raise error
+        if byte == b'_':
+            self._done()
+            return None
+        if byte != b'$':
+            raise InvalidResponse('Protocol Error: {!r} is not a bulk string reply'.format(line))
+        length = int(response)
+        if length == -1:
+            self._done()
+            return None
+        self._remaining = length
+        return length
+
+    async def _read_payload(self, length):
+        data = self._buffer.read_nowait(length)
+        while data is None:
+            await self._fill()
+            data = self._buffer.read_nowait(length)
+        return data
+
+    async def read(self, size):
+        """
+        Returns the next chunk of the payload, of at most ``size`` bytes, or
+        an empty bytes object once the payload is completely read
+        """
+        remaining = self._remaining
+        if not remaining:
+            return b''
+        buffer = self._buffer
+        if not buffer.length:
+            await self._fill()
+        # whatever is buffered is returned without waiting for a full chunk
+        chunk = buffer.read_buffered(min(size, remaining))
+        remaining -= len(chunk)
+        self._remaining = remaining
+        if not remaining:
+            # the \r\n terminator of the payload
+            await self._read_payload(0)
+            self._done()
+        return chunk
+
+    def _done(self, error=None):
+        connection = self.connection
+        connection.awaiting_response = False
+        connection.last_active_at = time.time()
+        self._finish_event(error)
+
+    def _finish_event(self, error=None):
+        # the reply is not read by read_response, the event queued by the
+        # hooks when the command was sent is finished here
+        connection = self.connection
+        if connection._events:
+            connection.finish_event(connection._events.popleft(), error)
+
+    def close(self):
+        """Feeds the replies of the connection into its parser again"""
+        if self._protocol is not None:
+            self._protocol.resume_reading()
+        if self._buffer is not None:
+            self._parser.release_socket_buffer(self._buffer)
+            self._buffer = None
 
 
 class RedisSSLContext:
@@ -365,11 +1052,36 @@ class BaseConnection:
     description = 'BaseConnection'
 
     def __init__(self, retry_on_timeout=False, stream_timeout=None,
-                 parser_class=DefaultParser, reader_read_size=65535,
+                 parser_class=None, reader_read_size=65535,
                  encoding='utf-8', decode_responses=False,
-                 *, loop=None):
+                 *, loop=None, write_high_watermark=None,
+                 write_low_watermark=None, protocol_version=2,
+                 buffer_cutoff=6000):
+        if protocol_version not in (2, 3):
+            raise ValueError('"protocol_version" must be 2 or 3')
+        if parser_class is None:
+            # hiredis does not route the push frames of RESP3
+            parser_class = RESP3Parser if protocol_version == 3 else DefaultParser
+        elif protocol_version == 3 and parser_class is HiredisParser:
+            raise ValueError('RESP3 requires the PythonParser or the SpeedupsParser')
         self._parser = parser_class(reader_read_size)
+        # RESP3 is negotiated with HELLO when connecting
+        self.protocol_version = protocol_version
+        # arguments larger than this are written to the transport as they
+        # are instead of being copied into the packed command
+        self.buffer_cutoff = buffer_cutoff
         self._stream_timeout = stream_timeout
+        # limits of the write buffer of the transport, None keeps the
+        # defaults of asyncio
+        self._write_high_watermark = write_high_watermark
+        self._write_low_watermark = write_low_watermark
+        self._write_limit = None
+        # stream timeouts are enforced by a single timer per connection,
+        # which is re-armed only when it fires before the current deadline
+        self._deadline = None
+        self._deadline_handle = None
+        self._reading = False
+        self._timed_out = False
         self._reader = None
         self._writer = None
         self.password = ''
@@ -384,6 +1096,27 @@ class BaseConnection:
         # flag to show if a connection is waiting for response
         self.awaiting_response = False
         self.last_active_at = time.time()
+        # number of successful connections, more than one means reconnections
+        self.connects = 0
+        # id of the client receiving the CLIENT TRACKING invalidations of
+        # this connection, tracking is off after a reconnection
+        self.tracking_redirect = None
+        # called with the connection when it disconnects with tracking on,
+        # the keys it read are no longer tracked by the server
+        self.tracking_lost_callback = None
+        # a PING is sent along with the next command, see
+        # check_health_with_next_command
+        self._health_check_pending = False
+        # commands sent after the PING while its reply is not read yet,
+        # sent again on a new connection if the PING fails
+        self._health_checked_commands = None
+        # Hooks called around the commands, set by the connection pool
+        self.hooks = None
+        # bytes sent to the server, only counted while hooks are set
+        self.bytes_written = 0
+        # events of the commands sent whose replies are not read yet
+        self._events = None
+        self._address = None
 
     def __repr__(self):
         return self.description.format(**self._description_args)
@@ -398,6 +1131,195 @@ class BaseConnection:
     def is_connected(self):
         return bool(self._reader and self._writer)
 
+    @property
+    def _transport(self):
+        return self._writer.transport if self._writer else None
+
+    @property
+    def write_buffer_size(self):
+        """
+        Number of bytes written to the connection but not sent to the server
+        yet, which bulk loaders can use to pace themselves
+        """
+        transport = self._transport
+        return transport.get_write_buffer_size() if transport else 0
+
+    @property
+    def bytes_read(self):
+        """Bytes received from the server"""
+        return self._parser.bytes_read
+
+    def set_hooks(self, hooks):
+        """
+        Calls ``hooks``, an aredis.hooks.Hooks registry, around the commands
+        sent on this connection, or stops calling them if None.
+
+        The hooked methods are bound on the connection only while hooks are
+        set, so that connections without hooks run the plain methods. Each
+        command sent with `send_command` is paired with the next reply read.
+        """
+        if hooks is None:
+            for name in ('send_command', 'send_packed_command',
+                         'read_response', 'disconnect'):
+                self.__dict__.pop(name, None)
+            self._events = None
+        elif self.hooks is None:
+            args = self._description_args
+            self._address = args.get('path') or '{}:{}'.format(
+                args.get('host'), args.get('port'))
+            self._events = deque()
+            self.send_command = self._hooked_send_command
+            self.send_packed_command = self._hooked_send_packed_command
+            self.read_response = self._hooked_read_response
+            self.disconnect = self._hooked_disconnect
+        self.hooks = hooks
+
+    def start_event(self, command, commands=1):
+        """
+        Returns the CommandEvent of ``commands`` commands about to be sent,
+        after calling the ``before_send`` hooks with it
+        """
+        event = CommandEvent(command, commands, self._address)
+        for callback in self.hooks.before_send:
+            callback(event)
+        event.read_marker = self.bytes_read
+        event.started_at = time.perf_counter()
+        return event
+
+    def finish_event(self, event, error=None):
+        """
+        Calls the ``after_reply`` hooks with ``event`` once the reply of its
+        command(s) is read, or the ``on_error`` hooks if ``error`` is set
+        """
+        event.latency = time.perf_counter() - event.started_at
+        event.bytes_read = self.bytes_read - event.read_marker
+        if error is None:
+            callbacks = self.hooks.after_reply
+        else:
+            event.error = error
+            callbacks = self.hooks.on_error
+        for callback in callbacks:
+            callback(event)
+
+    async def instrument(self, command, commands, coroutine):
+        """
+        Awaits ``coroutine``, which sends ``commands`` commands on this
+        connection and reads their replies, giving them to the hooks as a
+        single ``command``
+        """
+        if not self.is_connected:
+            await self.connect()
+        event = self.start_event(command, commands)
+        written = self.bytes_written
+        try:
+            response = await coroutine
+        except Exception as exc:
+            event.bytes_written = self.bytes_written - written
+            self.finish_event(event, exc)
+            raise
+        event.bytes_written = self.bytes_written - written
+        self.finish_event(event)
+        return response
+
+    async def _hooked_send_command(self, *args):
+        event = self.start_event(args[0])
+        try:
+            if not self.is_connected:
+                await self.connect()
+            packed = self.pack_command(*args)
+            event.read_marker = self.bytes_read
+            await type(self).send_packed_command(self, packed)
+        except Exception as exc:
+            self.finish_event(event, exc)
+            raise
+        event.bytes_written = sum(map(len, packed))
+        self.bytes_written += event.bytes_written
+        self._events.append(event)
+        self.awaiting_response = True
+        self.last_active_at = time.time()
+
+    async def _hooked_send_packed_command(self, command):
+        if isinstance(command, str):
+            command = [command]
+        await type(self).send_packed_command(self, command)
+        self.bytes_written += sum(map(len, command))
+
+    async def _hooked_read_response(self):
+        if not self._events:
+            # replies of packed commands and pubsub messages
+            return await type(self).read_response(self)
+        event = self._events.popleft()
+        try:
+            response = await type(self).read_response(self)
+        except Exception as exc:
+            self.finish_event(event, exc)
+            raise
+        self.finish_event(event)
+        return response
+
+    def _hooked_disconnect(self):
+        type(self).disconnect(self)
+        # the replies of the commands sent are lost
+        self._events.clear()
+
+    def set_push_handler(self, handler):
+        """
+        Sets the callable invoked with the push frames (such as client
+        tracking invalidations) received on a RESP3 connection, without a
+        handler they are returned as regular replies
+        """
+        self._parser.set_push_handler(handler)
+
+    async def bulk_reader(self):
+        """
+        Returns a BulkReader streaming the payload of the reply of the next
+        command sent, it has to be closed once the reply is read
+        """
+        if not self.is_connected:
+            await self.connect()
+        if self._health_check_pending:
+            # the reply of the PING can not be read before the streamed one
+            await self.check_health()
+        return BulkReader(self)
+
+    async def check_health(self):
+        """
+        Sends a PING to check that the connection still works, and connects
+        again if it does not. The PING is not given to the hooks.
+        """
+        self._health_check_pending = False
+        try:
+            await type(self).send_packed_command(self, [SYM_PING])
+            if nativestr(await type(self).read_response(self)) != 'PONG':
+                raise ConnectionError('Bad response to PING')
+        except (ConnectionError, TimeoutError):
+            self.disconnect()
+            await self.connect()
+
+    def check_health_with_next_command(self):
+        """
+        Sends a PING along with the next command to check that the
+        connection still works, without a round trip of its own. The reply
+        of the PING is read before the one of the command, and if the PING
+        fails the command is sent again on a new connection.
+        The PING is not given to the hooks.
+        """
+        if self.is_connected:
+            self._health_check_pending = True
+
+    async def _read_health_check(self):
+        commands, self._health_checked_commands = self._health_checked_commands, None
+        try:
+            response = await self._read_reply()
+            if not isinstance(response, bytes) or nativestr(response) != 'PONG':
+                raise ConnectionError('Bad response to PING')
+        except (ConnectionError, TimeoutError):
+            # the commands were lost with the connection, the replies read
+            # by the callers are the ones of the new connection
+            type(self).disconnect(self)
+            await self.connect()
+            await type(self).send_packed_command(self, commands)
+
     def register_connect_callback(self, callback):
         self._connect_callbacks.append(callback)
 
@@ -417,6 +1339,7 @@ class BaseConnection:
             raise
         except Exception as exc:
             raise ConnectionError()
+        self.connects += 1
         # run any user callbacks. right now the only internal callback
         # is for pubsub channel/pattern resubscription
         for callback in self._connect_callbacks:
@@ -430,11 +1353,40 @@ class BaseConnection:
     async def _connect(self):
         raise NotImplementedError
 
+    def _get_write_limit(self, transport):
+        try:
+            return transport.get_write_buffer_limits()[1]
+        except (AttributeError, NotImplementedError):
+            # the SSL transports only tell their limits since Python 3.11,
+            # the high watermark is then computed as asyncio does
+            if self._write_high_watermark is not None:
+                return self._write_high_watermark
+            if self._write_low_watermark is not None:
+                return 4 * self._write_low_watermark
+            return 64 * 1024
+
     async def on_connect(self):
         self._parser.on_connect(self)
 
+        transport = self._transport
+        if self._write_high_watermark is not None or self._write_low_watermark is not None:
+            transport.set_write_buffer_limits(self._write_high_watermark,
+                                              self._write_low_watermark)
+        # writes are drained only once the buffer exceeds the high watermark
+        self._write_limit = self._get_write_limit(transport)
+
+        if self.protocol_version == 3:
+            # HELLO switches the protocol and authenticates at once
+            args = ['HELLO', 3]
+            if self.password:
+                args.extend(['AUTH', 'default', self.password])
+            await self.send_command(*args)
+            try:
+                await self.read_response()
+            except ResponseError as exc:
+                raise ConnectionError('Unable to switch to RESP3: {}'.format(exc))
         # if a password is specified, authenticate
-        if self.password:
+        elif self.password:
             await self.send_command('AUTH', self.password)
             if nativestr(await self.read_response()) != 'OK':
                 raise ConnectionError('Invalid Password')
@@ -447,17 +1399,70 @@ class BaseConnection:
         self.last_active_at = time.time()
 
     async def read_response(self):
-        try:
-            response = await exec_with_timeout(self._parser.read_response(), self._stream_timeout, loop=self.loop)
-            self.last_active_at = time.time()
-        except TimeoutError:
-            self.disconnect()
-            raise
+        if self._health_checked_commands is not None:
+            await self._read_health_check()
+        response = await self._read_reply()
         if isinstance(response, RedisError):
             raise response
         self.awaiting_response = False
         return response
 
+    async def _read_reply(self):
+        if self._stream_timeout is None:
+            response = await self._parser.read_response()
+        else:
+            response = await self._read_before_deadline(self._parser.read_response())
+        self.last_active_at = time.time()
+        return response
+
+    async def _read_before_deadline(self, coroutine):
+        """
+        Awaits ``coroutine``, which reads from the socket, and raises
+        TimeoutError if it does not complete within the stream timeout
+        """
+        loop = self.loop or asyncio.get_event_loop()
+        self._deadline = loop.time() + self._stream_timeout
+        # the timer of a previous read is still armed at an earlier time,
+        # it is pushed back to the new deadline when it fires
+        if self._deadline_handle is None:
+            self._deadline_handle = loop.call_at(self._deadline, self._on_deadline)
+        self._reading = True
+        try:
+            result = await coroutine
+        except aredis.compat.CancelledError:
+            # the caller's cancellation is never turned into a timeout
+            if self._timed_out:
+                self._timed_out = False
+                self.disconnect()
+            raise
+        except Exception:
+            # the read was woken up by the deadline
+            if not self._timed_out:
+                raise
+        finally:
+            self._reading = False
+        if self._timed_out:
+            # the stream can not be read anymore, even when the read
+            # completed before it was woken up
+            self._timed_out = False
+            self.disconnect()
+            raise TimeoutError('Timeout reading from socket')
+        return result
+
+    def _on_deadline(self):
+        self._deadline_handle = None
+        if not self._reading:
+            # no read in progress, the timer is armed again by the next read
+            return
+        loop = self.loop or asyncio.get_event_loop()
+        if loop.time() >= self._deadline:
+            # the read waiting for data is failed rather than its task
+            # cancelled, which leaves the cancellations to the callers
+            self._timed_out = True
+            self._reader.set_exception(TimeoutError('Timeout reading from socket'))
+        else:
+            self._deadline_handle = loop.call_at(self._deadline, self._on_deadline)
+
     async def send_packed_command(self, command):
         """Sends an already packed command to the Redis server"""
         if not self._writer:
@@ -465,8 +1470,21 @@ class BaseConnection:
         try:
             if isinstance(command, str):
                 command = [command]
-            self._writer.writelines(command)
-        except aredis.compat.TimeoutError:
+            if self._health_check_pending:
+                self._health_check_pending = False
+                self._health_checked_commands = list(command)
+                command = [SYM_PING] + self._health_checked_commands
+            elif self._health_checked_commands is not None:
+                self._health_checked_commands.extend(command)
+            if WRITELINES_JOINS and len(command) > 1:
+                self._write_pieces(command)
+            else:
+                self._writer.writelines(command)
+            # small writes never wait, large ones wait until the transport
+            # has sent enough data to be below the low watermark again
+            if self._transport.get_write_buffer_size() > self._write_limit:
+                await exec_with_timeout(self._drain(), self._stream_timeout, loop=self.loop)
+        except (aredis.compat.TimeoutError, TimeoutError):
             self.disconnect()
             raise TimeoutError("Timeout writing to socket")
         except Exception:
@@ -483,6 +1501,26 @@ class BaseConnection:
             self.disconnect()
             raise
 
+    async def _drain(self):
+        await self._writer.drain()
+
+    def _write_pieces(self, pieces):
+        # the views of the values larger than buffer_cutoff are given to
+        # the transport as they are, the small pieces in between are joined
+        write = self._writer.write
+        cutoff = self.buffer_cutoff
+        small = []
+        for piece in pieces:
+            if len(piece) > cutoff:
+                if small:
+                    write(SYM_EMPTY.join(small))
+                    small = []
+                write(piece)
+            else:
+                small.append(piece)
+        if small:
+            write(SYM_EMPTY.join(small))
+
     async def send_command(self, *args):
         if not self.is_connected:
             await self.connect()
@@ -491,7 +1529,11 @@ class BaseConnection:
         self.last_active_at = time.time()
 
     def encode(self, value):
-        """Returns a bytestring representation of the value"""
+        """
+        Returns a bytestring representation of the value, objects
+        supporting the buffer protocol (bytearray, memoryview, mmap...) are
+        returned as a flat memoryview of their data instead of being copied
+        """
         if isinstance(value, bytes):
             return value
         elif isinstance(value, int):
@@ -499,13 +1541,23 @@ class BaseConnection:
         elif isinstance(value, float):
             value = b(repr(value))
         elif not isinstance(value, str):
-            value = str(value)
+            try:
+                view = memoryview(value)
+            except TypeError:
+                value = str(value)
+            else:
+                if view.c_contiguous:
+                    return view.cast('B')
+                return view.tobytes()
         if isinstance(value, str):
             value = value.encode(self.encoding)
         return value
 
     def disconnect(self):
         """Disconnects from the Redis server"""
+        if self._deadline_handle is not None:
+            self._deadline_handle.cancel()
+            self._deadline_handle = None
         self._parser.on_disconnect()
         try:
             self._writer.close()
@@ -513,35 +1565,32 @@ class BaseConnection:
             pass
         self._reader = None
         self._writer = None
+        self._health_check_pending = False
+        self._health_checked_commands = None
+        if self.tracking_redirect is not None:
+            self.tracking_redirect = None
+            if self.tracking_lost_callback is not None:
+                self.tracking_lost_callback(self)
 
     def pack_command(self, *args):
         "Pack a series of arguments into the Redis protocol"
         output = []
-        # the client might have included 1 or more literal arguments in
-        # the command name, e.g., 'CONFIG GET'. The Redis server expects these
-        # arguments to be sent separately, so split the first argument
-        # manually. All of these arguements get wrapped in the Token class
-        # to prevent them from being encoded.
-        command = args[0]
-        if ' ' in command:
-            args = tuple([b(s) for s in command.split()]) + args[1:]
-        else:
-            args = (b(command),) + args[1:]
-
-        buff = SYM_EMPTY.join(
-            (SYM_STAR, b(str(len(args))), SYM_CRLF))
-        for arg in map(self.encode, args):
+        buffer_cutoff = self.buffer_cutoff
+        buff = pack_command_header(args[0], len(args))
+        for arg in map(self.encode, args[1:]):
             # to avoid large string mallocs, chunk the command into the
-            # output list if we're sending large values
-            if len(buff) > 6000 or len(arg) > 6000:
+            # output list if we're sending large values, which are passed
+            # to the transport as they are
+            arg_length = len(arg)
+            if len(buff) > buffer_cutoff or arg_length > buffer_cutoff:
                 buff = SYM_EMPTY.join(
-                    (buff, SYM_DOLLAR, b(str(len(arg))), SYM_CRLF))
+                    (buff, SYM_DOLLAR, b(str(arg_length)), SYM_CRLF))
                 output.append(buff)
-                output.append(b(arg))
+                output.append(arg)
                 buff = SYM_CRLF
             else:
-                buff = SYM_EMPTY.join((buff, SYM_DOLLAR, b(str(len(arg))),
-                                       SYM_CRLF, b(arg), SYM_CRLF))
+                buff = SYM_EMPTY.join((buff, SYM_DOLLAR, b(str(arg_length)),
+                                       SYM_CRLF, arg, SYM_CRLF))
         output.append(buff)
         return output
 
@@ -550,34 +1599,59 @@ class BaseConnection:
         output = []
         pieces = []
         buffer_length = 0
+        buffer_cutoff = self.buffer_cutoff
 
         for cmd in commands:
             for chunk in self.pack_command(*cmd):
-                pieces.append(chunk)
-                buffer_length += len(chunk)
-
-            if buffer_length > 6000:
-                output.append(SYM_EMPTY.join(pieces))
-                buffer_length = 0
-                pieces = []
+                chunk_length = len(chunk)
+                if buffer_length > buffer_cutoff or chunk_length > buffer_cutoff:
+                    if pieces:
+                        output.append(SYM_EMPTY.join(pieces))
+                    buffer_length = 0
+                    pieces = []
+                # large values are not copied into the joined pieces
+                if chunk_length > buffer_cutoff:
+                    output.append(chunk)
+                else:
+                    pieces.append(chunk)
+                    buffer_length += chunk_length
 
         if pieces:
             output.append(SYM_EMPTY.join(pieces))
         return output
 
+    if SPEEDUPS_PACKER_AVAILABLE:
+        # the C extension writes whole commands (or pipelines) into one
+        # preallocated buffer, values larger than buffer_cutoff bytes are
+        # sent as separate chunks. The methods above are the pure Python
+        # fallback.
+        def pack_command(self, *args):
+            "Pack a series of arguments into the Redis protocol"
+            return pack_command(args, self.encoding, self.buffer_cutoff)
+
+        def pack_commands(self, commands):
+            "Pack multiple commands into the Redis protocol"
+            return pack_commands(commands, self.encoding, self.buffer_cutoff)
+
 
 class Connection(BaseConnection):
     description = 'Connection<host={host},port={port},db={db}>'
 
     def __init__(self, host='127.0.0.1', port=6379, password=None,
                  db=0, retry_on_timeout=False, stream_timeout=None, connect_timeout=None,
-                 ssl_context=None, parser_class=DefaultParser, reader_read_size=65535,
+                 ssl_context=None, parser_class=None, reader_read_size=65535,
                  encoding='utf-8', decode_responses=False, socket_keepalive=None,
-                 socket_keepalive_options=None, *, loop=None):
+                 socket_keepalive_options=None, *, loop=None,
+                 write_high_watermark=None, write_low_watermark=None,
+                 protocol_version=2, buffer_cutoff=6000):
         super(Connection, self).__init__(retry_on_timeout, stream_timeout,
                                          parser_class, reader_read_size,
                                          encoding, decode_responses,
-                                         loop=loop)
+                                         loop=loop,
+                                         write_high_watermark=write_high_watermark,
+                                         write_low_watermark=write_low_watermark,
+                                         protocol_version=protocol_version,
+                                         buffer_cutoff=buffer_cutoff)
         self.host = host
         self.port = port
         self.password = password
@@ -603,7 +1677,11 @@ class Connection(BaseConnection):
         )
         self._reader = reader
         self._writer = writer
-        sock = writer.transport.get_extra_info('socket')
+        self._set_socket_options(writer.transport)
+        await self.on_connect()
+
+    def _set_socket_options(self, transport):
+        sock = transport.get_extra_info('socket')
         if sock is not None:
             sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
             try:
@@ -615,8 +1693,40 @@ class Connection(BaseConnection):
             except (socket.error, TypeError):
                 # `socket_keepalive_options` might contain invalid options
                 # causing an error. Do not leave the connection open.
-                writer.close()
+                transport.close()
                 raise
+
+
+class ProtocolConnection(Connection):
+    """
+    Connection built on a RedisProtocol instead of StreamReader/StreamWriter
+
+    Replies are fed into the parser straight from ``data_received``, which
+    saves a copy and an await per chunk read from the socket. The transport
+    itself is used as the writer of the connection.
+    """
+    description = 'ProtocolConnection<host={host},port={port},db={db}>'
+
+    @property
+    def _transport(self):
+        return self._writer
+
+    async def _drain(self):
+        await self._reader.drain()
+
+    async def _connect(self):
+        loop = self.loop or asyncio.get_event_loop()
+        transport, protocol = await exec_with_timeout(
+            loop.create_connection(lambda: RedisProtocol(loop=loop),
+                                   host=self.host,
+                                   port=self.port,
+                                   ssl=self.ssl_context),
+            self._connect_timeout,
+            loop=self.loop
+        )
+        self._reader = protocol
+        self._writer = transport
+        self._set_socket_options(transport)
         await self.on_connect()
 
 
@@ -625,12 +1735,18 @@ class UnixDomainSocketConnection(BaseConnection):
 
     def __init__(self, path='', password=None,
                  db=0, retry_on_timeout=False, stream_timeout=None, connect_timeout=None,
-                 ssl_context=None, parser_class=DefaultParser, reader_read_size=65535,
-                 encoding='utf-8', decode_responses=False, *, loop=None):
+                 ssl_context=None, parser_class=None, reader_read_size=65535,
+                 encoding='utf-8', decode_responses=False, *, loop=None,
+                 write_high_watermark=None, write_low_watermark=None,
+                 protocol_version=2, buffer_cutoff=6000):
         super(UnixDomainSocketConnection, self).__init__(retry_on_timeout, stream_timeout,
                                                          parser_class, reader_read_size,
                                                          encoding, decode_responses,
-                                                         loop=loop)
+                                                         loop=loop,
+                                                         write_high_watermark=write_high_watermark,
+                                                         write_low_watermark=write_low_watermark,
+                                                         protocol_version=protocol_version,
+                                                         buffer_cutoff=buffer_cutoff)
         self.path = path
         self.db = db
         self.password = password
@@ -0,0 +1,86 @@
+"""
+Hooks called around the commands sent to the server, to trace or measure
+the commands of a client without wrapping it.
+
+The hooks are kept by the connection pool and bound on its connections only
+while some are registered, the connections of a pool without hooks run the
+plain methods and do not pay for them.
+"""
+
+# names of the events hooks can be registered for
+HOOK_EVENTS = ('before_send', 'after_reply', 'on_error')
+
+
+class CommandEvent:
+    """
+    Command given to the hooks, its attributes are filled in as the command
+    is sent and its reply is read:
+
+    :command:
+        Name of the command, ``PIPELINE`` or ``MULTI`` for the pipelines.
+    :commands:
+        Number of commands sent.
+    :node:
+        Address of the server, ``host:port`` or path of the unix socket.
+    :bytes_written:
+        Size of the packed command(s), set once sent.
+    :bytes_read:
+        Bytes received from the server until the reply was read.
+    :latency:
+        Seconds between sending the command(s) and reading the reply.
+    :error:
+        Exception raised while sending the command or reading its reply,
+        for the ``on_error`` hooks.
+    """
+
+    __slots__ = ('command', 'commands', 'node', 'bytes_written', 'bytes_read',
+                 'latency', 'error', 'started_at', 'read_marker')
+
+    def __init__(self, command, commands, node):
+        self.command = command
+        self.commands = commands
+        self.node = node
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.latency = None
+        self.error = None
+        # time.perf_counter() and bytes read by the connection when the
+        # command was sent
+        self.started_at = None
+        self.read_marker = 0
+
+    def __repr__(self):
+        return '{}<command={},node={},latency={}>'.format(
+            type(self).__name__, self.command, self.node, self.latency)
+
+
+class Hooks:
+    """
+    Registry of the callables called with a CommandEvent ``before_send`` a
+    command, ``after_reply`` once its reply is read, or ``on_error`` when
+    sending it or reading its reply raised (error replies included).
+
+    Hooks are called synchronously in the order they were registered, the
+    exceptions they raise are propagated to the caller of the command.
+    """
+
+    def __init__(self):
+        self.before_send = []
+        self.after_reply = []
+        self.on_error = []
+
+    def __bool__(self):
+        return bool(self.before_send or self.after_reply or self.on_error)
+
+    def _callbacks(self, event):
+        if event not in HOOK_EVENTS:
+            raise ValueError('"event" must be one of {}'.format(', '.join(HOOK_EVENTS)))
+        return getattr(self, event)
+
+    def register(self, event, callback):
+        """Registers ``callback`` to be called on ``event``"""
+        self._callbacks(event).append(callback)
+
+    def unregister(self, event, callback):
+        """Removes ``callback`` from the hooks of ``event``"""
+        self._callbacks(event).remove(callback)
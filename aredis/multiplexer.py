@@ -0,0 +1,158 @@
+import asyncio
+from collections import deque
+
+from aredis.compat import CancelledError
+from aredis.exceptions import (ConnectionError, RedisError,
+                               TimeoutError)
+
+# commands which block the connection or change its state can not share
+# the connection with other callers, they are executed on a connection
+# borrowed from the pool as usual
+EXCLUSIVE_COMMANDS = {
+    'AUTH', 'BLMOVE', 'BLMPOP', 'BLPOP', 'BRPOP', 'BRPOPLPUSH', 'BZMPOP',
+    'BZPOPMAX', 'BZPOPMIN', 'CLIENT REPLY', 'CLIENT SETNAME',
+    'CLIENT TRACKING', 'DISCARD', 'EXEC', 'HELLO', 'MONITOR', 'MULTI',
+    'PSUBSCRIBE', 'PUNSUBSCRIBE', 'QUIT', 'READONLY', 'READWRITE', 'RESET',
+    'SELECT', 'SUBSCRIBE', 'UNSUBSCRIBE', 'UNWATCH', 'WAIT', 'WATCH',
+    'XREAD', 'XREADGROUP'
+}
+
+
+class Multiplexer:
+    """
+    Shares one connection of the pool between concurrent callers.
+
+    Commands issued in the same iteration of the event loop are written to
+    the socket back-to-back with a single write, and the replies are handed
+    back to the callers in FIFO order through futures, which gives pipeline
+    level throughput without using a pipeline explicitly.
+    """
+
+    def __init__(self, connection_pool):
+        self.connection_pool = connection_pool
+        self.connection = None
+        # (command name, packed command, future) which are not written yet
+        self._queue = []
+        # (future, hook event or None) waiting for a reply, in the order
+        # commands were written
+        self._pending = deque()
+        self._writer = None
+        self._reader = None
+        # task borrowing the connection, awaited by all the first callers
+        self._borrowing = None
+
+    def __len__(self):
+        return len(self._queue) + len(self._pending)
+
+    async def execute(self, *args):
+        """Sends a command and returns the raw reply of the server"""
+        connection = self.connection
+        if connection is None:
+            connection = await self._borrow()
+        future = asyncio.Future(loop=connection.loop)
+        self._queue.append((args[0], connection.pack_command(*args), future))
+        if self._writer is None:
+            # the write is deferred to the next iteration of the loop so
+            # that concurrent callers are written with the same write
+            self._writer = asyncio.ensure_future(self._write(), loop=connection.loop)
+        return await future
+
+    async def _borrow(self):
+        # the connection is borrowed as by any other caller of the pool,
+        # waiting for it and checking its health as the pool does
+        if self._borrowing is None:
+            self._borrowing = asyncio.ensure_future(self._wait_for_connection())
+        # a caller cancelled while waiting does not cancel the others
+        return await asyncio.shield(self._borrowing)
+
+    async def _wait_for_connection(self):
+        try:
+            self.connection = await self.connection_pool.wait_for_connection()
+            return self.connection
+        finally:
+            self._borrowing = None
+
+    async def _write(self):
+        connection = self.connection
+        try:
+            while self._queue:
+                if not connection.is_connected:
+                    await connection.connect()
+                queue, self._queue = self._queue, []
+                packed = []
+                for command_name, command, future in queue:
+                    # callers cancelled before their command is written
+                    # are simply dropped
+                    if not future.cancelled():
+                        packed.extend(command)
+                        event = None
+                        if connection.hooks is not None:
+                            event = connection.start_event(command_name)
+                            event.bytes_written = sum(map(len, command))
+                        self._pending.append((future, event))
+                if not packed:
+                    continue
+                await connection.send_packed_command(packed)
+                connection.awaiting_response = True
+                if self._reader is None:
+                    self._reader = asyncio.ensure_future(self._read(), loop=connection.loop)
+        except CancelledError:
+            self._fail(ConnectionError('Multiplexed connection is closed'))
+            raise
+        except Exception as exc:
+            self._fail(exc)
+        finally:
+            self._writer = None
+
+    async def _read(self):
+        connection = self.connection
+        pending = self._pending
+        try:
+            while pending:
+                event = pending[0][1]
+                if event is not None:
+                    event.read_marker = connection.bytes_read
+                try:
+                    response = await connection.read_response()
+                except (ConnectionError, TimeoutError):
+                    raise
+                except RedisError as exc:
+                    response = exc
+                future, event = pending.popleft()
+                if event is not None and connection.hooks is not None:
+                    if isinstance(response, RedisError):
+                        connection.finish_event(event, response)
+                    else:
+                        connection.finish_event(event)
+                # the reply of a cancelled caller still has to be read
+                # off the socket, it is discarded here
+                if future.done():
+                    continue
+                if isinstance(response, RedisError):
+                    future.set_exception(response)
+                else:
+                    future.set_result(response)
+        except CancelledError:
+            self._fail(ConnectionError('Multiplexed connection is closed'))
+            raise
+        except Exception as exc:
+            self._fail(exc)
+        finally:
+            self._reader = None
+
+    def _fail(self, exc):
+        """Fails all the callers waiting on the connection"""
+        connection = self.connection
+        if connection is not None:
+            connection.disconnect()
+        pending = list(self._pending)
+        self._pending.clear()
+        for _, event in pending:
+            if event is not None and connection.hooks is not None:
+                connection.finish_event(event, exc)
+        futures = [future for future, _ in pending]
+        futures.extend(future for _, _, future in self._queue)
+        self._queue = []
+        for future in futures:
+            if not future.done():
+                future.set_exception(exc)
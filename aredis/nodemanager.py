@@ -1,11 +1,87 @@
 # -*- coding: utf-8 -*-
 
 import random
+from array import array
+from collections.abc import Mapping
 from aredis.utils import (b, hash_slot)
 from aredis.exceptions import (ConnectionError,
                                RedisClusterException)
 
 
+class SlotTable(Mapping):
+    """
+    Mapping of the hash slots to the nodes serving them, the master first
+    and then its replicas.
+
+    The lists of nodes are kept once per shard, and the slots hold the
+    index of their shard in an array of unsigned shorts. Filling a range of
+    slots is a single slice assignment, and finding the nodes of a slot
+    is two index lookups.
+
+    The lists of nodes are shared by all the slots of a shard, they must not
+    be mutated: `set_master` moves a single slot to another master.
+    """
+
+    # index of the slots not served by any node
+    UNASSIGNED = 0xffff
+
+    def __init__(self, size=16384):
+        # lists of nodes, master first
+        self.shards = []
+        # names of the nodes of a shard -> index of the shard
+        self._shard_ids = {}
+        self._slots = array('H', [self.UNASSIGNED]) * size
+
+    def __getitem__(self, slot):
+        try:
+            shard_id = self._slots[slot]
+        except (TypeError, IndexError):
+            raise KeyError(slot)
+        if shard_id == self.UNASSIGNED:
+            raise KeyError(slot)
+        return self.shards[shard_id]
+
+    def __setitem__(self, slot, nodes):
+        self._slots[slot] = self.add_shard(nodes)
+
+    def __contains__(self, slot):
+        return (isinstance(slot, int) and 0 <= slot < len(self._slots)
+                and self._slots[slot] != self.UNASSIGNED)
+
+    def __iter__(self):
+        for slot, shard_id in enumerate(self._slots):
+            if shard_id != self.UNASSIGNED:
+                yield slot
+
+    def __len__(self):
+        return len(self._slots) - self._slots.count(self.UNASSIGNED)
+
+    def add_shard(self, nodes):
+        """Returns the index of the shard of ``nodes``, added if needed"""
+        names = tuple(node['name'] for node in nodes)
+        shard_id = self._shard_ids.get(names)
+        if shard_id is None:
+            if len(self.shards) == self.UNASSIGNED:
+                raise RedisClusterException('Too many shards in the slots cache')
+            shard_id = self._shard_ids[names] = len(self.shards)
+            self.shards.append(list(nodes))
+        return shard_id
+
+    def assign(self, min_slot, max_slot, nodes):
+        """Sets the nodes serving the slots from min_slot to max_slot"""
+        shard_id = self.add_shard(nodes)
+        self._slots[min_slot:max_slot + 1] = array('H', [shard_id]) * (max_slot - min_slot + 1)
+
+    def unassigned(self, min_slot, max_slot):
+        """Returns the number of slots not served from min_slot to max_slot"""
+        return self._slots[min_slot:max_slot + 1].count(self.UNASSIGNED)
+
+    def set_master(self, slot, node):
+        """Sets the master serving ``slot``, after a MOVED redirection"""
+        replicas = self[slot][1:] if slot in self else []
+        self[slot] = [node] + replicas
+
+
 class NodeManager:
     """
     TODO: document
@@ -26,7 +102,7 @@ class NodeManager:
         """
         self.connection_kwargs = connection_kwargs
         self.nodes = {}
-        self.slots = {}
+        self.slots = SlotTable(self.RedisClusterHashSlots)
         self.startup_nodes = [] if startup_nodes is None else startup_nodes
         self.orig_startup_nodes = self.startup_nodes[:]
         self.reinitialize_counter = 0
@@ -106,7 +182,7 @@ class NodeManager:
         and it could execute CLUSTER SLOTS command.
         """
         nodes_cache = {}
-        tmp_slots = {}
+        tmp_slots = SlotTable(self.RedisClusterHashSlots)
 
         all_slots_covered = False
         disagreements = []
@@ -148,17 +224,18 @@ class NodeManager:
                 self.set_node_name(master_node)
                 nodes_cache[master_node['name']] = master_node
 
-                for i in range(min_slot, max_slot + 1):
-                    if i not in tmp_slots:
-                        tmp_slots[i] = [master_node]
-
-                        for slave_node in slave_nodes:
-                            self.set_node_name(slave_node)
-                            nodes_cache[slave_node['name']] = slave_node
-                            tmp_slots[i].append(slave_node)
-                    else:
-                        # Validate that 2 nodes want to use the same slot cache setup
-                        if tmp_slots[i][0]['name'] != node['name']:
+                for slave_node in slave_nodes:
+                    self.set_node_name(slave_node)
+                    nodes_cache[slave_node['name']] = slave_node
+
+                if tmp_slots.unassigned(min_slot, max_slot) == max_slot - min_slot + 1:
+                    tmp_slots.assign(min_slot, max_slot, nodes)
+                else:
+                    for i in range(min_slot, max_slot + 1):
+                        if i not in tmp_slots:
+                            tmp_slots[i] = nodes
+                        elif tmp_slots[i][0]['name'] != node['name']:
+                            # Validate that 2 nodes want to use the same slot cache setup
                             disagreements.append('{0} vs {1} on slot: {2}'.format(
                                 tmp_slots[i][0]['name'], node['name'], i),
                             )
@@ -176,9 +253,8 @@ class NodeManager:
                 need_full_slots_coverage = await self.cluster_require_full_coverage(nodes_cache)
 
             # Validate if all slots are covered or if we should try next startup node
-            for i in range(0, self.RedisClusterHashSlots):
-                if i not in tmp_slots and need_full_slots_coverage:
-                    all_slots_covered = False
+            if need_full_slots_coverage and len(tmp_slots) < self.RedisClusterHashSlots:
+                all_slots_covered = False
 
             if all_slots_covered:
                 # All slots are covered and application can continue to execute
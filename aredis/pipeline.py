@@ -1,3 +1,4 @@
+import asyncio
 import inspect
 import sys
 from itertools import chain
@@ -103,7 +104,7 @@ class BasePipeline:
         conn = self.connection
         # if this is the first call, we need a connection
         if not conn:
-            conn = self.connection_pool.get_connection()
+            conn = await self.connection_pool.wait_for_connection()
             self.connection = conn
         try:
             await conn.send_command(*args)
@@ -277,13 +278,13 @@ class BasePipeline:
 
         conn = self.connection
         if not conn:
-            conn = self.connection_pool.get_connection()
+            conn = await self.connection_pool.wait_for_connection()
             # assign to self.connection so reset() releases the connection
             # back to the pool after we're done
             self.connection = conn
 
         try:
-            return await exec(conn, stack, raise_on_error)
+            return await self._run(exec, conn, stack, raise_on_error)
         except (ConnectionError, TimeoutError, aredis.compat.CancelledError) as e:
             conn.disconnect()
             if not conn.retry_on_timeout and isinstance(e, TimeoutError):
@@ -298,10 +299,18 @@ class BasePipeline:
                                  "one or more keys")
             # otherwise, it's safe to retry since the transaction isn't
             # predicated on any state
-            return await exec(conn, stack, raise_on_error)
+            return await self._run(exec, conn, stack, raise_on_error)
         finally:
             await self.reset()
 
+    def _run(self, exec, conn, stack, raise_on_error):
+        coroutine = exec(conn, stack, raise_on_error)
+        if conn.hooks is None:
+            return coroutine
+        # the hooks see the pipeline as a single command
+        command = 'MULTI' if exec == self._execute_transaction else 'PIPELINE'
+        return conn.instrument(command, len(stack), coroutine)
+
     async def watch(self, *names):
         """Watches the values at keys ``names``"""
         if self.explicit_transaction:
@@ -434,7 +443,7 @@ class StrictClusterPipeline(StrictRedisCluster):
                 if len(node) > 0:
                     raise ClusterTransactionError("Keys in request don't hash to the same node")
             node = hashed_node
-        conn = self.connection_pool.get_connection_by_node(node)
+        conn = await self.connection_pool.wait_for_connection_by_node(node)
         if self.watches:
             await self._watch(node, conn, self.watches)
         node_commands = NodeCommands(self.parse_response, conn, in_transaction=True)
@@ -467,46 +476,110 @@ class StrictClusterPipeline(StrictRedisCluster):
         """
         Sends a bunch of cluster commands to the redis cluster.
 
+        The commands are written to all their nodes before the replies of the
+        nodes are read concurrently. The commands redirected by `ASK` or
+        `MOVED`, or which failed with a connection error, are grouped by
+        their new node and sent again in another pipelined round, preceded
+        by `ASKING` for the `ASK` redirections. The slots are read from the
+        cluster again after a connection error, and the commands of a node
+        whose connection failed twice are not retried.
+
         `allow_redirections` If the pipeline should follow `ASK` & `MOVED` responses
         automatically. If set to false it will raise RedisClusterException.
         """
         # the first time sending the commands we send all of the commands that were queued up.
         # if we have to run through it again, we only retry the commands that failed.
         attempt = sorted(stack, key=lambda x: x.position)
-
-        # build a list of node objects based on node names we need to
-        nodes = {}
-
-        # as we move through each command that still needs to be processed,
-        # we figure out the slot number that command maps to, then from the slot determine the node.
         for c in attempt:
             # refer to our internal node -> slot table that tells us where a given
             # command should route to.
-            slot = self._determine_slot(*c.args)
-            node = self.connection_pool.get_node_by_slot(slot)
+            c.node = self.connection_pool.get_node_by_slot(self._determine_slot(*c.args))
+            c.asking = False
+        ttl = int(self.RedisClusterRequestTTL)
+        # node name -> number of rounds in which its connection failed
+        failed_nodes = {}
+
+        while True:
+            ttl -= 1
+            await self._send_commands_by_node(attempt)
+
+            # if the response isn't an exception it is a valid response from the node
+            # we're all done with that command, YAY!
+            # if we have more commands to attempt, we've run into problems.
+            # collect all the commands we are allowed to retry.
+            # (MOVED, ASK, or connection errors or timeout errors)
+            attempt = [c for c in attempt if isinstance(c.result, ERRORS_ALLOW_RETRY)]
+            if not attempt or not allow_redirections or ttl <= 0:
+                break
+            failed = {c.node['name'] for c in attempt
+                      if isinstance(c.result, (ConnectionError, TimeoutError))}
+            if failed:
+                for name in failed:
+                    failed_nodes[name] = failed_nodes.get(name, 0) + 1
+                # the commands of a node whose connection failed twice are
+                # not sent to the cluster again
+                attempt = [c for c in attempt
+                           if not (isinstance(c.result, (ConnectionError, TimeoutError))
+                                   and failed_nodes[c.node['name']] >= 2)]
+                if not attempt:
+                    break
+                # the node may be down or replaced by a replica, the slots
+                # are read from the cluster again before the next round
+                await self._refresh_slots()
+            # If a lot of commands have failed, we'll be setting the
+            # flag to rebuild the slots table from scratch. So MOVED errors should
+            # correct themselves fairly quickly.
+            await self.connection_pool.nodes.increment_reinitialize_counter(len(attempt))
+            if any(isinstance(c.result, TryAgainError) for c in attempt):
+                # keys of the slot are being migrated
+                await asyncio.sleep(0.05)
+            for c in attempt:
+                self._redirect(c)
 
+        # turn the response back into a simple flat array that corresponds
+        # to the sequence of commands issued in the stack in pipeline.execute()
+        response = [c.result for c in sorted(stack, key=lambda x: x.position)]
+
+        if raise_on_error:
+            self.raise_first_error(stack)
+
+        return response
+
+    async def _send_commands_by_node(self, commands):
+        # build a list of node objects based on node names we need to
+        nodes = {}
+        for c in commands:
             # little hack to make sure the node name is populated. probably could clean this up.
-            self.connection_pool.nodes.set_node_name(node)
+            self.connection_pool.nodes.set_node_name(c.node)
 
             # now that we know the name of the node ( it's just a string in the form of host:port )
             # we can build a list of commands for each node.
-            node_name = node['name']
-            if node_name not in nodes:
-                nodes[node_name] = NodeCommands(self.parse_response, self.connection_pool.get_connection_by_node(node))
+            nodes.setdefault(c.node['name'], []).append(c)
 
-            nodes[node_name].append(c)
-
-        # send the commands in sequence.
-        # we  write to all the open sockets for each node first, before reading anything
+        node_commands = []
+        for node_stack in nodes.values():
+            try:
+                connection = await self.connection_pool.wait_for_connection_by_node(node_stack[0].node)
+            except (ConnectionError, TimeoutError) as e:
+                # the health check of the connection could not connect again
+                for c in node_stack:
+                    c.result = e
+                continue
+            n = NodeCommands(self.parse_response, connection)
+            for c in node_stack:
+                if c.asking:
+                    # ASKING only lets the next command access the importing slot
+                    n.append(PipelineCommand(('ASKING',)))
+                n.append(c)
+            node_commands.append(n)
+
+        # we write to all the open sockets for each node first, before reading anything
         # this allows us to flush all the requests out across the network essentially in parallel
         # so that we can read them all in parallel as they come back.
-        # we dont' multiplex on the sockets as they come available, but that shouldn't make too much difference.
-        node_commands = nodes.values()
         for n in node_commands:
             await n.write()
 
-        for n in node_commands:
-            await n.read()
+        await asyncio.gather(*[n.read() for n in node_commands])
 
         # release all of the redis connections we allocated earlier back into the connection pool.
         # we used to do this step as part of a try/finally block, but it is really dangerous to
@@ -519,47 +592,32 @@ class StrictClusterPipeline(StrictRedisCluster):
         # next time we read from it we pass the buffered result back from a previous
         # command and every single request after to that connection will always get
         # a mismatched result. (not just theoretical, I saw this happen on production x.x).
-        for n in nodes.values():
+        for n in node_commands:
             self.connection_pool.release(n.connection)
 
-        # if the response isn't an exception it is a valid response from the node
-        # we're all done with that command, YAY!
-        # if we have more commands to attempt, we've run into problems.
-        # collect all the commands we are allowed to retry.
-        # (MOVED, ASK, or connection errors or timeout errors)
-        attempt = sorted([c for c in attempt if isinstance(c.result, ERRORS_ALLOW_RETRY)], key=lambda x: x.position)
-        if attempt and allow_redirections:
-            # RETRY MAGIC HAPPENS HERE!
-            # send these remaing comamnds one at a time using `execute_command`
-            # in the main client. This keeps our retry logic in one place mostly,
-            # and allows us to be more confident in correctness of behavior.
-            # at this point any speed gains from pipelining have been lost
-            # anyway, so we might as well make the best attempt to get the correct
-            # behavior.
-            #
-            # The client command will handle retries for each individual command
-            # sequentially as we pass each one into `execute_command`. Any exceptions
-            # that bubble out should only appear once all retries have been exhausted.
-            #
-            # If a lot of commands have failed, we'll be setting the
-            # flag to rebuild the slots table from scratch. So MOVED errors should
-            # correct themselves fairly quickly.
-            await self.connection_pool.nodes.increment_reinitialize_counter(len(attempt))
-            for c in attempt:
-                try:
-                    # send each command individually like we do in the main client.
-                    c.result = await super(StrictClusterPipeline, self).execute_command(*c.args, **c.options)
-                except RedisError as e:
-                    c.result = e
-
-        # turn the response back into a simple flat array that corresponds
-        # to the sequence of commands issued in the stack in pipeline.execute()
-        response = [c.result for c in sorted(stack, key=lambda x: x.position)]
-
-        if raise_on_error:
-            self.raise_first_error(stack)
-
-        return response
+    async def _refresh_slots(self):
+        try:
+            await self.connection_pool.nodes.initialize()
+        except (ConnectionError, RedisClusterException):
+            # the current slots are kept if the cluster can not be reached
+            pass
+
+    def _redirect(self, c):
+        """Sets the node a command which failed is sent to in the next round"""
+        error = c.result
+        c.asking = False
+        if isinstance(error, MovedError):
+            # the slot is served by another node from now on
+            self.refresh_table_asap = True
+            c.node = self.connection_pool.nodes.set_node(error.host, error.port, server_type='master')
+            self.connection_pool.nodes.slots.set_master(error.slot_id, c.node)
+        elif isinstance(error, AskError):
+            # the keys of the slot are being migrated, only this command is
+            # sent to the importing node
+            c.node = self.connection_pool.nodes.set_node(error.host, error.port, server_type='master')
+            c.asking = True
+        else:
+            c.node = self.connection_pool.get_node_by_slot(self._determine_slot(*c.args))
 
     def _fail_on_redirect(self, allow_redirections):
         if not allow_redirections:
@@ -709,6 +767,8 @@ class NodeCommands:
         self.connection = connection
         self.commands = []
         self.in_transaction = in_transaction
+        # CommandEvent of the commands written, when the connection has hooks
+        self.event = None
 
     def extend(self, c):
         self.commands.extend(c)
@@ -726,6 +786,12 @@ class NodeCommands:
         for c in commands:
             c.result = None
 
+        event = None
+        if connection.hooks is not None:
+            event = connection.start_event('MULTI' if self.in_transaction else 'PIPELINE',
+                                           len(commands))
+            written = connection.bytes_written
+
         # build up all commands into a single request to increase network perf
         # send all the commands and catch connection and timeout errors.
         try:
@@ -733,8 +799,27 @@ class NodeCommands:
         except (ConnectionError, TimeoutError) as e:
             for c in commands:
                 c.result = e
+            if event is not None:
+                connection.finish_event(event, e)
+        else:
+            if event is not None:
+                event.bytes_written = connection.bytes_written - written
+                self.event = event
 
     async def read(self):
+        event, self.event = self.event, None
+        if event is None:
+            return await self._read()
+        try:
+            await self._read()
+        except Exception as exc:
+            self.connection.finish_event(event, exc)
+            raise
+        errors = [c.result for c in self.commands
+                  if isinstance(c.result, (ConnectionError, TimeoutError))]
+        self.connection.finish_event(event, errors[0] if errors else None)
+
+    async def _read(self):
         connection = self.connection
         for c in self.commands:
 
@@ -7,6 +7,7 @@ import warnings
 import time
 import random
 import threading
+from collections import deque
 from itertools import chain
 from urllib.parse import (parse_qs,
                           unquote,
@@ -14,10 +15,13 @@ from urllib.parse import (parse_qs,
 from aredis.connection import (RedisSSLContext,
                                Connection,
                                UnixDomainSocketConnection,
-                               ClusterConnection)
+                               ClusterConnection,
+                               exec_with_timeout)
+from aredis.compat import CancelledError, current_task
 from aredis.nodemanager import NodeManager
 from aredis.exceptions import (ConnectionError,
-                               RedisClusterException)
+                               RedisClusterException,
+                               TimeoutError)
 
 FALSE_STRINGS = ('0', 'F', 'FALSE', 'N', 'NO')
 
@@ -33,7 +37,13 @@ def to_bool(value):
 URL_QUERY_ARGUMENT_PARSERS = {
     'stream_timeout': float,
     'connect_timeout': float,
-    'retry_on_timeout': to_bool
+    'retry_on_timeout': to_bool,
+    'write_high_watermark': int,
+    'write_low_watermark': int,
+    'protocol_version': int,
+    'buffer_cutoff': int,
+    'min_connections': int,
+    'health_check_interval': float
 }
 
 
@@ -79,7 +89,10 @@ class ConnectionPool:
         Any additional querystring arguments and keyword arguments will be
         passed along to the ConnectionPool class's initializer. The querystring
         arguments ``connect_timeout`` and ``stream_timeout`` if supplied
-        are parsed as float values. The arguments ``retry_on_timeout`` are
+        are parsed as float values, ``write_high_watermark``,
+        ``write_low_watermark``, ``protocol_version``, ``buffer_cutoff`` and
+        ``min_connections`` as integers, ``health_check_interval`` as a
+        float. The arguments ``retry_on_timeout`` are
         parsed to boolean values that accept True/False, Yes/No values to indicate state.
         Invalid types cause a ``UserWarning`` to be raised.
         In the case of conflicting arguments, querystring arguments always win.
@@ -149,8 +162,8 @@ class ConnectionPool:
         return cls(**kwargs)
 
     def __init__(self, connection_class=Connection, max_connections=None,
-                 max_idle_time=0, idle_check_interval=1,
-                 **connection_kwargs):
+                 max_idle_time=0, idle_check_interval=1, min_connections=0,
+                 health_check_interval=0, **connection_kwargs):
         """
         Creates a connection pool. If max_connections is set, then this
         object raises redis.ConnectionError when the pool's limit is reached.
@@ -158,19 +171,41 @@ class ConnectionPool:
         By default, TCP connections are created connection_class is specified.
         Use redis.UnixDomainSocketConnection for unix sockets.
 
+        The pool is filled up to min_connections connections by `warmup()`,
+        and idle connections are never closed below that number.
+
+        If health_check_interval is set, the connections handed out by
+        `wait_for_connection` which are unused for more than
+        health_check_interval seconds send a PING along with their next
+        command, and are connected again if it fails.
+
         Any additional keyword arguments are passed to the constructor of
         connection_class.
         """
         max_connections = max_connections or 2 ** 31
         if not isinstance(max_connections, int) or max_connections < 0:
             raise ValueError('"max_connections" must be a positive integer')
+        if (not isinstance(min_connections, int)
+                or not 0 <= min_connections <= max_connections):
+            raise ValueError('"min_connections" must be a positive integer '
+                             'not greater than "max_connections"')
 
         self.connection_class = connection_class
         self.connection_kwargs = connection_kwargs
         self.max_connections = max_connections
+        self.min_connections = min_connections
+        self.health_check_interval = health_check_interval
+        # aredis.hooks.Hooks set on the connections of the pool
+        self.hooks = None
+        # counters returned by stats()
+        self.opened = 0
+        self.closed = 0
+        self.idle_closed = 0
+        self._closed_reconnects = 0
         self.max_idle_time = max_idle_time
         self.idle_check_interval = idle_check_interval
         self.loop = self.connection_kwargs.get('loop')
+        self._reaper = None
 
         self.reset()
 
@@ -180,21 +215,132 @@ class ConnectionPool:
             self.connection_class.description.format(**self.connection_kwargs),
         )
 
-    async def disconnect_on_idle_time_exceeded(self, connection):
-        while True:
-            if (time.time() - connection.last_active_at > self.max_idle_time
-                    and not connection.awaiting_response):
-                connection.disconnect()
-                try:
-                    self._available_connections.remove(connection)
-                except ValueError:
-                    pass
-                self._created_connections -= 1
+    def _start_reaper(self):
+        if self.max_idle_time > self.idle_check_interval > 0 and self._reaper is None:
+            # do not await the future
+            self._reaper = asyncio.ensure_future(self._reap_idle_connections())
+
+    async def _reap_idle_connections(self):
+        # a single task per pool checks the idle connections, it stops when
+        # the pool is empty and is started again by the next connection
+        try:
+            while self._has_connections():
+                await asyncio.sleep(self.idle_check_interval)
+                self.disconnect_idle_connections()
+        finally:
+            # a reaper cancelled by reset() may already be replaced
+            if self._reaper is current_task():
+                self._reaper = None
+
+    def _stop_reaper(self):
+        reaper, self._reaper = self._reaper, None
+        if reaper is not None:
+            reaper.cancel()
+
+    def _has_connections(self):
+        return self._created_connections > 0
+
+    def disconnect_idle_connections(self):
+        """
+        Closes the available connections unused for more than max_idle_time,
+        keeping at least min_connections connections
+        """
+        self._available_connections[:] = self._reap(self._available_connections,
+                                                    self._created_connections)
+
+    def _reap(self, available, created):
+        # released connections are appended to the available ones, so the
+        # least recently used come first and the scan stops at the first
+        # connection used recently
+        idle_since = time.time() - self.max_idle_time
+        idle = 0
+        for connection in available:
+            if (connection.last_active_at >= idle_since
+                    or created - idle <= self.min_connections):
                 break
-            await asyncio.sleep(self.idle_check_interval)
+            idle += 1
+        for connection in available[:idle]:
+            self._discard(connection)
+        self.idle_closed += idle
+        return available[idle:]
+
+    def stats(self):
+        """Returns the number of connections of the pool and its counters"""
+        return {
+            'created': self._created_connections,
+            'in_use': len(self._in_use_connections),
+            'available': len(self._available_connections),
+            'max_connections': self.max_connections,
+            'min_connections': self.min_connections,
+            'opened': self.opened,
+            'closed': self.closed,
+            'idle_closed': self.idle_closed,
+            'reconnects': self._reconnects(self._connections()),
+        }
+
+    def _connections(self):
+        return chain(self._available_connections, self._in_use_connections)
+
+    def set_hooks(self, hooks):
+        """
+        Sets the aredis.hooks.Hooks called around the commands sent on the
+        connections of the pool, or removes them if None
+        """
+        self.hooks = hooks
+        for connection in self._connections():
+            connection.set_hooks(hooks)
+
+    def _reconnects(self, connections):
+        return self._closed_reconnects + sum(max(connection.connects - 1, 0)
+                                             for connection in connections)
+
+    def _count_closed(self, connection):
+        self.closed += 1
+        self._closed_reconnects += max(connection.connects - 1, 0)
+
+    async def warmup(self):
+        """
+        Opens connections until the pool holds ``min_connections`` of them,
+        connections are connected (and authenticated) concurrently so that
+        the first commands do not pay for it
+        """
+        self._checkpid()
+        missing = self.min_connections - self._created_connections
+        await self._connect_all([self.make_connection() for _ in range(missing)])
+
+    async def _connect_all(self, connections):
+        # connections are only made available once connected, the first
+        # error is raised after all of them are done
+        try:
+            results = await asyncio.gather(
+                *[connection.connect() for connection in connections],
+                return_exceptions=True
+            )
+        except CancelledError:
+            for connection in connections:
+                self._discard(connection)
+            raise
+        error = None
+        for connection, result in zip(connections, results):
+            if isinstance(result, BaseException):
+                self._discard(connection)
+                error = error or result
+            else:
+                self._add_available(connection)
+        if error is not None:
+            raise error
+
+    def _discard(self, connection):
+        connection.disconnect()
+        self._count_closed(connection)
+        self._created_connections -= 1
+
+    def _add_available(self, connection):
+        self._available_connections.append(connection)
 
     def reset(self):
         self.pid = os.getpid()
+        self._stop_reaper()
         self._created_connections = 0
         self._available_connections = []
         self._in_use_connections = set()
@@ -220,15 +366,34 @@ class ConnectionPool:
         self._in_use_connections.add(connection)
         return connection
 
+    async def wait_for_connection(self, *args, **kwargs):
+        """
+        Gets a connection from the pool, waiting for a connection to be
+        released when the pool is exhausted (see BlockingConnectionPool)
+        """
+        connection = self.get_connection(*args, **kwargs)
+        if self.health_check_interval:
+            self._check_health(connection)
+        return connection
+
+    def _check_health(self, connection):
+        # connections unused for a while may have been dropped by the server
+        # or the network, which is found out by a PING sent along with the
+        # next command rather than by the command itself
+        if (connection.is_connected and
+                time.time() - connection.last_active_at > self.health_check_interval):
+            connection.check_health_with_next_command()
+
     def make_connection(self):
         """Creates a new connection"""
         if self._created_connections >= self.max_connections:
             raise ConnectionError("Too many connections")
         self._created_connections += 1
+        self.opened += 1
         connection = self.connection_class(**self.connection_kwargs)
-        if self.max_idle_time > self.idle_check_interval > 0:
-            # do not await the future
-            asyncio.ensure_future(self.disconnect_on_idle_time_exceeded(connection))
+        if self.hooks is not None:
+            connection.set_hooks(self.hooks)
+        self._start_reaper()
         return connection
 
     def release(self, connection):
@@ -239,8 +404,7 @@ class ConnectionPool:
         self._in_use_connections.remove(connection)
         # discard connection with unread response
         if connection.awaiting_response:
-            connection.disconnect()
-            self._created_connections -= 1
+            self._discard(connection)
         else:
             self._available_connections.append(connection)
 
@@ -253,6 +417,100 @@ class ConnectionPool:
             self._created_connections -= 1
 
 
+class BlockingConnectionPool(ConnectionPool):
+    """
+    Connection pool which waits for a connection to be released when
+    ``max_connections`` connections are in use, instead of raising
+    ConnectionError right away.
+
+    The callers of `wait_for_connection` (used by the clients) are served in
+    FIFO order and raise ConnectionError after waiting ``timeout`` seconds,
+    or wait forever if ``timeout`` is None. `get_connection` does not wait.
+    The time spent waiting is returned by `stats()`.
+    """
+
+    def __init__(self, connection_class=Connection, max_connections=50,
+                 timeout=20, **connection_kwargs):
+        super(BlockingConnectionPool, self).__init__(connection_class=connection_class,
+                                                     max_connections=max_connections,
+                                                     **connection_kwargs)
+        self.timeout = timeout
+        self.waits = 0
+        self.timeouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def reset(self):
+        super(BlockingConnectionPool, self).reset()
+        self._waiters = deque()
+
+    def stats(self):
+        """
+        Returns the number of connections of the pool and its counters,
+        including the counters of the waits for a connection
+        """
+        stats = super(BlockingConnectionPool, self).stats()
+        stats.update({
+            'waiting': len(self._waiters),
+            'waits': self.waits,
+            'timeouts': self.timeouts,
+            'wait_time': self.wait_time,
+            'max_wait_time': self.max_wait_time,
+        })
+        return stats
+
+    async def wait_for_connection(self, *args, **kwargs):
+        """
+        Gets a connection from the pool, waiting for one to be released
+        (after the callers already waiting) if the pool is exhausted
+        """
+        self._checkpid()
+        if not self._waiters and (self._available_connections or
+                                  self._created_connections < self.max_connections):
+            connection = self.get_connection()
+        else:
+            connection = await self._wait()
+        if self.health_check_interval:
+            self._check_health(connection)
+        return connection
+
+    async def _wait(self):
+        waiter = asyncio.Future(loop=self.loop)
+        self._waiters.append(waiter)
+        self.waits += 1
+        started_at = time.time()
+        try:
+            # the waiter itself is never cancelled, a connection handed
+            # over while the wait is given up is released below
+            connection = await exec_with_timeout(asyncio.shield(waiter),
+                                                 self.timeout, loop=self.loop)
+        except BaseException as exc:
+            if waiter.done():
+                self.release(waiter.result())
+            else:
+                self._waiters.remove(waiter)
+            self._record_wait(started_at)
+            if isinstance(exc, TimeoutError):
+                self.timeouts += 1
+                raise ConnectionError("No connection available")
+            raise
+        self._record_wait(started_at)
+        return connection
+
+    def _record_wait(self, started_at):
+        wait_time = time.time() - started_at
+        self.wait_time += wait_time
+        if wait_time > self.max_wait_time:
+            self.max_wait_time = wait_time
+
+    def release(self, connection):
+        """Releases the connection back to the pool, or to the first waiter"""
+        super(BlockingConnectionPool, self).release(connection)
+        if self._waiters and (self._available_connections or
+                              self._created_connections < self.max_connections):
+            self._waiters.popleft().set_result(self.get_connection())
+
+
 class ClusterConnectionPool(ConnectionPool):
     """Custom connection pool for rediscluster"""
     RedisClusterDefaultTimeout = None
@@ -260,9 +518,16 @@ class ClusterConnectionPool(ConnectionPool):
     def __init__(self, startup_nodes=None, connection_class=ClusterConnection,
                  max_connections=None, max_connections_per_node=False, reinitialize_steps=None,
                  skip_full_coverage_check=False, nodemanager_follow_cluster=False, readonly=False,
-                 max_idle_time=0, idle_check_interval=1,
-                 **connection_kwargs):
+                 max_idle_time=0, idle_check_interval=1, min_connections=0,
+                 health_check_interval=0, **connection_kwargs):
         """
+        :min_connections:
+            Number of connections to each master node opened by `warmup()`, idle
+            connections to a node are never closed below that number.
+        :health_check_interval:
+            Connections unused for more than that number of seconds handed out by
+            `wait_for_connection_by_node`, `wait_for_connection_by_slot` and
+            `wait_for_random_connection` send a PING along with their next command.
         :skip_full_coverage_check:
             Skips the check of cluster-require-full-coverage config, useful for clusters
             without the CONFIG command (like aws)
@@ -271,7 +536,9 @@ class ClusterConnectionPool(ConnectionPool):
             it was operating on. This will allow the client to drift along side the cluster
             if the cluster nodes move around alot.
         """
-        super(ClusterConnectionPool, self).__init__(connection_class=connection_class, max_connections=max_connections)
+        super(ClusterConnectionPool, self).__init__(connection_class=connection_class, max_connections=max_connections,
+                                                    min_connections=min_connections,
+                                                    health_check_interval=health_check_interval)
 
         # Special case to make from_url method compliant with cluster setting.
         # from_url method will send in the ip and port through a different variable then the
@@ -322,20 +589,72 @@ class ClusterConnectionPool(ConnectionPool):
             await self.nodes.initialize()
             self.initialized = True
 
-    async def disconnect_on_idle_time_exceeded(self, connection):
-        while True:
-            if (time.time() - connection.last_active_at > self.max_idle_time
-                    and not connection.awaiting_response):
-                connection.disconnect()
-                node = connection.node
-                self._available_connections[node['name']].remove(connection)
-                self._created_connections_per_node[node['name']] -= 1
-                break
-            await asyncio.sleep(self.idle_check_interval)
+    def _has_connections(self):
+        return any(self._created_connections_per_node.values())
+
+    def disconnect_idle_connections(self):
+        """
+        Closes the available connections unused for more than max_idle_time,
+        keeping at least min_connections connections to each node
+        """
+        for name, available in self._available_connections.items():
+            created = self._created_connections_per_node.get(name, 0)
+            available[:] = self._reap(available, created)
+
+    async def warmup(self):
+        """
+        Opens connections until the pool holds ``min_connections`` of them
+        to each master node, concurrently
+        """
+        await self.initialize()
+        self._checkpid()
+        connections = []
+        for node in self.nodes.all_masters():
+            missing = self.min_connections - self._created_connections_per_node.get(node['name'], 0)
+            connections.extend(self.make_connection(node) for _ in range(missing))
+        await self._connect_all(connections)
+
+    def _discard(self, connection):
+        connection.disconnect()
+        self._count_closed(connection)
+        self._created_connections_per_node[connection.node['name']] -= 1
+
+    def stats(self):
+        """
+        Returns the number of connections of the pool and its counters, the
+        numbers of connections are also given per node
+        """
+        nodes = {}
+        for name, created in self._created_connections_per_node.items():
+            nodes[name] = {
+                'created': created,
+                'in_use': len(self._in_use_connections.get(name, ())),
+                'available': len(self._available_connections.get(name, ())),
+            }
+        return {
+            'created': sum(node['created'] for node in nodes.values()),
+            'in_use': sum(node['in_use'] for node in nodes.values()),
+            'available': sum(node['available'] for node in nodes.values()),
+            'max_connections': self.max_connections,
+            'min_connections': self.min_connections,
+            'opened': self.opened,
+            'closed': self.closed,
+            'idle_closed': self.idle_closed,
+            'reconnects': self._reconnects(self._connections()),
+            'nodes': nodes,
+        }
+
+    def _connections(self):
+        return chain(*self._available_connections.values(),
+                     *self._in_use_connections.values())
+
+    def _add_available(self, connection):
+        self._available_connections.setdefault(connection.node['name'], []).append(connection)
 
     def reset(self):
         """Resets the connection pool back to a clean state"""
         self.pid = os.getpid()
+        self._stop_reaper()
         self._created_connections_per_node = {}  # Dict(Node, Int)
         self._available_connections = {}  # Dict(Node, List)
         self._in_use_connections = {}  # Dict(Node, Set)
@@ -391,15 +710,16 @@ class ClusterConnectionPool(ConnectionPool):
 
         self._created_connections_per_node.setdefault(node['name'], 0)
         self._created_connections_per_node[node['name']] += 1
+        self.opened += 1
         connection = self.connection_class(host=node["host"],
                                            port=node["port"],
                                            **self.connection_kwargs)
 
         # Must store node in the connection to make it eaiser to track
         connection.node = node
-        if self.max_idle_time > self.idle_check_interval > 0:
-            # do not await the future
-            asyncio.ensure_future(self.disconnect_on_idle_time_exceeded(connection))
+        if self.hooks is not None:
+            connection.set_hooks(self.hooks)
+        self._start_reaper()
         return connection
 
     def release(self, connection):
@@ -419,6 +739,7 @@ class ClusterConnectionPool(ConnectionPool):
         # discard connection with unread response
         if connection.awaiting_response:
             connection.disconnect()
+            self._count_closed(connection)
             # reduce node connection count in case of too many connection error raised
             if self.max_connections_per_node and self._created_connections_per_node.get(connection.node['name']):
                 self._created_connections_per_node[connection.node['name']] -= 1
@@ -491,6 +812,32 @@ class ClusterConnectionPool(ConnectionPool):
 
         return connection
 
+    async def _checked(self, connection):
+        if self.health_check_interval:
+            self._check_health(connection)
+        return connection
+
+    async def wait_for_connection_by_node(self, node):
+        """
+        Gets a connection by node, checked with its next command if it is
+        unused for more than health_check_interval seconds
+        """
+        return await self._checked(self.get_connection_by_node(node))
+
+    async def wait_for_connection_by_slot(self, slot):
+        """
+        Gets a connection to the server of a slot, checked with its next
+        command if it is unused for more than health_check_interval seconds
+        """
+        return await self._checked(self.get_connection_by_slot(slot))
+
+    async def wait_for_random_connection(self):
+        """
+        Gets a connection to a random server, checked with its next command
+        if it is unused for more than health_check_interval seconds
+        """
+        return await self._checked(self.get_random_connection())
+
     def get_master_node_by_slot(self, slot):
         return self.nodes.slots[slot][0]
 
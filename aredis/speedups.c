@@ -124,9 +124,1032 @@ static PyObject* hash_slot(PyObject* self, PyObject* args) {
 
 
 
+/* RESP command encoding
+ *
+ * Arguments are first converted to bytes-like pieces, then the sizes of
+ * all the headers and payloads are computed so that the whole command (or
+ * pipeline) is written into one preallocated bytes object. Payloads larger
+ * than `buffer_cutoff` are not copied, they are returned as separate
+ * chunks between the packed segments. Arguments supporting the buffer
+ * protocol are kept as flat memoryviews of their data.
+ *
+ * Every command starts with a raw piece holding its encoded
+ * "*<argc>\r\n$<len>\r\n<name>\r\n" header, which is cached per command
+ * name and number of arguments.
+ */
+#define HEADER_CACHE_MAX_SIZE 1024
+#define HEADER_CACHE_MAX_ARGS 64
+
+/* {command name: [header or None, indexed by the number of arguments]} */
+static PyObject *header_cache = NULL;
+
+typedef struct {
+    PyObject *obj;          /* owned bytes or memoryview, NULL for inlined data */
+    Py_ssize_t len;
+    int raw;                /* written as is, without a bulk header */
+    char small[24];         /* digits of an inlined integer */
+} piece_t;
+
+typedef struct {
+    piece_t *items;
+    Py_ssize_t len;
+    Py_ssize_t cap;
+} pieces_t;
+
+typedef struct {
+    Py_ssize_t *items;
+    Py_ssize_t len;
+    Py_ssize_t cap;
+} sizes_t;
+
+
+static int sizes_append(sizes_t *sizes, Py_ssize_t value) {
+    if (sizes->len == sizes->cap) {
+        Py_ssize_t cap = sizes->cap ? sizes->cap * 2 : 16;
+        Py_ssize_t *items = PyMem_Realloc(sizes->items, cap * sizeof(Py_ssize_t));
+        if (!items) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        sizes->items = items;
+        sizes->cap = cap;
+    }
+    sizes->items[sizes->len++] = value;
+    return 0;
+}
+
+
+static piece_t* pieces_new(pieces_t *pieces) {
+    piece_t *piece;
+    if (pieces->len == pieces->cap) {
+        Py_ssize_t cap = pieces->cap ? pieces->cap * 2 : 16;
+        piece_t *items = PyMem_Realloc(pieces->items, cap * sizeof(piece_t));
+        if (!items) {
+            PyErr_NoMemory();
+            return NULL;
+        }
+        pieces->items = items;
+        pieces->cap = cap;
+    }
+    piece = &pieces->items[pieces->len++];
+    piece->obj = NULL;
+    piece->len = 0;
+    piece->raw = 0;
+    return piece;
+}
+
+
+static void pieces_clear(pieces_t *pieces) {
+    Py_ssize_t i;
+    for (i = 0; i < pieces->len; i++)
+        Py_XDECREF(pieces->items[i].obj);
+    PyMem_Free(pieces->items);
+    pieces->items = NULL;
+    pieces->len = pieces->cap = 0;
+}
+
+
+static const char* piece_data(piece_t *piece) {
+    if (piece->obj == NULL)
+        return piece->small;
+    if (PyMemoryView_Check(piece->obj))
+        return PyMemoryView_GET_BUFFER(piece->obj)->buf;
+    return PyBytes_AS_STRING(piece->obj);
+}
+
+
+/* Takes ownership of `obj`, which must be a bytes object */
+static int pieces_append_bytes(pieces_t *pieces, PyObject *obj) {
+    piece_t *piece;
+    if (obj == NULL)
+        return -1;
+    piece = pieces_new(pieces);
+    if (piece == NULL) {
+        Py_DECREF(obj);
+        return -1;
+    }
+    piece->obj = obj;
+    piece->len = PyBytes_GET_SIZE(obj);
+    return 0;
+}
+
+
+/* Appends an object supporting the buffer protocol without copying its
+ * data, unless it is not contiguous */
+static int pieces_append_buffer(pieces_t *pieces, PyObject *arg) {
+    PyObject *view, *flat;
+    piece_t *piece;
+
+    view = PyMemoryView_FromObject(arg);
+    if (view == NULL)
+        return -1;
+    if (!PyBuffer_IsContiguous(PyMemoryView_GET_BUFFER(view), 'C')) {
+        flat = PyBytes_FromObject(view);
+        Py_DECREF(view);
+        return pieces_append_bytes(pieces, flat);
+    }
+    /* a flat view of bytes, whatever the format and shape of the data */
+    flat = PyObject_CallMethod(view, "cast", "s", "B");
+    Py_DECREF(view);
+    if (flat == NULL)
+        return -1;
+    piece = pieces_new(pieces);
+    if (piece == NULL) {
+        Py_DECREF(flat);
+        return -1;
+    }
+    piece->obj = flat;
+    piece->len = PyMemoryView_GET_BUFFER(flat)->len;
+    return 0;
+}
+
+
+static PyObject* encode_text(PyObject *text, const char *encoding) {
+    PyObject *encoded;
+    if (text == NULL)
+        return NULL;
+    encoded = PyUnicode_AsEncodedString(text, encoding, "strict");
+    Py_DECREF(text);
+    return encoded;
+}
+
+
+/* Mirrors `BaseConnection.encode` */
+static int pieces_append_arg(pieces_t *pieces, PyObject *arg, const char *encoding) {
+    if (PyBytes_Check(arg)) {
+        Py_INCREF(arg);
+        return pieces_append_bytes(pieces, arg);
+    }
+    if (PyLong_CheckExact(arg)) {
+        int overflow;
+        long long value = PyLong_AsLongLongAndOverflow(arg, &overflow);
+        if (!overflow && !(value == -1 && PyErr_Occurred())) {
+            piece_t *piece = pieces_new(pieces);
+            if (piece == NULL)
+                return -1;
+            piece->len = snprintf(piece->small, sizeof(piece->small), "%lld", value);
+            return 0;
+        }
+        PyErr_Clear();
+    }
+    if (PyLong_Check(arg))
+        return pieces_append_bytes(pieces, encode_text(PyObject_Str(arg), "latin-1"));
+    if (PyFloat_Check(arg))
+        return pieces_append_bytes(pieces, encode_text(PyObject_Repr(arg), "latin-1"));
+    if (PyUnicode_Check(arg))
+        return pieces_append_bytes(pieces, PyUnicode_AsEncodedString(arg, encoding, "strict"));
+    if (PyObject_CheckBuffer(arg))
+        return pieces_append_buffer(pieces, arg);
+    return pieces_append_bytes(pieces, encode_text(PyObject_Str(arg), encoding));
+}
+
+
+static int digits(Py_ssize_t value) {
+    int n = 1;
+    while (value >= 10) {
+        value /= 10;
+        n++;
+    }
+    return n;
+}
+
+
+static char* write_header(char *p, char prefix, Py_ssize_t value) {
+    char buf[24];
+    int n = snprintf(buf, sizeof(buf), "%zd", value);
+    *p++ = prefix;
+    memcpy(p, buf, n);
+    p += n;
+    *p++ = '\r';
+    *p++ = '\n';
+    return p;
+}
+
+
+/* Returns a new reference to the header of `command` called with `nargs`
+ * arguments, the command name included */
+static PyObject* command_header(PyObject *command, Py_ssize_t nargs) {
+    PyObject *entries, *header, *words, *word;
+    Py_ssize_t i, nwords, size;
+    char *p;
+
+    entries = PyDict_GetItemWithError(header_cache, command);
+    if (entries == NULL && PyErr_Occurred())
+        return NULL;
+    if (entries != NULL && nargs < PyList_GET_SIZE(entries)) {
+        header = PyList_GET_ITEM(entries, nargs);
+        if (header != Py_None) {
+            Py_INCREF(header);
+            return header;
+        }
+    }
+
+    /* the client might have included 1 or more literal arguments in the
+     * command name, e.g., 'CONFIG GET'. The Redis server expects these
+     * arguments to be sent separately */
+    if (PyUnicode_FindChar(command, ' ', 0, PyUnicode_GET_LENGTH(command), 1) >= 0) {
+        words = PyUnicode_Split(command, NULL, -1);
+    } else {
+        words = PyList_New(1);
+        if (words != NULL) {
+            Py_INCREF(command);
+            PyList_SET_ITEM(words, 0, command);
+        }
+    }
+    if (words == NULL)
+        return NULL;
+    nwords = PyList_GET_SIZE(words);
+    for (i = 0; i < nwords; i++) {
+        word = PyUnicode_AsLatin1String(PyList_GET_ITEM(words, i));
+        if (word == NULL || PyList_SetItem(words, i, word) < 0) {
+            Py_DECREF(words);
+            return NULL;
+        }
+    }
+    size = 3 + digits(nwords + nargs - 1);
+    for (i = 0; i < nwords; i++) {
+        Py_ssize_t len = PyBytes_GET_SIZE(PyList_GET_ITEM(words, i));
+        size += 5 + digits(len) + len;
+    }
+    header = PyBytes_FromStringAndSize(NULL, size);
+    if (header == NULL) {
+        Py_DECREF(words);
+        return NULL;
+    }
+    p = write_header(PyBytes_AS_STRING(header), '*', nwords + nargs - 1);
+    for (i = 0; i < nwords; i++) {
+        word = PyList_GET_ITEM(words, i);
+        p = write_header(p, '$', PyBytes_GET_SIZE(word));
+        memcpy(p, PyBytes_AS_STRING(word), PyBytes_GET_SIZE(word));
+        p += PyBytes_GET_SIZE(word);
+        *p++ = '\r';
+        *p++ = '\n';
+    }
+    Py_DECREF(words);
+
+    if (nargs >= HEADER_CACHE_MAX_ARGS || !PyUnicode_CheckExact(command))
+        return header;
+    if (entries == NULL) {
+        if (PyDict_GET_SIZE(header_cache) >= HEADER_CACHE_MAX_SIZE)
+            return header;
+        entries = PyList_New(0);
+        if (entries == NULL || PyDict_SetItem(header_cache, command, entries) < 0) {
+            Py_XDECREF(entries);
+            Py_DECREF(header);
+            return NULL;
+        }
+        Py_DECREF(entries);
+    }
+    while (PyList_GET_SIZE(entries) <= nargs) {
+        if (PyList_Append(entries, Py_None) < 0) {
+            Py_DECREF(header);
+            return NULL;
+        }
+    }
+    Py_INCREF(header);
+    PyList_SetItem(entries, nargs, header);
+    return header;
+}
+
+
+/* Appends the pieces of one command, returns the number of pieces */
+static Py_ssize_t pieces_append_command(pieces_t *pieces, PyObject *args, const char *encoding) {
+    PyObject *seq, *command;
+    piece_t *piece;
+    Py_ssize_t i, n, argc = 0;
+
+    seq = PySequence_Fast(args, "command must be a sequence");
+    if (seq == NULL)
+        return -1;
+    n = PySequence_Fast_GET_SIZE(seq);
+    if (n == 0) {
+        PyErr_SetString(PyExc_ValueError, "command must not be empty");
+        goto error;
+    }
+    /* the client might have included 1 or more literal arguments in the
+     * command name, e.g., 'CONFIG GET'. The Redis server expects these
+     * arguments to be sent separately */
+    command = PySequence_Fast_GET_ITEM(seq, 0);
+    if (PyUnicode_Check(command)) {
+        if (pieces_append_bytes(pieces, command_header(command, n)) < 0)
+            goto error;
+        pieces->items[pieces->len - 1].raw = 1;
+    } else {
+        piece = pieces_new(pieces);
+        if (piece == NULL)
+            goto error;
+        piece->raw = 1;
+        piece->len = snprintf(piece->small, sizeof(piece->small), "*%zd\r\n", n);
+        if (pieces_append_arg(pieces, command, encoding) < 0)
+            goto error;
+        argc++;
+    }
+    argc++;
+    for (i = 1; i < n; i++) {
+        if (pieces_append_arg(pieces, PySequence_Fast_GET_ITEM(seq, i), encoding) < 0)
+            goto error;
+        argc++;
+    }
+    Py_DECREF(seq);
+    return argc;
+
+error:
+    Py_DECREF(seq);
+    return -1;
+}
+
+
+static int is_large(piece_t *piece, Py_ssize_t buffer_cutoff) {
+    return piece->obj != NULL && !piece->raw && piece->len > buffer_cutoff;
+}
+
+
+/* Packs the collected commands, `argcs` holds the number of pieces of
+ * each command, its header included */
+static PyObject* pack_pieces(pieces_t *pieces, sizes_t *argcs, Py_ssize_t buffer_cutoff) {
+    PyObject *output, *segment;
+    sizes_t segments = {NULL, 0, 0};
+    Py_ssize_t i, j, k, size = 0;
+    char *p;
+
+    /* compute the size of every segment between large payloads */
+    for (i = 0, k = 0; i < argcs->len; i++) {
+        for (j = 0; j < argcs->items[i]; j++, k++) {
+            Py_ssize_t len = pieces->items[k].len;
+            if (pieces->items[k].raw) {
+                size += len;
+                continue;
+            }
+            size += 3 + digits(len);
+            if (is_large(&pieces->items[k], buffer_cutoff)) {
+                if (sizes_append(&segments, size) < 0)
+                    goto error;
+                size = 0;
+            } else {
+                size += len;
+            }
+            size += 2;
+        }
+    }
+    if (sizes_append(&segments, size) < 0)
+        goto error;
+
+    output = PyList_New(0);
+    if (output == NULL)
+        goto error;
+
+    size = 0;
+    segment = PyBytes_FromStringAndSize(NULL, segments.items[size]);
+    if (segment == NULL)
+        goto output_error;
+    p = PyBytes_AS_STRING(segment);
+    for (i = 0, k = 0; i < argcs->len; i++) {
+        for (j = 0; j < argcs->items[i]; j++, k++) {
+            piece_t *piece = &pieces->items[k];
+            if (piece->raw) {
+                memcpy(p, piece_data(piece), piece->len);
+                p += piece->len;
+                continue;
+            }
+            p = write_header(p, '$', piece->len);
+            if (is_large(piece, buffer_cutoff)) {
+                if (PyList_Append(output, segment) < 0) {
+                    Py_DECREF(segment);
+                    goto output_error;
+                }
+                Py_DECREF(segment);
+                if (PyList_Append(output, piece->obj) < 0)
+                    goto output_error;
+                segment = PyBytes_FromStringAndSize(NULL, segments.items[++size]);
+                if (segment == NULL)
+                    goto output_error;
+                p = PyBytes_AS_STRING(segment);
+            } else {
+                memcpy(p, piece_data(piece), piece->len);
+                p += piece->len;
+            }
+            *p++ = '\r';
+            *p++ = '\n';
+        }
+    }
+    if (PyBytes_GET_SIZE(segment) > 0 && PyList_Append(output, segment) < 0) {
+        Py_DECREF(segment);
+        goto output_error;
+    }
+    Py_DECREF(segment);
+    PyMem_Free(segments.items);
+    return output;
+
+output_error:
+    Py_DECREF(output);
+error:
+    PyMem_Free(segments.items);
+    return NULL;
+}
+
+
+static PyObject* pack_command(PyObject* self, PyObject* args) {
+    PyObject *command, *output = NULL;
+    const char *encoding = "utf-8";
+    Py_ssize_t buffer_cutoff = 6000, argc;
+    pieces_t pieces = {NULL, 0, 0};
+    sizes_t argcs = {NULL, 0, 0};
+
+    if (!PyArg_ParseTuple(args, "O|sn", &command, &encoding, &buffer_cutoff)) {
+        return NULL;
+    }
+    argc = pieces_append_command(&pieces, command, encoding);
+    if (argc >= 0 && sizes_append(&argcs, argc) == 0)
+        output = pack_pieces(&pieces, &argcs, buffer_cutoff);
+    pieces_clear(&pieces);
+    PyMem_Free(argcs.items);
+    return output;
+}
+
+
+static PyObject* pack_commands(PyObject* self, PyObject* args) {
+    PyObject *commands, *iterator, *command, *output = NULL;
+    const char *encoding = "utf-8";
+    Py_ssize_t buffer_cutoff = 6000, argc;
+    pieces_t pieces = {NULL, 0, 0};
+    sizes_t argcs = {NULL, 0, 0};
+
+    if (!PyArg_ParseTuple(args, "O|sn", &commands, &encoding, &buffer_cutoff)) {
+        return NULL;
+    }
+    iterator = PyObject_GetIter(commands);
+    if (iterator == NULL)
+        return NULL;
+    while ((command = PyIter_Next(iterator)) != NULL) {
+        argc = pieces_append_command(&pieces, command, encoding);
+        Py_DECREF(command);
+        if (argc < 0 || sizes_append(&argcs, argc) < 0)
+            goto done;
+    }
+    if (!PyErr_Occurred())
+        output = pack_pieces(&pieces, &argcs, buffer_cutoff);
+
+done:
+    Py_DECREF(iterator);
+    pieces_clear(&pieces);
+    PyMem_Free(argcs.items);
+    return output;
+}
+
+
+/* RESP reply parsing
+ *
+ * Reader is an incremental parser with the feed/gets interface of
+ * hiredis.Reader: data read from the socket is fed into an internal buffer
+ * and gets() returns the next complete reply, or False when more data is
+ * needed. Arrays which are not complete yet are kept on a stack between
+ * calls, so a large reply spanning many reads is parsed exactly once.
+ *
+ * RESP3 aggregates are collected in a list as well and converted when they
+ * are complete: maps to dict, sets to set, attributes are dropped and push
+ * messages are passed to the push handler (if any) instead of being
+ * returned.
+ */
+typedef struct {
+    PyObject *list;         /* owned reference */
+    Py_ssize_t len;
+    Py_ssize_t idx;
+    char type;              /* type byte of the aggregate */
+} frame_t;
+
+typedef struct {
+    PyObject_HEAD
+    char *buf;
+    Py_ssize_t pos;
+    Py_ssize_t len;
+    Py_ssize_t cap;
+    frame_t *stack;
+    Py_ssize_t depth;
+    Py_ssize_t stack_cap;
+    Py_ssize_t bulk_len;    /* -1 unless a bulk header has been parsed */
+    char bulk_type;
+    PyObject *protocol_error;
+    PyObject *reply_error;
+    PyObject *push_handler;
+    PyObject *not_enough_data;
+    char *encoding;
+    char *errors;
+} Reader;
+
+
+static void reader_clear_stack(Reader *self) {
+    while (self->depth > 0) {
+        self->depth--;
+        Py_CLEAR(self->stack[self->depth].list);
+    }
+    self->bulk_len = -1;
+}
+
+
+static char* copy_string(const char *value) {
+    size_t len = strlen(value) + 1;
+    char *copy = PyMem_Malloc(len);
+    if (!copy) {
+        PyErr_NoMemory();
+        return NULL;
+    }
+    memcpy(copy, value, len);
+    return copy;
+}
+
+
+static int Reader_init(Reader *self, PyObject *args, PyObject *kwds) {
+    static char *kwlist[] = {"protocolError", "replyError", "encoding", "errors",
+                             "notEnoughData", NULL};
+    PyObject *protocol_error = NULL, *reply_error = NULL, *not_enough_data = Py_False;
+    const char *encoding = NULL, *errors = NULL;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwds, "|OOzzO", kwlist, &protocol_error,
+                                     &reply_error, &encoding, &errors, &not_enough_data)) {
+        return -1;
+    }
+    if (protocol_error == NULL || protocol_error == Py_None)
+        protocol_error = PyExc_ValueError;
+    if (reply_error == NULL || reply_error == Py_None)
+        reply_error = PyExc_Exception;
+    if (!PyCallable_Check(protocol_error) || !PyCallable_Check(reply_error)) {
+        PyErr_SetString(PyExc_TypeError, "protocolError and replyError must be callable");
+        return -1;
+    }
+    Py_INCREF(protocol_error);
+    Py_XSETREF(self->protocol_error, protocol_error);
+    Py_INCREF(reply_error);
+    Py_XSETREF(self->reply_error, reply_error);
+    Py_INCREF(not_enough_data);
+    Py_XSETREF(self->not_enough_data, not_enough_data);
+
+    PyMem_Free(self->encoding);
+    self->encoding = NULL;
+    PyMem_Free(self->errors);
+    self->errors = NULL;
+    if (encoding && !(self->encoding = copy_string(encoding)))
+        return -1;
+    if (errors && !(self->errors = copy_string(errors)))
+        return -1;
+    reader_clear_stack(self);
+    self->pos = self->len = 0;
+    return 0;
+}
+
+
+/* the reply error and the push handler are usually bound methods of the
+ * parser owning the reader, the reader takes part in the garbage collection
+ * so that the cycle is collected when the parser is dropped */
+static int Reader_traverse(Reader *self, visitproc visit, void *arg) {
+    Py_ssize_t i;
+
+    Py_VISIT(self->protocol_error);
+    Py_VISIT(self->reply_error);
+    Py_VISIT(self->push_handler);
+    Py_VISIT(self->not_enough_data);
+    for (i = 0; i < self->depth; i++)
+        Py_VISIT(self->stack[i].list);
+    return 0;
+}
+
+
+/* the references used by any call of the reader are only dropped by
+ * Reader_dealloc, gets() raises Exception once the reply error is cleared */
+static int Reader_clear(Reader *self) {
+    reader_clear_stack(self);
+    Py_CLEAR(self->reply_error);
+    Py_CLEAR(self->push_handler);
+    return 0;
+}
+
+
+static void Reader_dealloc(Reader *self) {
+    PyObject_GC_UnTrack(self);
+    Reader_clear(self);
+    Py_XDECREF(self->protocol_error);
+    Py_XDECREF(self->not_enough_data);
+    PyMem_Free(self->stack);
+    PyMem_Free(self->buf);
+    PyMem_Free(self->encoding);
+    PyMem_Free(self->errors);
+    Py_TYPE(self)->tp_free((PyObject *)self);
+}
+
+
+static PyObject* Reader_new(PyTypeObject *type, PyObject *args, PyObject *kwds) {
+    Reader *self = (Reader *)type->tp_alloc(type, 0);
+    if (self) {
+        self->bulk_len = -1;
+        Py_INCREF(Py_False);
+        self->not_enough_data = Py_False;
+    }
+    return (PyObject *)self;
+}
+
+
+static PyObject* Reader_feed(Reader *self, PyObject *args) {
+    Py_buffer data;
+    Py_ssize_t offset = 0, length = -1;
+
+    if (!PyArg_ParseTuple(args, "y*|nn", &data, &offset, &length)) {
+        return NULL;
+    }
+    if (offset < 0 || offset > data.len)
+        offset = data.len;
+    if (length < 0 || length > data.len - offset)
+        length = data.len - offset;
+    if (length > 0) {
+        /* drop the consumed data before growing the buffer */
+        if (self->pos > 0) {
+            memmove(self->buf, self->buf + self->pos, self->len - self->pos);
+            self->len -= self->pos;
+            self->pos = 0;
+        }
+        if (self->len + length > self->cap) {
+            Py_ssize_t cap = self->cap ? self->cap : 16384;
+            char *buf;
+            while (cap < self->len + length)
+                cap *= 2;
+            buf = PyMem_Realloc(self->buf, cap);
+            if (!buf) {
+                PyBuffer_Release(&data);
+                return PyErr_NoMemory();
+            }
+            self->buf = buf;
+            self->cap = cap;
+        }
+        memcpy(self->buf + self->len, (char *)data.buf + offset, length);
+        self->len += length;
+    }
+    PyBuffer_Release(&data);
+    Py_RETURN_NONE;
+}
+
+
+static PyObject* reader_protocol_error(Reader *self, char byte) {
+    PyObject *message, *exc;
+
+    reader_clear_stack(self);
+    /* the stream can not be resynchronized after a protocol error */
+    self->pos = self->len = 0;
+    PyErr_Clear();
+    if (byte)
+        message = PyUnicode_FromFormat("Protocol error, got \"%c\" as reply type byte", byte);
+    else
+        message = PyUnicode_FromString("Protocol error, invalid reply");
+    if (!message)
+        return NULL;
+    exc = PyObject_CallFunctionObjArgs(self->protocol_error, message, NULL);
+    Py_DECREF(message);
+    if (exc) {
+        PyErr_SetObject((PyObject *)Py_TYPE(exc), exc);
+        Py_DECREF(exc);
+    }
+    return NULL;
+}
+
+
+static int parse_length(const char *p, const char *end, Py_ssize_t *value) {
+    int negative = 0;
+    Py_ssize_t result = 0;
+
+    if (p < end && *p == '-') {
+        negative = 1;
+        p++;
+    }
+    if (p == end)
+        return -1;
+    for (; p < end; p++) {
+        if (*p < '0' || *p > '9' || result > (PY_SSIZE_T_MAX - 9) / 10)
+            return -1;
+        result = result * 10 + (*p - '0');
+    }
+    *value = negative ? -result : result;
+    return 0;
+}
+
+
+static PyObject* parse_integer(const char *p, Py_ssize_t len) {
+    Py_ssize_t value;
+    PyObject *text, *result;
+
+    if (len < 19 && parse_length(p, p + len, &value) == 0)
+        return PyLong_FromSsize_t(value);
+    /* big numbers are left to Python */
+    text = PyUnicode_FromStringAndSize(p, len);
+    if (!text)
+        return NULL;
+    result = PyLong_FromUnicodeObject(text, 10);
+    Py_DECREF(text);
+    return result;
+}
+
+
+static PyObject* reader_string(Reader *self, const char *p, Py_ssize_t len) {
+    if (self->encoding)
+        return PyUnicode_Decode(p, len, self->encoding, self->errors);
+    return PyBytes_FromStringAndSize(p, len);
+}
+
+
+static PyObject* reader_error(Reader *self, const char *p, Py_ssize_t len) {
+    PyObject *message, *exc;
+
+    message = PyUnicode_DecodeUTF8(p, len, "replace");
+    if (!message)
+        return NULL;
+    exc = PyObject_CallFunctionObjArgs(self->reply_error ? self->reply_error : PyExc_Exception,
+                                       message, NULL);
+    Py_DECREF(message);
+    return exc;
+}
+
+
+static int reader_push(Reader *self, Py_ssize_t len, char type) {
+    frame_t *frame;
+
+    if (self->depth == self->stack_cap) {
+        Py_ssize_t cap = self->stack_cap ? self->stack_cap * 2 : 8;
+        frame_t *stack = PyMem_Realloc(self->stack, cap * sizeof(frame_t));
+        if (!stack) {
+            PyErr_NoMemory();
+            return -1;
+        }
+        self->stack = stack;
+        self->stack_cap = cap;
+    }
+    frame = &self->stack[self->depth];
+    frame->list = PyList_New(len);
+    if (!frame->list)
+        return -1;
+    frame->len = len;
+    frame->idx = 0;
+    frame->type = type;
+    self->depth++;
+    return 0;
+}
+
+
+/* Converts a complete RESP3 aggregate, steals the reference to `list`.
+ * Returns 1 and sets `value`, 0 if the aggregate has no value (attributes
+ * and handled push messages) or -1 on error */
+static int reader_aggregate(Reader *self, char type, PyObject *list, PyObject **value) {
+    PyObject *result = NULL;
+    Py_ssize_t i;
+
+    switch (type) {
+    case '%':
+        result = PyDict_New();
+        for (i = 0; result != NULL && i < PyList_GET_SIZE(list); i += 2) {
+            if (PyDict_SetItem(result, PyList_GET_ITEM(list, i),
+                               PyList_GET_ITEM(list, i + 1)) < 0)
+                Py_CLEAR(result);
+        }
+        break;
+    case '~':
+        result = PySet_New(list);
+        if (result == NULL && PyErr_ExceptionMatches(PyExc_TypeError)) {
+            /* elements which can not be hashed are kept in a list */
+            PyErr_Clear();
+            *value = list;
+            return 1;
+        }
+        break;
+    case '>':
+        if (self->push_handler == NULL) {
+            *value = list;
+            return 1;
+        }
+        result = PyObject_CallFunctionObjArgs(self->push_handler, list, NULL);
+        Py_DECREF(list);
+        if (result == NULL)
+            return -1;
+        Py_DECREF(result);
+        return 0;
+    default:
+        /* attributes are dropped, the value they annotate follows them */
+        Py_DECREF(list);
+        return 0;
+    }
+    Py_DECREF(list);
+    if (result == NULL)
+        return -1;
+    *value = result;
+    return 1;
+}
+
+
+static PyObject* reader_bulk(Reader *self, char type, const char *p, Py_ssize_t len) {
+    if (type == '!')
+        return reader_error(self, p, len);
+    /* the first 4 bytes of a verbatim string are its format, e.g. "txt:" */
+    if (type == '=' && len >= 4) {
+        p += 4;
+        len -= 4;
+    }
+    return reader_string(self, p, len);
+}
+
+
+static PyObject* reader_not_enough_data(Reader *self) {
+    Py_INCREF(self->not_enough_data);
+    return self->not_enough_data;
+}
+
+
+static PyObject* Reader_gets(Reader *self, PyObject *unused) {
+    PyObject *obj;
+    const char *line, *cr;
+    Py_ssize_t len;
+    char byte;
+
+    for (;;) {
+        if (self->bulk_len >= 0) {
+            /* payload of a bulk string whose header is already parsed */
+            if (self->len - self->pos < self->bulk_len + 2)
+                return reader_not_enough_data(self);
+            obj = reader_bulk(self, self->bulk_type, self->buf + self->pos, self->bulk_len);
+            self->pos += self->bulk_len + 2;
+            self->bulk_len = -1;
+        } else {
+            if (self->pos == self->len)
+                return reader_not_enough_data(self);
+            line = self->buf + self->pos;
+            cr = memchr(line, '\r', self->len - self->pos);
+            if (cr == NULL || cr + 1 == self->buf + self->len)
+                return reader_not_enough_data(self);
+            if (cr[1] != '\n' || cr == line)
+                return reader_protocol_error(self, 0);
+            byte = *line++;
+            len = cr - line;
+            self->pos = cr + 2 - self->buf;
+            switch (byte) {
+            case '+':
+                obj = reader_string(self, line, len);
+                break;
+            case '-':
+                obj = reader_error(self, line, len);
+                break;
+            case ':':
+            case '(':
+                obj = parse_integer(line, len);
+                if (!obj)
+                    return reader_protocol_error(self, 0);
+                break;
+            case ',': {
+                PyObject *text = PyUnicode_FromStringAndSize(line, len);
+                if (!text)
+                    goto error;
+                obj = PyFloat_FromString(text);
+                Py_DECREF(text);
+                if (!obj)
+                    return reader_protocol_error(self, 0);
+                break;
+            }
+            case '#':
+                if (len != 1 || (*line != 't' && *line != 'f'))
+                    return reader_protocol_error(self, 0);
+                obj = PyBool_FromLong(*line == 't');
+                break;
+            case '_':
+                obj = Py_None;
+                Py_INCREF(obj);
+                break;
+            case '$':
+            case '=':
+            case '!':
+                if (parse_length(line, cr, &len) < 0 || len < -1)
+                    return reader_protocol_error(self, 0);
+                if (len >= 0) {
+                    self->bulk_len = len;
+                    self->bulk_type = byte;
+                    continue;
+                }
+                obj = Py_None;
+                Py_INCREF(obj);
+                break;
+            case '*':
+            case '%':
+            case '~':
+            case '>':
+            case '|':
+                if (parse_length(line, cr, &len) < 0 || len < -1)
+                    return reader_protocol_error(self, 0);
+                if (len == -1) {
+                    obj = Py_None;
+                    Py_INCREF(obj);
+                    break;
+                }
+                if (byte == '%' || byte == '|')
+                    len *= 2;
+                if (len > 0) {
+                    if (reader_push(self, len, byte) < 0)
+                        goto error;
+                    continue;
+                }
+                obj = PyList_New(0);
+                if (obj != NULL && byte != '*') {
+                    int found = reader_aggregate(self, byte, obj, &obj);
+                    if (found < 0)
+                        goto aggregate_error;
+                    if (found == 0)
+                        continue;
+                }
+                break;
+            default:
+                return reader_protocol_error(self, byte);
+            }
+        }
+        if (!obj)
+            goto error;
+        /* add the value to the aggregates it completes */
+        while (self->depth > 0) {
+            frame_t *frame = &self->stack[self->depth - 1];
+            PyList_SET_ITEM(frame->list, frame->idx, obj);
+            obj = NULL;
+            if (++frame->idx < frame->len)
+                break;
+            obj = frame->list;
+            frame->list = NULL;
+            self->depth--;
+            if (frame->type != '*') {
+                int found = reader_aggregate(self, frame->type, obj, &obj);
+                if (found < 0)
+                    goto aggregate_error;
+                if (found == 0) {
+                    obj = NULL;
+                    break;
+                }
+            }
+        }
+        /* a complete reply, unless it only completed part of an aggregate */
+        if (obj != NULL)
+            return obj;
+    }
+
+aggregate_error:
+    /* the push message has been consumed when the push handler fails, the
+     * replies which follow it can still be read */
+    if (self->depth == 0)
+        return NULL;
+error:
+    reader_clear_stack(self);
+    self->pos = self->len = 0;
+    return NULL;
+}
+
+
+static PyObject* Reader_buffered(Reader *self, PyObject *unused) {
+    return PyLong_FromSsize_t(self->len - self->pos);
+}
+
+
+static PyObject* Reader_set_push_handler(Reader *self, PyObject *handler) {
+    if (handler == Py_None) {
+        Py_CLEAR(self->push_handler);
+        Py_RETURN_NONE;
+    }
+    if (!PyCallable_Check(handler)) {
+        PyErr_SetString(PyExc_TypeError, "push handler must be callable");
+        return NULL;
+    }
+    Py_INCREF(handler);
+    Py_XSETREF(self->push_handler, handler);
+    Py_RETURN_NONE;
+}
+
+
+static PyMethodDef Reader_methods[] = {
+    {"feed", (PyCFunction)Reader_feed, METH_VARARGS, "feed data read from the socket"},
+    {"gets", (PyCFunction)Reader_gets, METH_NOARGS, "return the next reply, or False if it is not complete"},
+    {"buffered", (PyCFunction)Reader_buffered, METH_NOARGS, "number of bytes fed but not parsed yet"},
+    {"set_push_handler", (PyCFunction)Reader_set_push_handler, METH_O, "call a function with the push messages instead of returning them"},
+    {NULL, NULL, 0, NULL}
+};
+
+
+static PyTypeObject ReaderType = {
+    PyVarObject_HEAD_INIT(NULL, 0)
+    .tp_name = "aredis.speedups.Reader",
+    .tp_doc = "incremental parser of redis replies",
+    .tp_basicsize = sizeof(Reader),
+    .tp_itemsize = 0,
+    .tp_flags = Py_TPFLAGS_DEFAULT | Py_TPFLAGS_HAVE_GC,
+    .tp_new = Reader_new,
+    .tp_init = (initproc)Reader_init,
+    .tp_dealloc = (destructor)Reader_dealloc,
+    .tp_traverse = (traverseproc)Reader_traverse,
+    .tp_clear = (inquiry)Reader_clear,
+    .tp_free = PyObject_GC_Del,
+    .tp_methods = Reader_methods,
+};
+
+
 static PyMethodDef methods[] = {
     {"crc16", crc16, METH_VARARGS, "crc16 used to hash key to slot"},
     {"hash_slot", hash_slot, METH_VARARGS, "hash key to a redis cluster slot"},
+    {"pack_command", pack_command, METH_VARARGS, "pack a command into the redis protocol"},
+    {"pack_commands", pack_commands, METH_VARARGS, "pack multiple commands into the redis protocol"},
     {NULL, NULL, 0, NULL}
 };
 
@@ -142,5 +1165,20 @@ static struct PyModuleDef speedupsmodule = {
 
 PyMODINIT_FUNC
 PyInit_speedups(void) {
-    return PyModule_Create(&speedupsmodule);
+    PyObject *module;
+
+    if (PyType_Ready(&ReaderType) < 0)
+        return NULL;
+    if (header_cache == NULL && (header_cache = PyDict_New()) == NULL)
+        return NULL;
+    module = PyModule_Create(&speedupsmodule);
+    if (module == NULL)
+        return NULL;
+    Py_INCREF(&ReaderType);
+    if (PyModule_AddObject(module, "Reader", (PyObject *)&ReaderType) < 0) {
+        Py_DECREF(&ReaderType);
+        Py_DECREF(module);
+        return NULL;
+    }
+    return module;
 }
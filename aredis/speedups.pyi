@@ -1,2 +1,16 @@
+from typing import Any, Callable, Optional
+
 def crc16(data: bytes) -> int: ...
-def hash_slot(key: bytes) -> int: ...
\ No newline at end of file
+def hash_slot(key: bytes) -> int: ...
+def pack_command(command: tuple, encoding: str = ..., buffer_cutoff: int = ...) -> list: ...
+def pack_commands(commands: list, encoding: str = ..., buffer_cutoff: int = ...) -> list: ...
+
+
+class Reader:
+    def __init__(self, protocolError: Callable = ..., replyError: Callable = ...,
+                 encoding: Optional[str] = ..., errors: Optional[str] = ...,
+                 notEnoughData: Any = ...) -> None: ...
+    def feed(self, data: bytes, offset: int = ..., length: int = ...) -> None: ...
+    def gets(self) -> Any: ...
+    def buffered(self) -> int: ...
+    def set_push_handler(self, handler: Optional[Callable[[list], Any]]) -> None: ...
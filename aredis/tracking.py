@@ -0,0 +1,281 @@
+import asyncio
+from collections import OrderedDict
+
+from aredis.compat import CancelledError
+from aredis.exceptions import ConnectionError, TimeoutError
+from aredis.utils import nativestr
+
+# read commands whose replies can be cached, all of them read the single
+# key given as their first argument but the ones of ALL_KEYS_COMMANDS
+CACHEABLE_COMMANDS = {
+    'EXISTS', 'GET', 'GETRANGE', 'HEXISTS', 'HGET', 'HGETALL', 'HKEYS',
+    'HLEN', 'HMGET', 'HSTRLEN', 'HVALS', 'LINDEX', 'LLEN', 'LRANGE',
+    'SCARD', 'SISMEMBER', 'SMEMBERS', 'STRLEN', 'TYPE', 'ZCARD', 'ZCOUNT',
+    'ZRANGE', 'ZRANGEBYSCORE', 'ZRANK', 'ZREVRANGE', 'ZREVRANGEBYSCORE',
+    'ZREVRANK', 'ZSCORE'
+}
+
+# cacheable commands reading all their arguments as keys
+ALL_KEYS_COMMANDS = {'EXISTS'}
+
+# channel of the invalidation messages redirected to a RESP2 connection
+INVALIDATION_CHANNEL = '__redis__:invalidate'
+
+
+def _copy(response):
+    # callers own the replies they get, containers are copied so that
+    # mutating them does not change the cached reply
+    if isinstance(response, (list, dict, set)):
+        return response.copy()
+    return response
+
+
+class ClientCache:
+    """
+    Bounded LRU cache of the replies of read commands, kept consistent with
+    the server by CLIENT TRACKING.
+
+    The connections executing cached reads redirect their invalidation
+    messages to a dedicated listener connection, which receives them as
+    push messages with RESP3 or on the ``__redis__:invalidate`` channel
+    with RESP2. The cache is flushed when the listener is lost, and the
+    listener is connected again by the next cached read. The replies read
+    through a connection are dropped when it disconnects, as the server
+    stops tracking its keys.
+    """
+
+    def __init__(self, connection_pool, max_size=10000):
+        if not isinstance(max_size, int) or max_size < 1:
+            raise ValueError('"client_cache_max_size" must be a positive integer')
+        self.connection_pool = connection_pool
+        self.max_size = max_size
+        self.encoding = connection_pool.connection_kwargs.get('encoding', 'utf-8')
+        # command arguments -> (reply, connection it was read through),
+        # least recently used first
+        self._entries = OrderedDict()
+        # key -> command arguments of its cached replies
+        self._keys = {}
+        # key -> [number of reads in flight, number of invalidations], a
+        # reply invalidated while it is read is not cached
+        self._in_flight = {}
+        self._listener = None
+        self._listener_task = None
+        self._lock = None
+        # id of the listener connection, None when it is not connected
+        self.client_id = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Returns the counters of the cache"""
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+    def _encode_key(self, key):
+        if isinstance(key, bytes):
+            return key
+        if not isinstance(key, str):
+            key = str(key)
+        return key.encode(self.encoding)
+
+    async def execute(self, *args):
+        """
+        Returns the raw reply of a cacheable read command, out of the cache
+        if possible
+        """
+        try:
+            response, _ = self._entries[args]
+        except KeyError:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(args)
+            self.hits += 1
+            return _copy(response)
+        if self.client_id is None:
+            await self._connect_listener()
+        client_id = self.client_id
+        in_flight = []
+        for key in self._command_keys(args):
+            counters = self._in_flight.setdefault(key, [0, 0])
+            counters[0] += 1
+            in_flight.append((key, counters, counters[1]))
+        try:
+            response, connection = await self._execute(args, client_id)
+        finally:
+            for key, counters, _ in in_flight:
+                counters[0] -= 1
+                if not counters[0]:
+                    del self._in_flight[key]
+        # losing the listener flushes the cache, which counts as an
+        # invalidation of the reads in flight
+        if client_id is not None and all(counters[1] == invalidations
+                                         for _, counters, invalidations in in_flight):
+            self._set(args, _copy(response), connection)
+        return response
+
+    def _command_keys(self, args):
+        if args[0] in ALL_KEYS_COMMANDS:
+            return [self._encode_key(key) for key in args[1:]]
+        return [self._encode_key(args[1])]
+
+    async def _execute(self, args, client_id):
+        pool = self.connection_pool
+        connection = await pool.wait_for_connection()
+        try:
+            response = await self._tracked_read(connection, args, client_id)
+        except CancelledError:
+            # do not retry when coroutine is cancelled
+            connection.disconnect()
+            raise
+        except (ConnectionError, TimeoutError) as e:
+            connection.disconnect()
+            if not connection.retry_on_timeout and isinstance(e, TimeoutError):
+                raise
+            response = await self._tracked_read(connection, args, client_id)
+        finally:
+            pool.release(connection)
+        return response, connection
+
+    async def _tracked_read(self, connection, args, client_id):
+        if client_id is None or connection.tracking_redirect == client_id:
+            await connection.send_command(*args)
+            return await connection.read_response()
+        # tracking is enabled in the same round trip as the read
+        await connection.send_packed_command(connection.pack_commands([
+            ('CLIENT TRACKING', 'ON', 'REDIRECT', client_id), args
+        ]))
+        await connection.read_response()
+        connection.tracking_redirect = client_id
+        connection.tracking_lost_callback = self._on_tracking_lost
+        return await connection.read_response()
+
+    def _set(self, args, response, connection):
+        self._entries[args] = (response, connection)
+        self._entries.move_to_end(args)
+        for key in self._command_keys(args):
+            self._keys.setdefault(key, set()).add(args)
+        while len(self._entries) > self.max_size:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, args):
+        del self._entries[args]
+        for key in self._command_keys(args):
+            entries = self._keys.get(key)
+            if entries is not None:
+                entries.discard(args)
+                if not entries:
+                    del self._keys[key]
+
+    def _on_tracking_lost(self, connection):
+        # the server no longer tracks the keys read through the connection
+        for args in [args for args, (_, entry_connection) in self._entries.items()
+                     if entry_connection is connection]:
+            self._drop(args)
+
+    def invalidate(self, keys):
+        """Drops the cached replies of ``keys``, or all of them if None"""
+        if keys is None:
+            self.flush()
+            return
+        for key in keys:
+            key = self._encode_key(key)
+            counters = self._in_flight.get(key)
+            if counters is not None:
+                counters[1] += 1
+            entries = self._keys.pop(key, None)
+            if entries:
+                for args in entries:
+                    self._drop(args)
+                self.invalidations += 1
+
+    def invalidate_arguments(self, args):
+        """
+        Drops the cached replies of the keys among the arguments of a
+        command, so that the writes of this client are visible to its
+        next reads without waiting for the invalidation of the server
+        """
+        if self._keys or self._in_flight:
+            self.invalidate(arg for arg in args
+                            if isinstance(arg, (bytes, str, int)))
+
+    def flush(self):
+        """Drops all the cached replies"""
+        for counters in self._in_flight.values():
+            counters[1] += 1
+        self._entries.clear()
+        self._keys.clear()
+
+    async def _connect_listener(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self.client_id is not None:
+                return
+            pool = self.connection_pool
+            # the listener waits for messages indefinitely, it is not
+            # subject to the stream timeout nor to the idle time of the pool
+            kwargs = dict(pool.connection_kwargs, stream_timeout=None)
+            connection = pool.connection_class(**kwargs)
+            try:
+                if connection.protocol_version == 3:
+                    connection.set_push_handler(self._on_push)
+                await connection.send_command('CLIENT ID')
+                client_id = await connection.read_response()
+                if connection.protocol_version == 2:
+                    await connection.send_command('SUBSCRIBE', INVALIDATION_CHANNEL)
+                    await connection.read_response()
+            except Exception:
+                connection.disconnect()
+                raise
+            self._listener = connection
+            self.client_id = client_id
+            self._listener_task = asyncio.ensure_future(self._listen(connection),
+                                                        loop=connection.loop)
+
+    def _on_push(self, message):
+        if nativestr(message[0]) == 'invalidate':
+            self.invalidate(message[1])
+
+    async def _listen(self, connection):
+        try:
+            while True:
+                # RESP3 invalidations are handled by the push handler
+                message = await connection.read_response()
+                if (isinstance(message, list) and len(message) == 3
+                        and nativestr(message[0]) == 'message'):
+                    self.invalidate(message[2])
+        except CancelledError:
+            raise
+        except Exception:
+            # the listener is connected again by the next cached read
+            pass
+        finally:
+            connection.disconnect()
+            if self._listener is connection:
+                self._listener = None
+                self._listener_task = None
+                self.client_id = None
+                self.flush()
+
+    def close(self):
+        """Disconnects the listener and flushes the cache"""
+        if self._listener_task is not None:
+            self._listener_task.cancel()
+        if self._listener is not None:
+            self._listener.disconnect()
+        self._listener = None
+        self._listener_task = None
+        self.client_id = None
+        self.flush()
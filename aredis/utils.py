@@ -111,6 +111,9 @@ def int_or_none(response):
 
 def pairs_to_dict(response):
     """Creates a dict given a list of key/value pairs"""
+    if isinstance(response, dict):
+        # RESP3 map reply
+        return response
     it = iter(response)
     return dict(zip(it, it))
 
@@ -0,0 +1,110 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+"""
+Microbenchmark of command packing, shows the time spent per command by:
+
+- the uncached pure Python implementation, which splits the command name
+  and encodes the header on every call (as before the header cache)
+- the pure Python implementation using the command header cache
+- the C extension (if built)
+"""
+import time
+from argparse import ArgumentParser
+
+from aredis.connection import (BaseConnection, SYM_CRLF, SYM_DOLLAR,
+                               SYM_EMPTY, SYM_STAR, pack_command_header)
+from aredis.utils import b
+
+try:
+    from aredis.speedups import pack_command as c_pack_command
+except ImportError:
+    c_pack_command = None
+
+
+COMMANDS = [
+    ('GET', 'key:000001'),
+    ('SET', 'key:000001', 'value'),
+    ('HGET', 'hash:000001', 'field'),
+    ('EVALSHA', 'ce6b9f8ea93bdb5ac0d25a7e0a5e05e98a3ab7a4', 1, 'key:000001', 10),
+    ('CONFIG GET', 'maxmemory'),
+]
+
+
+def parse_args():
+    parser = ArgumentParser()
+    parser.add_argument('-n',
+                        type=int,
+                        help='Number of commands packed (default 200000)',
+                        default=200000)
+    args = parser.parse_args()
+    print(args)
+    return args
+
+
+def uncached_pack_command(connection, *args):
+    output = []
+    command = args[0]
+    if ' ' in command:
+        args = tuple([b(s) for s in command.split()]) + args[1:]
+    else:
+        args = (b(command),) + args[1:]
+
+    buff = SYM_EMPTY.join(
+        (SYM_STAR, b(str(len(args))), SYM_CRLF))
+    for arg in map(connection.encode, args):
+        if len(buff) > 6000 or len(arg) > 6000:
+            buff = SYM_EMPTY.join(
+                (buff, SYM_DOLLAR, b(str(len(arg))), SYM_CRLF))
+            output.append(buff)
+            output.append(b(arg))
+            buff = SYM_CRLF
+        else:
+            buff = SYM_EMPTY.join((buff, SYM_DOLLAR, b(str(len(arg))),
+                                   SYM_CRLF, b(arg), SYM_CRLF))
+    output.append(buff)
+    return output
+
+
+def cached_pack_command(connection, *args):
+    output = []
+    buff = pack_command_header(args[0], len(args))
+    for arg in map(connection.encode, args[1:]):
+        if len(buff) > 6000 or len(arg) > 6000:
+            buff = SYM_EMPTY.join(
+                (buff, SYM_DOLLAR, b(str(len(arg))), SYM_CRLF))
+            output.append(buff)
+            output.append(b(arg))
+            buff = SYM_CRLF
+        else:
+            buff = SYM_EMPTY.join((buff, SYM_DOLLAR, b(str(len(arg))),
+                                   SYM_CRLF, b(arg), SYM_CRLF))
+    output.append(buff)
+    return output
+
+
+def c_extension_pack_command(connection, *args):
+    return c_pack_command(args, connection.encoding, 6000)
+
+
+def bench(name, pack, num):
+    connection = BaseConnection()
+    for args in COMMANDS:
+        assert pack(connection, *args) == uncached_pack_command(connection, *args)
+        start = time.perf_counter()
+        for _ in range(num):
+            pack(connection, *args)
+        duration = time.perf_counter() - start
+        print('{0:<10} {1:<10} {2:8.0f} ns/command'.format(
+            name, args[0], duration / num * 1e9))
+
+
+def run():
+    args = parse_args()
+    bench('uncached', uncached_pack_command, args.n)
+    bench('cached', cached_pack_command, args.n)
+    if c_pack_command is not None:
+        bench('speedups', c_extension_pack_command, args.n)
+
+
+if __name__ == '__main__':
+    run()
@@ -63,6 +63,7 @@ def _gen_mock_resp(r, response, *, loop):
     connection = AsyncMock(loop=loop)
     connection.read_response.return_value = AsyncMock.pack_response(response, loop=loop)
     mock_connection_pool.get_connection.return_value = connection
+    mock_connection_pool.wait_for_connection.return_value = AsyncMock.pack_response(connection, loop=loop)
     r.connection_pool = mock_connection_pool
     return r
 
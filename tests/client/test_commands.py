@@ -1,4 +1,5 @@
 from __future__ import with_statement
+import asyncio
 import binascii
 import datetime
 import pytest
@@ -36,6 +37,36 @@ class TestResponseCallbacks:
         assert await r.get('a') == 'static'
 
 
+@skip_if_server_version_lt('6.0.0')
+class TestResp3Callbacks:
+    "Tests for the callbacks of replies already shaped by RESP3"
+
+    @pytest.fixture()
+    def r(self, event_loop):
+        return aredis.StrictRedis(protocol_version=3, loop=event_loop)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_hgetall(self, r):
+        await r.flushdb()
+        await r.hset('a', 'field', 'value')
+        assert await r.hgetall('a') == {b'field': b'value'}
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_zrange_withscores(self, r):
+        await r.flushdb()
+        await r.zadd('a', a1=1, a2=2)
+        assert await r.zrange('a', 0, -1, withscores=True) == \
+            [(b'a1', 1.0), (b'a2', 2.0)]
+        assert await r.zrange('a', 0, -1, withscores=True,
+                              score_cast_func=int) == [(b'a1', 1), (b'a2', 2)]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_config_get(self, r):
+        data = await r.config_get()
+        assert isinstance(data, dict)
+        assert all(isinstance(key, str) for key in data)
+
+
 class TestRedisCommands:
 
     @pytest.mark.asyncio(forbid_global_loop=True)
@@ -477,6 +508,37 @@ class TestRedisCommands:
         assert await r.setbit('a', 5, True)
         assert await r.getbit('a', 5)
 
+    @skip_python_vsersion_lt('3.6')
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_get_stream(self, r):
+        await r.flushdb()
+        value = b'x' * 100000 + b'y'
+        await r.set('a', value)
+        chunks = []
+        async for chunk in r.get_stream('a', chunk_size=4096):
+            assert len(chunk) <= 4096
+            chunks.append(chunk)
+        assert b''.join(chunks) == value
+        async for chunk in r.get_stream('missing'):
+            assert False
+        # the connection is reused once the value is read
+        assert r.connection_pool._created_connections == 1
+        assert await r.get('a') == value
+
+    @skip_python_vsersion_lt('3.6')
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_get_stream_interrupted(self, r):
+        await r.flushdb()
+        await r.set('a', b'x' * 1000000)
+        async for chunk in r.get_stream('a', chunk_size=1024):
+            break
+        await asyncio.sleep(0)
+        assert await r.get('a') == b'x' * 1000000
+        await r.rpush('b', 'c')
+        with pytest.raises(ResponseError):
+            async for chunk in r.get_stream('b'):
+                pass
+
     @pytest.mark.asyncio(forbid_global_loop=True)
     async def test_getrange(self, r):
         await r.flushdb()
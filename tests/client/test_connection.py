@@ -1,10 +1,25 @@
 #!/usr/bin/python
 # -*- coding: utf-8 -*-
+import array
+import asyncio
+import gc
 import socket
+import weakref
 
 import pytest
+from unittest.mock import patch
+
+import aredis.connection
 from aredis import (Connection,
+                    ProtocolConnection,
                     UnixDomainSocketConnection)
+from aredis.connection import (HiredisParser, PythonParser, RedisProtocol,
+                               RESP3Parser, SocketBuffer, SpeedupsParser,
+                               SPEEDUPS_READER_AVAILABLE, COMMAND_HEADERS_MAX_ARGS,
+                               COMMAND_HEADERS_MAX_SIZE, _COMMAND_HEADERS,
+                               pack_command_header)
+from aredis.exceptions import (ConnectionError, MovedError, ResponseError,
+                               TimeoutError)
 
 
 @pytest.mark.asyncio(forbid_global_loop=True)
@@ -60,6 +75,443 @@ async def test_connect_tcp_wrong_socket_opt_raises(event_loop, option):
     assert conn._writer.transport.is_closing()
 
 
+@pytest.mark.skipif(not SPEEDUPS_READER_AVAILABLE, reason='speedups extension is not built')
+def test_speedups_parser_is_collected_without_disconnect(event_loop):
+    conn = Connection(parser_class=SpeedupsParser, loop=event_loop)
+    conn._reader = asyncio.StreamReader(loop=event_loop)
+    parser = SpeedupsParser(65535)
+    parser.on_connect(conn)
+    parser.set_push_handler(parser.feed)
+    # a partial reply is held by the reader
+    parser.feed(b'*2\r\n$3\r\nabc\r\n')
+    assert parser._reader.gets() is aredis.connection.NOT_ENOUGH_DATA
+    ref = weakref.ref(parser)
+    del parser
+    gc.collect()
+    assert ref() is None
+
+
+@pytest.mark.parametrize('parser_class', [
+    PythonParser,
+    pytest.param(SpeedupsParser, marks=pytest.mark.skipif(
+        not SPEEDUPS_READER_AVAILABLE, reason='speedups extension is not built')),
+])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_protocol_connection(event_loop, parser_class):
+    conn = ProtocolConnection(parser_class=parser_class, loop=event_loop)
+    assert str(conn) == 'ProtocolConnection<host=127.0.0.1,port=6379,db=0>'
+    await conn.send_command('PING')
+    assert await conn.read_response() == b'PONG'
+    assert isinstance(conn._reader, RedisProtocol)
+    # a reply received in many chunks
+    value = b'x' * 1024 * 1024
+    await conn.send_command('SET', 'protocol-connection', value)
+    await conn.send_command('GET', 'protocol-connection')
+    assert await conn.read_response() == b'OK'
+    assert await conn.read_response() == value
+    conn.disconnect()
+    assert (conn._reader is None) and (conn._writer is None)
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_redis_protocol_wakes_up_reader(event_loop):
+    protocol = RedisProtocol(loop=event_loop)
+    buffer = SocketBuffer(protocol, 65535)
+    # data received before the parser is attached is not lost
+    protocol.data_received(b'+O')
+    protocol.set_parser(buffer)
+    event_loop.call_soon(protocol.data_received, b'K\r\n')
+    assert await buffer.readline() == b'+OK'
+    event_loop.call_soon(protocol.connection_lost, None)
+    with pytest.raises(ConnectionError):
+        await buffer.readline()
+
+
+class SlowReaderProtocol(asyncio.Protocol):
+    """Server side protocol which does not read before `delay` seconds"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    def connection_made(self, transport):
+        transport.pause_reading()
+        if self.delay is not None:
+            asyncio.get_event_loop().call_later(self.delay, transport.resume_reading)
+
+
+@pytest.mark.parametrize('connection_class', [Connection, ProtocolConnection])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_large_write_is_drained(event_loop, connection_class):
+    server = await event_loop.create_server(lambda: SlowReaderProtocol(0.2), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    conn = connection_class(port=port, write_high_watermark=256 * 1024,
+                            write_low_watermark=64 * 1024, loop=event_loop)
+    await conn.connect()
+    assert conn._transport.get_write_buffer_limits() == (64 * 1024, 256 * 1024)
+    await conn.send_packed_command([b'x' * 1024 * 1024] * 32)
+    assert conn.write_buffer_size <= 64 * 1024
+    conn.disconnect()
+    server.close()
+
+
+@pytest.mark.parametrize('connection_class', [Connection, ProtocolConnection])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_large_write_times_out(event_loop, connection_class):
+    server = await event_loop.create_server(lambda: SlowReaderProtocol(None), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    conn = connection_class(port=port, stream_timeout=0.1, loop=event_loop)
+    await conn.connect()
+    with pytest.raises(TimeoutError):
+        await conn.send_packed_command([b'x' * 1024 * 1024] * 32)
+    assert not conn.is_connected
+    server.close()
+
+
+class TransportWithoutLimits:
+    """Transport of the SSL connections before Python 3.11"""
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    def __getattr__(self, name):
+        return getattr(self.transport, name)
+
+    def get_write_buffer_limits(self):
+        raise NotImplementedError
+
+
+@pytest.mark.parametrize('kwargs, limit', [
+    ({}, 64 * 1024),
+    ({'write_high_watermark': 256 * 1024}, 256 * 1024),
+    ({'write_low_watermark': 32 * 1024}, 128 * 1024),
+])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_on_connect_without_write_buffer_limits(event_loop, kwargs, limit):
+    conn = Connection(loop=event_loop, **kwargs)
+    await conn.connect()
+    conn._writer._transport = TransportWithoutLimits(conn._transport)
+    await conn.on_connect()
+    assert conn._write_limit == limit
+    await conn.send_command('PING')
+    assert await conn.read_response() == b'PONG'
+    conn.disconnect()
+
+
+@pytest.mark.parametrize('connection_class', [Connection, ProtocolConnection])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_read_timeout(event_loop, connection_class):
+    conn = connection_class(stream_timeout=0.1, loop=event_loop)
+    await conn.send_command('DEBUG', 'SLEEP', 0.5)
+    with pytest.raises(TimeoutError):
+        await conn.read_response()
+    assert not conn.is_connected
+    # the task reading the reply is not left cancelled
+    await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_read_cancelled_by_caller(event_loop):
+    conn = Connection(stream_timeout=0.1, loop=event_loop)
+    await conn.send_command('DEBUG', 'SLEEP', 0.5)
+    task = asyncio.ensure_future(conn.read_response(), loop=event_loop)
+    await asyncio.sleep(0.01)
+    # the deadline is reached as the caller cancels the read
+    conn._deadline = event_loop.time()
+    conn._on_deadline()
+    task.cancel()
+    # the cancellation is not turned into a timeout
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert not conn.is_connected
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_bulk_reader_timeout(event_loop):
+    conn = Connection(stream_timeout=0.1, loop=event_loop)
+    reader = await conn.bulk_reader()
+    await conn.send_command('DEBUG', 'SLEEP', 0.5)
+    with pytest.raises(TimeoutError):
+        await reader.read_length()
+    assert not conn.is_connected
+    assert conn._deadline_handle is None
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_read_deadline_moves_with_each_read(event_loop):
+    conn = Connection(stream_timeout=0.3, loop=event_loop)
+    for _ in range(4):
+        await conn.send_command('DEBUG', 'SLEEP', 0.15)
+        assert await conn.read_response() == b'OK'
+    conn.disconnect()
+    assert conn._deadline_handle is None
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_socket_buffer_read_across_chunks(event_loop):
+    stream = asyncio.StreamReader(loop=event_loop)
+    buffer = SocketBuffer(stream, 4)
+    stream.feed_data(b'$10\r\n0123456789\r\n+OK\r\n')
+    stream.feed_eof()
+    assert await buffer.readline() == b'$10'
+    assert await buffer.read(10) == b'0123456789'
+    assert await buffer.readline() == b'+OK'
+    assert buffer.length == 0
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_python_parser_nested_reply_across_reads(event_loop):
+    stream = asyncio.StreamReader(loop=event_loop)
+    conn = Connection(parser_class=PythonParser, loop=event_loop)
+    conn._reader = stream
+    parser = PythonParser(3)
+    parser.on_connect(conn)
+    data = (b'*3\r\n*2\r\n+OK\r\n-ERR bad\r\n:5\r\n'
+            b'*2\r\n$3\r\nabc\r\n$-1\r\n$5\r\nhello\r\n')
+    for i in range(0, len(data), 2):
+        stream.feed_data(data[i:i + 2])
+    response = await parser.read_response()
+    assert response[0][0] == b'OK'
+    assert isinstance(response[0][1], ResponseError)
+    assert response[1:] == [5, [b'abc', None]]
+    assert await parser.read_response() == b'hello'
+
+
+@pytest.mark.skipif(not SPEEDUPS_READER_AVAILABLE, reason='speedups extension is not built')
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_speedups_parser_nested_reply_across_reads(event_loop):
+    stream = asyncio.StreamReader(loop=event_loop)
+    conn = Connection(parser_class=SpeedupsParser, loop=event_loop)
+    conn._reader = stream
+    parser = SpeedupsParser(3)
+    parser.on_connect(conn)
+    data = (b'*3\r\n*2\r\n+OK\r\n-MOVED 3999 127.0.0.1:6381\r\n:5\r\n'
+            b'*2\r\n$3\r\nabc\r\n$-1\r\n$5\r\nhello\r\n')
+    for i in range(0, len(data), 2):
+        stream.feed_data(data[i:i + 2])
+    response = await parser.read_response()
+    assert response[0][0] == b'OK'
+    assert isinstance(response[0][1], MovedError)
+    assert response[0][1].slot_id == 3999
+    assert response[1:] == [5, [b'abc', None]]
+    assert await parser.read_response() == b'hello'
+
+
+@pytest.mark.parametrize('parser_class', [
+    PythonParser,
+    pytest.param(SpeedupsParser, marks=pytest.mark.skipif(
+        not SPEEDUPS_READER_AVAILABLE, reason='speedups extension is not built')),
+])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_parser_resp3_types(event_loop, parser_class):
+    stream = asyncio.StreamReader(loop=event_loop)
+    conn = Connection(parser_class=parser_class, loop=event_loop)
+    conn._reader = stream
+    parser = parser_class(3)
+    parser.on_connect(conn)
+    data = (b'%2\r\n+a\r\n:1\r\n$1\r\nb\r\n*2\r\n,1.5\r\n,inf\r\n'
+            b'~1\r\n+x\r\n_\r\n#t\r\n#f\r\n(12345678901234567890\r\n'
+            b'=15\r\ntxt:Some string\r\n!21\r\nSYNTAX invalid syntax\r\n'
+            b'|1\r\n+ttl\r\n:3\r\n+after-attribute\r\n'
+            b'>2\r\n+message\r\n+x\r\n')
+    for i in range(0, len(data), 3):
+        stream.feed_data(data[i:i + 3])
+    assert await parser.read_response() == {b'a': 1, b'b': [1.5, float('inf')]}
+    assert await parser.read_response() == {b'x'}
+    assert await parser.read_response() is None
+    assert await parser.read_response() is True
+    assert await parser.read_response() is False
+    assert await parser.read_response() == 12345678901234567890
+    assert await parser.read_response() == b'Some string'
+    assert isinstance(await parser.read_response(), ResponseError)
+    # attributes are skipped
+    assert await parser.read_response() == b'after-attribute'
+    # push frames are returned as replies without a push handler
+    assert await parser.read_response() == [b'message', b'x']
+
+
+@pytest.mark.parametrize('parser_class', [
+    PythonParser,
+    pytest.param(SpeedupsParser, marks=pytest.mark.skipif(
+        not SPEEDUPS_READER_AVAILABLE, reason='speedups extension is not built')),
+])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_parser_resp3_push_handler(event_loop, parser_class):
+    stream = asyncio.StreamReader(loop=event_loop)
+    conn = Connection(parser_class=parser_class, loop=event_loop)
+    conn._reader = stream
+    pushes = []
+    conn.set_push_handler(pushes.append)
+    conn._parser.on_connect(conn)
+    stream.feed_data(b'>2\r\n$10\r\ninvalidate\r\n*1\r\n$3\r\nkey\r\n+OK\r\n')
+    assert await conn._parser.read_response() == b'OK'
+    assert pushes == [[b'invalidate', [b'key']]]
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_connect_resp3(event_loop):
+    conn = Connection(protocol_version=3, loop=event_loop)
+    await conn.send_command('HSET', 'resp3-hash', 'a', '1')
+    await conn.send_command('HGETALL', 'resp3-hash')
+    assert await conn.read_response() in (0, 1)
+    assert await conn.read_response() == {b'a': b'1'}
+    conn.disconnect()
+
+
+@pytest.mark.parametrize('connection_class', [Connection, ProtocolConnection])
+@pytest.mark.parametrize('parser_class', [
+    PythonParser,
+    pytest.param(SpeedupsParser, marks=pytest.mark.skipif(
+        not SPEEDUPS_READER_AVAILABLE, reason='speedups extension is not built')),
+])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_bulk_reader(event_loop, connection_class, parser_class):
+    conn = connection_class(parser_class=parser_class, reader_read_size=1024,
+                            loop=event_loop)
+    value = b'0123456789' * 100000
+    await conn.send_command('SET', 'bulk-reader', value)
+    assert await conn.read_response() == b'OK'
+    reader = await conn.bulk_reader()
+    await conn.send_command('GET', 'bulk-reader')
+    assert await reader.read_length() == len(value)
+    chunks = []
+    chunk = await reader.read(4096)
+    while chunk:
+        assert len(chunk) <= 4096
+        chunks.append(chunk)
+        chunk = await reader.read(4096)
+    reader.close()
+    assert b''.join(chunks) == value
+    assert not conn.awaiting_response
+    # the parser reads the next replies again
+    await conn.send_command('PING')
+    assert await conn.read_response() == b'PONG'
+    conn.disconnect()
+
+
+def test_invalid_protocol_version():
+    with pytest.raises(ValueError):
+        Connection(protocol_version=4)
+
+
+def test_resp3_parser():
+    # hiredis is the default parser of RESP2 only
+    with patch.object(aredis.connection, 'DefaultParser', HiredisParser):
+        assert isinstance(Connection(protocol_version=3)._parser, RESP3Parser)
+    assert RESP3Parser in (PythonParser, SpeedupsParser)
+    with pytest.raises(ValueError):
+        Connection(protocol_version=3, parser_class=HiredisParser)
+
+
+def test_pack_command_wire_format():
+    conn = Connection()
+    packed = conn.pack_command('SET', 'key', 1.5, 10, b'value')
+    assert b''.join(packed) == (b'*5\r\n$3\r\nSET\r\n$3\r\nkey\r\n'
+                                b'$3\r\n1.5\r\n$2\r\n10\r\n$5\r\nvalue\r\n')
+    # large values are sent as separate chunks instead of being copied
+    value = b'x' * 10000
+    packed = conn.pack_command('SET', 'key', value)
+    assert value in packed
+    assert b''.join(packed) == (b'*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$10000\r\n'
+                                + value + b'\r\n')
+    packed = conn.pack_commands([('GET', 'a'), ('CONFIG GET', 'maxmemory')])
+    assert b''.join(packed) == (b'*2\r\n$3\r\nGET\r\n$1\r\na\r\n'
+                                b'*3\r\n$6\r\nCONFIG\r\n$3\r\nGET\r\n'
+                                b'$9\r\nmaxmemory\r\n')
+
+
+def test_pack_command_buffers():
+    conn = Connection()
+    packed = conn.pack_command('SET', 'key', bytearray(b'value'))
+    assert b''.join(packed) == b'*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$5\r\nvalue\r\n'
+    # large buffers are sent as flat views of their data, without copy
+    value = bytearray(b'x' * 10000)
+    packed = conn.pack_command('SET', 'key', value)
+    views = [chunk for chunk in packed if isinstance(chunk, memoryview)]
+    assert len(views) == 1
+    assert views[0].obj is value
+    value[0:1] = b'y'
+    assert b''.join(packed) == (b'*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$10000\r\n'
+                                + bytes(value) + b'\r\n')
+    # any format and shape of data is sent as bytes
+    value = array.array('i', range(2000))
+    packed = conn.pack_command('SET', 'key', value)
+    assert b''.join(packed) == (b'*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$8000\r\n'
+                                + value.tobytes() + b'\r\n')
+    # non contiguous buffers are copied
+    packed = conn.pack_command('SET', 'key', memoryview(b'0123456789')[::2])
+    assert b''.join(packed) == b'*3\r\n$3\r\nSET\r\n$3\r\nkey\r\n$5\r\n02468\r\n'
+
+
+def test_pack_commands_keeps_large_values_apart():
+    conn = Connection(buffer_cutoff=100)
+    value = memoryview(b'x' * 200)
+    packed = conn.pack_commands([('SET', 'a', value), ('GET', 'a'), ('GET', 'b')])
+    assert any(chunk.obj is value.obj for chunk in packed
+               if isinstance(chunk, memoryview))
+    assert b''.join(packed) == (b'*3\r\n$3\r\nSET\r\n$1\r\na\r\n$200\r\n'
+                                + bytes(value) + b'\r\n'
+                                b'*2\r\n$3\r\nGET\r\n$1\r\na\r\n'
+                                b'*2\r\n$3\r\nGET\r\n$1\r\nb\r\n')
+
+
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_send_buffer_value(event_loop):
+    conn = Connection(loop=event_loop)
+    value = bytearray(b'x' * 100000)
+    await conn.send_command('SET', 'a', value)
+    assert await conn.read_response() == b'OK'
+    await conn.send_command('GET', 'a')
+    assert await conn.read_response() == bytes(value)
+    conn.disconnect()
+
+
+@pytest.mark.parametrize('connection_class', [Connection, ProtocolConnection])
+@pytest.mark.asyncio(forbid_global_loop=True)
+async def test_large_value_is_written_apart(event_loop, connection_class):
+    conn = connection_class(loop=event_loop, buffer_cutoff=1000)
+    await conn.connect()
+    transport = conn._transport
+    written = []
+    write, writelines = transport.write, transport.writelines
+
+    def record_write(data):
+        written.append(data)
+        write(data)
+
+    def record_writelines(pieces):
+        written.append(list(pieces))
+        writelines(pieces)
+
+    with patch.object(transport, 'write', record_write), \
+            patch.object(transport, 'writelines', record_writelines):
+        value = bytearray(b'x' * 100000)
+        await conn.send_command('SET', 'a', value)
+    assert await conn.read_response() == b'OK'
+    if aredis.connection.WRITELINES_JOINS:
+        # the value is not joined with the other pieces
+        assert len(written) == 3
+        assert isinstance(written[1], memoryview) and written[1].obj is value
+    else:
+        assert len(written) == 1
+    conn.disconnect()
+
+
+def test_pack_command_header_is_cached():
+    header = pack_command_header('CONFIG GET', 2)
+    assert header == b'*3\r\n$6\r\nCONFIG\r\n$3\r\nGET\r\n'
+    assert pack_command_header('CONFIG GET', 2) is header
+    assert pack_command_header('CONFIG GET', 3).startswith(b'*4\r\n')
+
+
+def test_pack_command_header_cache_skips_wide_commands():
+    size = len(_COMMAND_HEADERS)
+    for nargs in range(COMMAND_HEADERS_MAX_ARGS, COMMAND_HEADERS_MAX_ARGS + COMMAND_HEADERS_MAX_SIZE):
+        assert pack_command_header('DEL', nargs).startswith('*{}\r\n'.format(nargs).encode())
+    assert len(_COMMAND_HEADERS) == size
+    # the headers of the usual commands are still cached
+    assert pack_command_header('HSET', 4) is pack_command_header('HSET', 4)
+
+
 # only test during dev
 # @pytest.mark.asyncio(forbid_global_loop=True)
 # async def test_connect_unix_socket(event_loop):
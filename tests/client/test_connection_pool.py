@@ -3,6 +3,7 @@ import os
 import pytest
 import aredis
 import re
+import time
 import asyncio
 
 from aredis.pool import to_bool
@@ -18,6 +19,7 @@ class DummyConnection:
         self.kwargs = kwargs
         self.pid = os.getpid()
         self.awaiting_response = False
+        self.connects = 0
 
 
 class TestConnectionPool:
@@ -87,6 +89,243 @@ class TestConnectionPool:
         assert conn._writer is None and conn._reader is None
 
 
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_single_idle_reaper(self, event_loop):
+        class IdleConnection(DummyConnection):
+            def __init__(self, **kwargs):
+                super(IdleConnection, self).__init__(**kwargs)
+                self.last_active_at = time.time()
+                self.connected = True
+
+            def disconnect(self):
+                self.connected = False
+
+        pool = aredis.ConnectionPool(connection_class=IdleConnection,
+                                     max_idle_time=0.2, idle_check_interval=0.05)
+        connections = [pool.get_connection() for _ in range(3)]
+        reaper = pool._reaper
+        assert reaper is not None
+        for connection in connections:
+            pool.release(connection)
+        # the most recently used connection is kept
+        connections[2].last_active_at = time.time() + 0.2
+        await asyncio.sleep(0.3)
+        assert pool._available_connections == [connections[2]]
+        assert [conn.connected for conn in connections] == [False, False, True]
+        assert pool._reaper is reaper
+        await asyncio.sleep(0.3)
+        # the reaper stops once the pool is empty
+        assert pool._created_connections == 0
+        assert pool._reaper is None and reaper.done()
+        pool.get_connection()
+        assert pool._reaper not in (None, reaper)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_reset_stops_idle_reaper(self, event_loop):
+        pool = aredis.ConnectionPool(connection_class=DummyConnection,
+                                     max_idle_time=0.2, idle_check_interval=0.05)
+        pool.get_connection()
+        reaper = pool._reaper
+        pool.reset()
+        assert pool._reaper is None
+        pool.get_connection()
+        new_reaper = pool._reaper
+        await asyncio.sleep(0.1)
+        assert reaper.cancelled()
+        # the cancelled reaper does not drop the new one
+        assert pool._reaper is new_reaper and not new_reaper.done()
+        new_reaper.cancel()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_health_check_on_borrow(self, event_loop):
+        pool = aredis.ConnectionPool(host='127.0.0.1', port=6379,
+                                     health_check_interval=0.01, loop=event_loop)
+        connection = await pool.wait_for_connection()
+        await connection.connect()
+        pool.release(connection)
+        address = '{}:{}'.format(*connection._writer.get_extra_info('sockname')[:2])
+        await aredis.StrictRedis(loop=event_loop).client_kill(address)
+        await asyncio.sleep(0.02)
+        assert await pool.wait_for_connection() is connection
+        # the PING fails, the command is sent again on a new connection
+        await connection.send_command('ECHO', 'foo')
+        assert await connection.read_response() == b'foo'
+        assert connection.connects == 2
+        pool.release(connection)
+        pool.disconnect()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_health_check_with_next_command(self, event_loop):
+        rs = aredis.StrictRedis(health_check_interval=0.01, loop=event_loop)
+        replies = []
+        rs.register_hook('after_reply', replies.append)
+        await rs.set('a', 'foo')
+        await asyncio.sleep(0.02)
+        connection = await rs.connection_pool.wait_for_connection()
+        await connection.send_command('GET', 'a')
+        # the PING is sent in the same write, its reply is read first
+        assert connection._health_checked_commands is not None
+        assert await connection.read_response() == b'foo'
+        assert connection._health_checked_commands is None
+        assert connection.connects == 1
+        rs.connection_pool.release(connection)
+        # the PING is not given to the hooks
+        assert [event.command for event in replies] == ['SET', 'GET']
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_stats(self, event_loop):
+        pool = aredis.ConnectionPool(host='127.0.0.1', port=6379, loop=event_loop)
+        c1 = await pool.wait_for_connection()
+        c2 = await pool.wait_for_connection()
+        await c1.connect()
+        pool.release(c1)
+        # a connection with an unread reply is closed
+        c2.awaiting_response = True
+        pool.release(c2)
+        c1.disconnect()
+        await c1.connect()
+        stats = pool.stats()
+        assert stats['created'] == 1
+        assert stats['in_use'] == 0
+        assert stats['available'] == 1
+        assert stats['opened'] == 2
+        assert stats['closed'] == 1
+        assert stats['idle_closed'] == 0
+        assert stats['reconnects'] == 1
+        pool.disconnect()
+
+    def test_invalid_min_connections(self):
+        with pytest.raises(ValueError):
+            aredis.ConnectionPool(min_connections=-1)
+        with pytest.raises(ValueError):
+            aredis.ConnectionPool(max_connections=2, min_connections=3)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_warmup(self, event_loop):
+        pool = aredis.ConnectionPool(host='127.0.0.1', port=6379,
+                                     min_connections=3, loop=event_loop)
+        await pool.warmup()
+        assert pool._created_connections == 3
+        assert len(pool._available_connections) == 3
+        assert all(conn._writer is not None
+                   for conn in pool._available_connections)
+        # the pool is already full
+        await pool.warmup()
+        assert pool._created_connections == 3
+        pool.disconnect()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_warmup_failure(self, event_loop):
+        class FailingConnection(DummyConnection):
+            count = 0
+
+            async def connect(self):
+                FailingConnection.count += 1
+                if FailingConnection.count == 2:
+                    raise ConnectionError('connection refused')
+
+            def disconnect(self):
+                pass
+
+        pool = self.get_pool(connection_class=FailingConnection)
+        pool.min_connections = 3
+        with pytest.raises(ConnectionError):
+            await pool.warmup()
+        # the connected connections are kept
+        assert pool._created_connections == 2
+        assert len(pool._available_connections) == 2
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_idle_check_keeps_min_connections(self, event_loop):
+        rs = aredis.StrictRedis(host='127.0.0.1', port=6379, db=0,
+                                max_idle_time=0.2, idle_check_interval=0.1,
+                                min_connections=1)
+        await rs.connection_pool.warmup()
+        await asyncio.gather(rs.info(), rs.info())
+        assert rs.connection_pool._created_connections == 2
+        await asyncio.sleep(0.3)
+        assert rs.connection_pool._created_connections == 1
+        conn = rs.connection_pool._available_connections[0]
+        assert conn._writer is not None
+
+
+class TestBlockingConnectionPool:
+    def get_pool(self, max_connections=1, timeout=20):
+        return aredis.BlockingConnectionPool(connection_class=DummyConnection,
+                                             max_connections=max_connections,
+                                             timeout=timeout)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_waits_for_released_connection(self, event_loop):
+        pool = self.get_pool()
+        c1 = await pool.wait_for_connection()
+        waiter = asyncio.ensure_future(pool.wait_for_connection())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        assert pool.stats()['waiting'] == 1
+        pool.release(c1)
+        assert await waiter is c1
+        assert pool._created_connections == 1
+        stats = pool.stats()
+        assert stats['waiting'] == 0
+        assert stats['waits'] == 1
+        assert 0.01 <= stats['max_wait_time'] <= stats['wait_time']
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_waiters_served_in_order(self, event_loop):
+        pool = self.get_pool()
+        connection = await pool.wait_for_connection()
+        served = []
+
+        async def borrow(i):
+            conn = await pool.wait_for_connection()
+            served.append(i)
+            await asyncio.sleep(0)
+            pool.release(conn)
+
+        waiters = [asyncio.ensure_future(borrow(i)) for i in range(5)]
+        await asyncio.sleep(0.01)
+        pool.release(connection)
+        await asyncio.gather(*waiters)
+        assert served == list(range(5))
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_timeout(self, event_loop):
+        pool = self.get_pool(timeout=0.05)
+        await pool.wait_for_connection()
+        with pytest.raises(ConnectionError):
+            await pool.wait_for_connection()
+        assert pool.stats()['timeouts'] == 1
+        assert pool.stats()['waiting'] == 0
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_cancelled_waiter_is_skipped(self, event_loop):
+        pool = self.get_pool()
+        connection = await pool.wait_for_connection()
+        cancelled = asyncio.ensure_future(pool.wait_for_connection())
+        waiter = asyncio.ensure_future(pool.wait_for_connection())
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        pool.release(connection)
+        assert await waiter is connection
+
+    def test_get_connection_does_not_wait(self):
+        pool = self.get_pool()
+        pool.get_connection()
+        with pytest.raises(ConnectionError):
+            pool.get_connection()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_client(self, event_loop):
+        pool = aredis.BlockingConnectionPool(max_connections=2, loop=event_loop)
+        rs = aredis.StrictRedis(connection_pool=pool)
+        await rs.flushdb()
+        res = await asyncio.gather(*[rs.incr('counter') for _ in range(100)])
+        assert sorted(res) == list(range(1, 101))
+        assert pool._created_connections == 2
+        assert pool.stats()['waits'] > 0
+
 class TestConnectionPoolURLParsing:
     def test_defaults(self):
         pool = aredis.ConnectionPool.from_url('redis://localhost')
@@ -0,0 +1,141 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+import aredis
+from aredis.exceptions import ResponseError
+
+
+class Recorder:
+
+    def __init__(self, client):
+        self.events = []
+        self.client = client
+        for event in ('before_send', 'after_reply', 'on_error'):
+            client.register_hook(event, self.recorder(event))
+
+    def recorder(self, name):
+        def record(event):
+            self.events.append((name, event.command, event.error))
+        return record
+
+
+class TestHooks:
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_command_events(self, event_loop):
+        rs = aredis.StrictRedis(loop=event_loop)
+        replies = []
+        rs.register_hook('after_reply', replies.append)
+        await rs.set('a', 'foo')
+        assert await rs.get('a') == b'foo'
+        assert [event.command for event in replies] == ['SET', 'GET']
+        event = replies[-1]
+        assert event.node == 'localhost:6379'
+        assert event.commands == 1
+        # *2\r\n$3\r\nGET\r\n$1\r\na\r\n and $3\r\nfoo\r\n
+        assert event.bytes_written == 20
+        assert event.bytes_read == 9
+        assert event.latency > 0
+        assert event.error is None
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_error_event(self, event_loop):
+        rs = aredis.StrictRedis(loop=event_loop)
+        recorder = Recorder(rs)
+        await rs.set('a', 'foo')
+        with pytest.raises(ResponseError):
+            await rs.lpush('a', 'bar')
+        name, command, error = recorder.events[-1]
+        assert (name, command) == ('on_error', 'LPUSH')
+        assert isinstance(error, ResponseError)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_pipeline_event(self, event_loop):
+        rs = aredis.StrictRedis(loop=event_loop)
+        recorder = Recorder(rs)
+        async with await rs.pipeline(transaction=False) as pipe:
+            await pipe.set('a', 'foo')
+            await pipe.get('a')
+            assert await pipe.execute() == [True, b'foo']
+        async with await rs.pipeline() as pipe:
+            await pipe.get('a')
+            await pipe.execute()
+        assert recorder.events == [
+            ('before_send', 'PIPELINE', None),
+            ('after_reply', 'PIPELINE', None),
+            ('before_send', 'MULTI', None),
+            ('after_reply', 'MULTI', None),
+        ]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_stream_event(self, event_loop):
+        rs = aredis.StrictRedis(loop=event_loop)
+        await rs.set('a', 'foo' * 1000)
+        recorder = Recorder(rs)
+        chunks = []
+        async for chunk in rs.get_stream('a', chunk_size=1000):
+            chunks.append(chunk)
+        assert b''.join(chunks) == b'foo' * 1000
+        await rs.set('b', 'bar')
+        assert await rs.get('b') == b'bar'
+        assert recorder.events == [
+            ('before_send', 'GET', None),
+            ('after_reply', 'GET', None),
+            ('before_send', 'SET', None),
+            ('after_reply', 'SET', None),
+            ('before_send', 'GET', None),
+            ('after_reply', 'GET', None),
+        ]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_multiplexed_events(self, event_loop):
+        rs = aredis.StrictRedis(multiplexed=True, loop=event_loop)
+        await rs.set('a', 'foo')
+        recorder = Recorder(rs)
+        replies = await asyncio.gather(rs.get('a'), rs.lpush('a', 'bar'),
+                                       return_exceptions=True)
+        assert replies[0] == b'foo'
+        assert isinstance(replies[1], ResponseError)
+        assert [event[:2] for event in recorder.events] == [
+            ('before_send', 'GET'),
+            ('before_send', 'LPUSH'),
+            ('after_reply', 'GET'),
+            ('on_error', 'LPUSH'),
+        ]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_pubsub_events(self, event_loop):
+        rs = aredis.StrictRedis(loop=event_loop)
+        recorder = Recorder(rs)
+        pubsub = rs.pubsub()
+        await pubsub.subscribe('foo')
+        assert (await pubsub.get_message())['type'] == 'subscribe'
+        assert recorder.events == [
+            ('before_send', 'SUBSCRIBE', None),
+            ('after_reply', 'SUBSCRIBE', None),
+        ]
+        pubsub.close()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_unregister(self, event_loop):
+        rs = aredis.StrictRedis(loop=event_loop)
+        replies = []
+        rs.register_hook('after_reply', replies.append)
+        await rs.ping()
+        connection = rs.connection_pool.get_connection()
+        rs.connection_pool.release(connection)
+        assert 'send_command' in vars(connection)
+        rs.unregister_hook('after_reply', replies.append)
+        assert rs.connection_pool.hooks is None
+        # the plain methods are used again
+        assert 'send_command' not in vars(connection)
+        await rs.ping()
+        assert len(replies) == 1
+
+    def test_invalid_event(self):
+        rs = aredis.StrictRedis()
+        with pytest.raises(ValueError):
+            rs.register_hook('before_connect', print)
@@ -0,0 +1,117 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+import aredis
+from aredis.metrics import LatencyHistogram, LatencyRecorder, export_pools
+
+
+class DummyClusterPool:
+
+    def stats(self):
+        return {
+            'created': 3, 'in_use': 1, 'available': 2,
+            'max_connections': 32, 'min_connections': 0,
+            'opened': 3, 'closed': 0, 'idle_closed': 0, 'reconnects': 0,
+            'nodes': {
+                '127.0.0.1:7001': {'created': 1, 'in_use': 0, 'available': 1},
+                '127.0.0.1:7000': {'created': 2, 'in_use': 1, 'available': 1},
+            }
+        }
+
+
+class TestPrometheusExport:
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_export_pools(self, event_loop):
+        rs = aredis.StrictRedis(loop=event_loop)
+        await rs.ping()
+        text = export_pools({'main': rs})
+        assert text.endswith('\n')
+        lines = text.splitlines()
+        assert '# TYPE aredis_pool_connections gauge' in lines
+        assert 'aredis_pool_connections_available{pool="main"} 1' in lines
+        assert 'aredis_pool_connections_opened_total{pool="main"} 1' in lines
+        # waits are only reported by the blocking pool
+        assert 'aredis_pool_waits_total' not in text
+
+    def test_export_blocking_pool(self):
+        pool = aredis.BlockingConnectionPool(max_connections=4)
+        lines = export_pools({'blocking': pool}, prefix='app').splitlines()
+        assert '# TYPE app_pool_waits_total counter' in lines
+        assert 'app_pool_max_connections{pool="blocking"} 4' in lines
+        assert 'app_pool_wait_seconds_total{pool="blocking"} 0.0' in lines
+
+    def test_export_cluster_pool_per_node(self):
+        lines = export_pools({'cluster': DummyClusterPool()}).splitlines()
+        assert lines.index('aredis_pool_connections{pool="cluster",node="127.0.0.1:7000"} 2') < \
+            lines.index('aredis_pool_connections{pool="cluster",node="127.0.0.1:7001"} 1')
+        assert 'aredis_pool_connections_in_use{pool="cluster",node="127.0.0.1:7000"} 1' in lines
+        assert 'aredis_pool_reconnects_total{pool="cluster"} 0' in lines
+
+    def test_label_values_are_escaped(self):
+        pool = aredis.ConnectionPool()
+        text = export_pools({'a "quoted"\\name': pool})
+        assert '{pool="a \\"quoted\\"\\\\name"}' in text
+
+
+class TestLatencyHistogram:
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        for millis in range(1, 1001):
+            histogram.record(millis / 1000)
+        snapshot = histogram.snapshot()
+        assert snapshot['count'] == 1000
+        assert snapshot['max'] == 1.0
+        assert snapshot['mean'] == pytest.approx(0.5005)
+        # percentiles are within 1/16 of the recorded latencies
+        assert 0.5 <= snapshot['p50'] <= 0.5 * 17 / 16
+        assert 0.99 <= snapshot['p99'] <= 1.0
+        assert snapshot['p999'] == 1.0
+
+    def test_small_latencies_are_exact(self):
+        histogram = LatencyHistogram()
+        histogram.record(0.000003)
+        histogram.record(0.000012)
+        assert histogram.percentile(50) == 0.000003
+        assert histogram.percentile(100) == 0.000012
+
+    def test_reset(self):
+        histogram = LatencyHistogram()
+        histogram.record(0.1)
+        histogram.reset()
+        assert histogram.snapshot() == {
+            'count': 0, 'mean': 0.0, 'max': 0.0, 'p50': 0.0, 'p99': 0.0, 'p999': 0.0
+        }
+
+
+class TestLatencyRecorder:
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_per_command_and_node(self, event_loop):
+        rs = aredis.StrictRedis(loop=event_loop)
+        recorder = LatencyRecorder()
+        recorder.attach(rs)
+        await rs.set('a', 'foo')
+        await rs.get('a')
+        await rs.get('a')
+        snapshot = recorder.snapshot()
+        assert snapshot['commands']['GET']['count'] == 2
+        assert snapshot['commands']['SET']['count'] == 1
+        assert snapshot['nodes']['localhost:6379']['count'] == 3
+        recorder.reset()
+        assert recorder.snapshot()['commands'] == {}
+        recorder.detach(rs)
+        await rs.get('a')
+        assert recorder.snapshot()['commands'] == {}
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_loop_lag(self, event_loop):
+        recorder = LatencyRecorder()
+        recorder.monitor_loop(0.01, loop=event_loop)
+        await asyncio.sleep(0.05)
+        recorder.stop_loop_monitor()
+        assert recorder.snapshot()['loop_lag']['count'] >= 1
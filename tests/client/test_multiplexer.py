@@ -0,0 +1,80 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+import aredis
+from aredis.exceptions import ResponseError
+
+
+class TestMultiplexer:
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_concurrent_commands_share_connection(self, event_loop):
+        rs = aredis.StrictRedis(multiplexed=True, loop=event_loop)
+        await rs.flushdb()
+        res = await asyncio.gather(*[rs.incr('counter') for _ in range(1000)])
+        assert sorted(res) == list(range(1, 1001))
+        assert rs.connection_pool._created_connections == 1
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_replies_dispatched_in_order(self, event_loop):
+        rs = aredis.StrictRedis(multiplexed=True, loop=event_loop)
+        await rs.flushdb()
+        await rs.mset({'a{}'.format(i): i for i in range(100)})
+        res = await asyncio.gather(*[rs.get('a{}'.format(i)) for i in range(100)])
+        assert res == [str(i).encode() for i in range(100)]
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_error_only_fails_its_caller(self, event_loop):
+        rs = aredis.StrictRedis(multiplexed=True, loop=event_loop)
+        await rs.flushdb()
+        await rs.set('a', 'foo')
+        await rs.rpush('b', 'bar')
+        res = await asyncio.gather(rs.get('a'), rs.get('b'), rs.get('a'),
+                                   return_exceptions=True)
+        assert res[0] == res[2] == b'foo'
+        assert isinstance(res[1], ResponseError)
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_blocking_command_uses_dedicated_connection(self, event_loop):
+        rs = aredis.StrictRedis(multiplexed=True, loop=event_loop)
+        await rs.flushdb()
+        blpop = asyncio.ensure_future(rs.blpop('q', timeout=1))
+        await asyncio.sleep(0.1)
+        # the shared connection is not blocked by BLPOP
+        assert await rs.rpush('q', 'item') == 1
+        assert await blpop == (b'q', b'item')
+        assert rs.connection_pool._created_connections == 2
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_reconnect_after_disconnect(self, event_loop):
+        rs = aredis.StrictRedis(multiplexed=True, loop=event_loop)
+        await rs.set('a', 'foo')
+        rs.connection_pool.disconnect()
+        assert await rs.get('a') == b'foo'
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_waits_for_a_connection_of_the_pool(self, event_loop):
+        pool = aredis.BlockingConnectionPool(max_connections=1, timeout=1, loop=event_loop)
+        rs = aredis.StrictRedis(connection_pool=pool, multiplexed=True)
+        # the shared connection is borrowed while the pool is exhausted
+        connection = await pool.wait_for_connection()
+        replies = asyncio.ensure_future(asyncio.gather(rs.ping(), rs.ping()))
+        await asyncio.sleep(0.05)
+        assert not replies.done()
+        pool.release(connection)
+        assert await replies == [True, True]
+        assert pool._created_connections == 1
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_connection_state_commands_use_dedicated_connection(self, event_loop):
+        rs = aredis.StrictRedis(multiplexed=True, loop=event_loop)
+        await rs.ping()
+        await rs.execute_command('CLIENT TRACKING', 'OFF')
+        assert rs.connection_pool._created_connections == 2
+
+    def test_invalid_number_of_connections(self):
+        with pytest.raises(ValueError):
+            aredis.StrictRedis(multiplexed=True, multiplexed_connections=0)
@@ -0,0 +1,129 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+import aredis
+from .conftest import skip_if_server_version_lt
+
+
+async def wait_for_invalidation(cache, size):
+    for _ in range(100):
+        if len(cache) == size:
+            return
+        await asyncio.sleep(0.01)
+
+
+@skip_if_server_version_lt('6.0.0')
+class TestClientCache:
+
+    @pytest.mark.parametrize('protocol_version', [2, 3])
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_cached_read(self, event_loop, protocol_version):
+        rs = aredis.StrictRedis(client_cache=True, protocol_version=protocol_version,
+                                loop=event_loop)
+        await rs.flushdb()
+        await rs.set('a', 'foo')
+        assert await rs.get('a') == b'foo'
+        connections = rs.connection_pool._created_connections
+        assert await rs.get('a') == b'foo'
+        assert rs.client_cache.stats()['hits'] == 1
+        assert rs.client_cache.stats()['misses'] == 1
+        # the hit did not use a connection of the pool
+        assert rs.connection_pool._in_use_connections == set()
+        assert rs.connection_pool._created_connections == connections
+        rs.client_cache.close()
+
+    @pytest.mark.parametrize('protocol_version', [2, 3])
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_invalidated_by_other_client(self, event_loop, protocol_version):
+        rs = aredis.StrictRedis(client_cache=True, protocol_version=protocol_version,
+                                loop=event_loop)
+        other = aredis.StrictRedis(loop=event_loop)
+        await rs.flushdb()
+        await rs.hset('h', 'field', 'foo')
+        assert await rs.hgetall('h') == {b'field': b'foo'}
+        assert len(rs.client_cache) == 1
+        await other.hset('h', 'field', 'bar')
+        await wait_for_invalidation(rs.client_cache, 0)
+        assert await rs.hgetall('h') == {b'field': b'bar'}
+        assert rs.client_cache.stats()['invalidations'] == 1
+        rs.client_cache.close()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_own_write_is_visible(self, event_loop):
+        rs = aredis.StrictRedis(client_cache=True, loop=event_loop)
+        await rs.flushdb()
+        await rs.set('a', 'foo')
+        assert await rs.get('a') == b'foo'
+        await rs.set('a', 'bar')
+        assert await rs.get('a') == b'bar'
+        rs.client_cache.close()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_cached_reply_is_not_shared(self, event_loop):
+        rs = aredis.StrictRedis(client_cache=True, loop=event_loop)
+        await rs.flushdb()
+        await rs.rpush('l', 'a', 'b')
+        (await rs.lrange('l', 0, -1)).append(b'c')
+        assert await rs.lrange('l', 0, -1) == [b'a', b'b']
+        rs.client_cache.close()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_eviction(self, event_loop):
+        rs = aredis.StrictRedis(client_cache=True, client_cache_max_size=2,
+                                loop=event_loop)
+        await rs.flushdb()
+        for key in ('a', 'b', 'c'):
+            await rs.get(key)
+        assert len(rs.client_cache) == 2
+        assert rs.client_cache.stats()['evictions'] == 1
+        # 'a' was the least recently used reply
+        await rs.get('a')
+        assert rs.client_cache.stats()['misses'] == 4
+        rs.client_cache.close()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_listener_lost_flushes_cache(self, event_loop):
+        rs = aredis.StrictRedis(client_cache=True, loop=event_loop)
+        await rs.flushdb()
+        await rs.get('a')
+        assert len(rs.client_cache) == 1
+        listener_id = rs.client_cache.client_id
+        rs.client_cache._listener.disconnect()
+        await wait_for_invalidation(rs.client_cache, 0)
+        assert len(rs.client_cache) == 0
+        assert rs.client_cache.client_id is None
+        # the next read connects a new listener
+        await rs.get('a')
+        assert rs.client_cache.client_id not in (None, listener_id)
+        rs.client_cache.close()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_connection_lost_drops_its_replies(self, event_loop):
+        rs = aredis.StrictRedis(client_cache=True, loop=event_loop)
+        await rs.flushdb()
+        await rs.get('a')
+        assert len(rs.client_cache) == 1
+        # the server stops tracking the keys read through the connection
+        rs.connection_pool.disconnect()
+        assert len(rs.client_cache) == 0
+        assert rs.client_cache.client_id is not None
+        rs.client_cache.close()
+
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_invalidated_by_any_key(self, event_loop):
+        rs = aredis.StrictRedis(client_cache=True, loop=event_loop)
+        await rs.flushdb()
+        await rs.execute_command('EXISTS', 'a', 'b')
+        assert len(rs.client_cache) == 1
+        rs.client_cache.invalidate(['b'])
+        assert len(rs.client_cache) == 0
+        await rs.execute_command('EXISTS', 'a', 'b')
+        assert rs.client_cache.stats()['misses'] == 2
+        rs.client_cache.close()
+
+    def test_invalid_max_size(self):
+        with pytest.raises(ValueError):
+            aredis.StrictRedis(client_cache=True, client_cache_max_size=0)
@@ -140,6 +140,40 @@ class TestConnectionPool:
             pool.get_connection_by_key(None)
         assert str(ex.value).startswith("No way to dispatch this command to Redis Cluster."), True
 
+    @pytest.mark.asyncio()
+    async def test_health_check_on_borrow(self):
+        pool = ClusterConnectionPool(startup_nodes=[{"host": "127.0.0.1", "port": 7000}],
+                                     health_check_interval=0.05)
+        await pool.initialize()
+        node = pool.get_master_node_by_slot(0)
+        connection = await pool.wait_for_connection_by_node(node)
+        await connection.connect()
+        pool.release(connection)
+        checked = []
+
+        def check_health_with_next_command():
+            checked.append(connection)
+
+        connection.check_health_with_next_command = check_health_with_next_command
+        assert await pool.wait_for_connection_by_node(node) is connection
+        assert checked == []
+        pool.release(connection)
+        await asyncio.sleep(0.1)
+        # connections unused for longer are checked before being handed out
+        assert await pool.wait_for_connection_by_slot(0) is connection
+        assert checked == [connection]
+        pool.release(connection)
+        pool.disconnect()
+
+    @pytest.mark.asyncio()
+    async def test_health_check_interval_option(self):
+        r = StrictRedisCluster(startup_nodes=[{"host": "127.0.0.1", "port": 7000}],
+                               health_check_interval=30)
+        assert r.connection_pool.health_check_interval == 30
+        assert 'health_check_interval' not in r.connection_pool.connection_kwargs
+        await r.set('foo', 'bar')
+        assert await r.get('foo') == b'bar'
+
     @pytest.mark.asyncio()
     async def test_get_connection_by_slot(self):
         """
@@ -208,6 +242,20 @@ class TestConnectionPool:
         assert last_active_at == conn.last_active_at
         assert conn._writer is None and conn._reader is None
 
+    @pytest.mark.asyncio(forbid_global_loop=True)
+    async def test_warmup(self, event_loop):
+        pool = ClusterConnectionPool(startup_nodes=[dict(host='127.0.0.1', port=7000)],
+                                     min_connections=2)
+        await pool.warmup()
+        masters = list(pool.nodes.all_masters())
+        for node in masters:
+            assert pool._created_connections_per_node[node['name']] == 2
+            assert len(pool._available_connections[node['name']]) == 2
+        assert all(conn._writer is not None
+                   for conns in pool._available_connections.values()
+                   for conn in conns)
+        pool.disconnect()
+
 
 class TestReadOnlyConnectionPool:
     async def get_pool(self, connection_kwargs=None, max_connections=None, startup_nodes=None):
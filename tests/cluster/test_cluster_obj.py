@@ -11,6 +11,7 @@ from aredis import StrictRedisCluster, StrictRedis
 from aredis.pool import ClusterConnectionPool
 from aredis.exceptions import (
     RedisClusterException, MovedError, AskError, ClusterDownError,
+    ResponseError,
 )
 from aredis.utils import b
 from aredis.nodemanager import NodeManager
@@ -433,3 +434,36 @@ async def test_access_correct_slave_with_readonly_mode_client(sr):
             assert b('foo') == await readonly_client.get('foo16706')
             readonly_client = StrictRedisCluster.from_url(url="redis://127.0.0.1:7000/0", readonly=True)
             assert b('foo') == await readonly_client.get('foo16706')
+
+
+@pytest.mark.asyncio
+async def test_execute_command_on_nodes_concurrently():
+    """
+    Test that the command is sent to all the nodes at once, and that an
+    error of one node is raised once the connections of all are released.
+    """
+    r = StrictRedisCluster(host="127.0.0.1", port=7000)
+    await r.connection_pool.initialize()
+    nodes = list(r.connection_pool.nodes.all_masters())
+    with patch.object(StrictRedisCluster, 'parse_response') as parse_response:
+
+        async def response(connection, *args, **options):
+            await asyncio.sleep(0.1)
+            return await connection.read_response()
+
+        parse_response.side_effect = response
+        start = time.time()
+        res = await r.execute_command_on_nodes(nodes, 'PING')
+        assert res == {node['name']: b'PONG' for node in nodes}
+        assert time.time() - start < 0.1 * len(nodes)
+
+        async def error_response(connection, *args, **options):
+            await connection.read_response()
+            if connection.port == nodes[-1]['port']:
+                raise ResponseError('ERR node error')
+            return True
+
+        parse_response.side_effect = error_response
+        with pytest.raises(ResponseError):
+            await r.execute_command_on_nodes(nodes, 'PING')
+    assert r.connection_pool.stats()['in_use'] == 0
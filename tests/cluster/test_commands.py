@@ -221,6 +221,18 @@ class TestRedisCommands:
         assert await r.get('a') is None
         assert await r.get('b') is None
 
+    @pytest.mark.asyncio
+    async def test_multi_key_commands_across_slots(self, r):
+        await r.flushdb()
+        keys = ['key:{0}'.format(i) for i in range(100)]
+        await r.mset({key: 'foo' for key in keys})
+        assert await r.exists(*keys, 'missing') == 100
+        assert await r.exists(keys[0]) == 1
+        assert await r.touch(keys[:10] + ['missing']) == 10
+        assert await r.delete(*keys[:50]) == 50
+        assert await r.unlink(*keys) == 50
+        assert await r.exists(*keys) == 0
+
     @pytest.mark.asyncio
     async def test_delitem(self, r):
         await r.flushdb()
@@ -400,6 +412,21 @@ class TestRedisCommands:
         for k, v in iteritems(d):
             assert await r.get(k) == v
 
+    @pytest.mark.asyncio
+    async def test_mset_mget_across_slots(self, r):
+        await r.flushdb()
+        d = {'key:{0}'.format(i): b(str(i)) for i in range(200)}
+        assert await r.mset(d)
+        keys = list(d) + ['missing']
+        assert await r.mget(keys) == list(d.values()) + [None]
+
+    @pytest.mark.asyncio
+    async def test_msetnx_same_slot(self, r):
+        await r.flushdb()
+        assert await r.msetnx({'a{tag}': b('1'), 'b{tag}': b('2')})
+        assert not await r.msetnx({'b{tag}': b('x'), 'c{tag}': b('3')})
+        assert await r.mget('a{tag}', 'b{tag}', 'c{tag}') == [b('1'), b('2'), None]
+
     @pytest.mark.asyncio
     async def test_msetnx(self, r):
         await r.flushdb()
@@ -8,7 +8,7 @@ import uuid
 # rediscluster imports
 from tests.cluster.conftest import skip_if_server_version_lt
 from aredis import StrictRedis, StrictRedisCluster, RedisClusterException, ConnectionError
-from aredis.nodemanager import NodeManager
+from aredis.nodemanager import NodeManager, SlotTable
 
 # 3rd party imports
 import pytest
@@ -313,6 +313,35 @@ def test_set_node():
     assert n.nodes == {expected['name']: expected}
 
 
+def test_slot_table():
+    """
+    Test that the slots of a shard share its nodes, and that moving a slot
+    to another master leaves the other slots of the shard alone.
+    """
+    master = {'host': '127.0.0.1', 'port': 7000, 'name': '127.0.0.1:7000', 'server_type': 'master'}
+    slave = {'host': '127.0.0.1', 'port': 7003, 'name': '127.0.0.1:7003', 'server_type': 'slave'}
+    other = {'host': '127.0.0.1', 'port': 7001, 'name': '127.0.0.1:7001', 'server_type': 'master'}
+
+    slots = SlotTable()
+    assert slots == {}
+    slots.assign(0, 5460, [master, slave])
+    assert len(slots) == 5461
+    assert 5460 in slots and 5461 not in slots
+    assert slots[0] is slots[5460]
+    assert slots[0] == [master, slave]
+    with pytest.raises(KeyError):
+        slots[5461]
+    assert slots.unassigned(5000, 6000) == 540
+
+    slots.set_master(42, other)
+    assert slots[42] == [other, slave]
+    assert slots[41] == slots[43] == [master, slave]
+    slots.set_master(43, other)
+    # the shard of the moved slots is added once
+    assert slots[42] is slots[43]
+    assert len(slots.shards) == 2
+
+
 @pytest.mark.asyncio
 async def test_reset():
     """
@@ -6,8 +6,9 @@ import re
 
 # rediscluster imports
 from aredis import StrictRedisCluster, ClusterConnectionPool
+from aredis.connection import ClusterConnection
 from aredis.utils import b
-from aredis.exceptions import RedisClusterException, WatchError, ResponseError, ConnectionError
+from aredis.exceptions import RedisClusterException, WatchError, ResponseError, ConnectionError, MovedError
 from tests.cluster.conftest import _get_client
 
 # 3rd party imports
@@ -251,6 +252,62 @@ class TestPipeline:
         result = await r.transaction(my_transaction, 'a', 'b')
         assert result == [True]
         assert await r.get('c') == b('4')
+
+    @pytest.mark.asyncio()
+    async def test_redirected_commands_are_pipelined(self, r):
+        await r.flushdb()
+        pool = r.connection_pool
+        await pool.initialize()
+        slots = {pool.get_node_by_slot(pool.nodes.keyslot(key))['name']: pool.nodes.keyslot(key)
+                 for key in ('a', 'b')}
+        redirected = []
+
+        async def response(connection, command, **options):
+            reply = await connection.read_response()
+            if len(redirected) < 2:
+                # the first replies are redirected to the node of their slot
+                node = connection.node['name']
+                redirected.append(node)
+                raise MovedError('{0} {1}'.format(slots[node], node))
+            return reply
+
+        async with await r.pipeline() as pipe:
+            await pipe.set('a', 1)
+            await pipe.set('b', 2)
+            # the redirected commands are not sent one by one
+            with patch.object(StrictRedisCluster, 'parse_response', side_effect=response), \
+                    patch.object(StrictRedisCluster, 'execute_command', side_effect=AssertionError):
+                await pipe.execute()
+        assert len(redirected) == 2
+        assert await r.mget('a', 'b') == [b('1'), b('2')]
+
+    @pytest.mark.asyncio()
+    async def test_failed_node_is_retried_once(self, r):
+        await r.flushdb()
+        pool = r.connection_pool
+        await pool.initialize()
+        dead = pool.get_node_by_slot(pool.nodes.keyslot('a'))['name']
+        assert pool.get_node_by_slot(pool.nodes.keyslot('b'))['name'] != dead
+        writes = []
+        send_packed_command = ClusterConnection.send_packed_command
+
+        async def send(connection, command):
+            if connection.node['name'] == dead:
+                writes.append(dead)
+                raise ConnectionError('Connection refused')
+            return await send_packed_command(connection, command)
+
+        async with await r.pipeline() as pipe:
+            await pipe.set('a', 1)
+            await pipe.set('b', 2)
+            with patch.object(ClusterConnection, 'send_packed_command', autospec=True, side_effect=send), \
+                    patch.object(pool.nodes, 'initialize', wraps=pool.nodes.initialize) as initialize:
+                res = await pipe.execute(raise_on_error=False)
+        # the slots are read again before the second and last attempt
+        assert writes == [dead, dead]
+        assert initialize.call_count == 1
+        assert isinstance(res[0], ConnectionError)
+        assert res[1] is True
 #
 #     def test_exec_error_in_no_transaction_pipeline(self, r):
 #         r['a'] = 1